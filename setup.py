@@ -23,6 +23,7 @@ setup(
         "immutable_data_validation>=0.2.1",
         "immutabledict>=1.1.0",
     ],
+    extras_require={"parquet": ["pyarrow>=3.0.0"]},
     zip_safe=False,
     include_package_data=True,
     classifiers=[
@@ -3,20 +3,36 @@
 
 File Manager for utilizing Curi bio data files and online databases.
 """
+from . import columnar
+from . import decimation
 from . import file_writer
+from . import query
+from .catalog import MetadataCatalog
+from .columnar import COLUMNAR_FILE_FORMATS
+from .columnar import COLUMNAR_METADATA_KEY
+from .columnar import export_plate_recording_to_columns
+from .columnar import export_plate_recordings_to_columns
+from .columnar import get_supported_columnar_file_formats
+from .columnar import SENSOR_NAMES
 from .constants import ADC_GAIN_SETTING_UUID
 from .constants import ADC_REF_OFFSET_UUID
 from .constants import ADC_TISSUE_OFFSET_UUID
 from .constants import BACKEND_LOG_UUID
 from .constants import BARCODE_IS_FROM_SCANNER_UUID
 from .constants import BOOTUP_COUNTER_UUID
+from .constants import CATALOG_FILE_NAME
+from .constants import CATALOG_SCHEMA_VERSION
 from .constants import CENTIMILLISECONDS_PER_SECOND
 from .constants import COMPUTER_NAME_HASH_UUID
+from .constants import CONSOLIDATED_PLATE_FILE_FORMAT_VERSION
+from .constants import CONSOLIDATED_PLATE_FILE_FORMAT_VERSION_METADATA_KEY
 from .constants import CURI_BIO_ACCOUNT_UUID
 from .constants import CURI_BIO_USER_ACCOUNT_ID
 from .constants import CURRENT_HDF5_FILE_FORMAT_VERSION
 from .constants import CUSTOMER_ACCOUNT_ID_UUID
 from .constants import DATETIME_STR_FORMAT
+from .constants import DEFAULT_MAX_OPEN_H5_FILES
+from .constants import DEFAULT_READING_BLOCK_SIZE
 from .constants import FILE_FORMAT_VERSION_METADATA_KEY
 from .constants import FILE_MIGRATION_PATHS
 from .constants import FILE_VERSION_PRIOR_TO_MIGRATION_UUID
@@ -29,12 +45,15 @@ from .constants import METADATA_UUID_DESCRIPTIONS
 from .constants import MICROSECONDS_PER_CENTIMILLISECOND
 from .constants import MIN_SUPPORTED_FILE_VERSION
 from .constants import NOT_APPLICABLE_H5_METADATA
+from .constants import NUM_SAMPLES_METADATA_KEY
 from .constants import ORIGINAL_FILE_VERSION_UUID
+from .constants import OVERVIEW_REDUCTION_FACTORS
 from .constants import PCB_SERIAL_NUMBER_UUID
 from .constants import PLATE_BARCODE_UUID
 from .constants import REF_SAMPLING_PERIOD_UUID
 from .constants import REFERENCE_SENSOR_READINGS
 from .constants import REFERENCE_VOLTAGE_UUID
+from .constants import SENSOR_OVERVIEWS_GROUP_NAME
 from .constants import SLEEP_FIRMWARE_VERSION_UUID
 from .constants import SOFTWARE_BUILD_NUMBER_UUID
 from .constants import SOFTWARE_RELEASE_VERSION_UUID
@@ -54,24 +73,47 @@ from .constants import UTC_FIRST_TISSUE_DATA_POINT_UUID
 from .constants import UTC_TIMESTAMP_OF_FILE_VERSION_MIGRATION_UUID
 from .constants import WELL_COLUMN_UUID
 from .constants import WELL_INDEX_UUID
+from .constants import WELL_METADATA_GROUP_NAME
 from .constants import WELL_NAME_UUID
 from .constants import WELL_ROW_UUID
 from .constants import XEM_SERIAL_NUMBER_UUID
+from .decimation import decimate_reading
+from .decimation import DECIMATION_METHODS
+from .exceptions import DuplicateWellNameError
 from .exceptions import FileAttributeNotFoundError
 from .exceptions import MantarrayFileNotLatestVersionError
+from .exceptions import NotAConsolidatedPlateFileError
+from .exceptions import PlateRecordingWithoutWellsError
+from .exceptions import UnsupportedColumnarFileFormatError
+from .exceptions import UnsupportedDecimationMethodError
 from .exceptions import UnsupportedFileMigrationPath
 from .exceptions import UnsupportedMantarrayFileVersionError
+from .exceptions import UnsupportedQueryFieldError
+from .exceptions import UnsupportedSensorNameError
 from .exceptions import WellRecordingsNotFromSameSessionError
+from .file_writer import add_sensor_overviews_to_file
+from .file_writer import export_consolidated_plate_file
 from .file_writer import MantarrayH5FileCreator
 from .file_writer import migrate_to_latest_version
 from .file_writer import migrate_to_next_version
+from .file_writer import write_sensor_overviews
 from .files import BasicWellFile
+from .files import ConsolidatedWellFile
+from .files import get_h5_file_handle_pool
+from .files import get_memmap_of_dataset
+from .files import H5FileHandlePool
 from .files import PlateRecording
 from .files import WELL_FILE_CLASSES
 from .files import WellFile
 from .files import WellFile_0_3_1
 from .files import WellFile_0_4_1
 from .files import WellFile_0_4_2
+from .files import WellFileMetadata
+from .query import DateRange
+from .query import Equals
+from .query import IsIn
+from .query import query_files
+from .time_axis import TimeAxis
 
 
 __all__ = [
@@ -144,4 +186,46 @@ __all__ = [
     "TOTAL_WORKING_HOURS_UUID",
     "TAMPER_FLAG_UUID",
     "PCB_SERIAL_NUMBER_UUID",
+    "MetadataCatalog",
+    "CATALOG_FILE_NAME",
+    "CATALOG_SCHEMA_VERSION",
+    "query",
+    "query_files",
+    "Equals",
+    "IsIn",
+    "DateRange",
+    "UnsupportedQueryFieldError",
+    "WellFileMetadata",
+    "H5FileHandlePool",
+    "get_h5_file_handle_pool",
+    "DEFAULT_MAX_OPEN_H5_FILES",
+    "TimeAxis",
+    "get_memmap_of_dataset",
+    "DEFAULT_READING_BLOCK_SIZE",
+    "decimation",
+    "decimate_reading",
+    "DECIMATION_METHODS",
+    "UnsupportedDecimationMethodError",
+    "SENSOR_OVERVIEWS_GROUP_NAME",
+    "OVERVIEW_REDUCTION_FACTORS",
+    "write_sensor_overviews",
+    "add_sensor_overviews_to_file",
+    "CONSOLIDATED_PLATE_FILE_FORMAT_VERSION",
+    "CONSOLIDATED_PLATE_FILE_FORMAT_VERSION_METADATA_KEY",
+    "WELL_METADATA_GROUP_NAME",
+    "NUM_SAMPLES_METADATA_KEY",
+    "NotAConsolidatedPlateFileError",
+    "export_consolidated_plate_file",
+    "ConsolidatedWellFile",
+    "columnar",
+    "COLUMNAR_FILE_FORMATS",
+    "COLUMNAR_METADATA_KEY",
+    "SENSOR_NAMES",
+    "get_supported_columnar_file_formats",
+    "export_plate_recording_to_columns",
+    "export_plate_recordings_to_columns",
+    "UnsupportedColumnarFileFormatError",
+    "UnsupportedSensorNameError",
+    "DuplicateWellNameError",
+    "PlateRecordingWithoutWellsError",
 ]
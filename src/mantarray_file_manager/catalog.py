@@ -0,0 +1,377 @@
+# -*- coding: utf-8 -*-
+"""Persistent on-disk catalog of the metadata of Mantarray H5 files."""
+import os
+import sqlite3
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Set
+from typing import Tuple
+from uuid import UUID
+
+from .constants import CATALOG_FILE_NAME
+from .constants import CATALOG_SCHEMA_VERSION
+from .constants import DATETIME_STR_FORMAT
+from .constants import METADATA_UUID_DESCRIPTIONS
+from .exceptions import FileAttributeNotFoundError
+from .files import iter_h5_files_in_directory
+from .files import scan_files
+from .files import WellFile
+
+CATALOG_SEARCH_CRITERIA_COLUMNS = {
+    "Well Name": "well_name",
+    "Plate Barcode": "plate_barcode",
+    "User ID": "user_account",
+    "Account ID": "customer_account",
+    "Mantarray Serial Number": "mantarray_serial_number",
+}
+# the columns stored as strings whose getters give another type, so search values are compared with the same type as without a catalog
+_CATALOG_COLUMN_TYPES = {"user_account": UUID, "customer_account": UUID}
+
+_FILE_COLUMNS = (
+    "path",
+    "size",
+    "mtime",
+    "inode",
+    "file_version",
+    "well_name",
+    "well_index",
+    "plate_barcode",
+    "begin_recording",
+    "user_account",
+    "customer_account",
+    "mantarray_serial_number",
+)
+
+
+def _get_optional_metadata(well_file: WellFile, getter_name: str) -> Optional[str]:
+    try:
+        value = getattr(well_file, getter_name)()
+    except (FileAttributeNotFoundError, ValueError):
+        # metadata that is missing (or unparseable in very early file versions) just can't be searched on
+        return None
+    return str(value)
+
+
+def read_catalog_record(file_path: str) -> Dict[str, Any]:
+    """Read everything the catalog stores about a single H5 file.
+
+    Args:
+        file_path: the path to the H5 file
+
+    Returns:
+        A dictionary of the catalog columns, plus an ``attributes`` entry mapping the string UUID of each metadata item in METADATA_UUID_DESCRIPTIONS present in the file to its value as a string.
+    """
+    file_stat = os.stat(file_path)
+    well_file = WellFile(file_path)
+    begin_recording = well_file.get_begin_recording()
+    record: Dict[str, Any] = {
+        "path": os.path.abspath(file_path),
+        "size": file_stat.st_size,
+        "mtime": file_stat.st_mtime_ns,
+        "inode": file_stat.st_ino,
+        "file_version": well_file.get_file_version(),
+        "well_name": _get_optional_metadata(well_file, "get_well_name"),
+        "well_index": well_file.get_well_index(),
+        "plate_barcode": well_file.get_plate_barcode(),
+        "begin_recording": begin_recording.strftime(DATETIME_STR_FORMAT),
+        "user_account": _get_optional_metadata(well_file, "get_user_account"),
+        "customer_account": _get_optional_metadata(well_file, "get_customer_account"),
+        "mantarray_serial_number": _get_optional_metadata(
+            well_file, "get_mantarray_serial_number"
+        ),
+    }
+    with well_file.lease_h5_file() as h5_file:
+        h5_attrs = h5_file.attrs
+        record["attributes"] = {
+            str(iter_uuid): str(h5_attrs[str(iter_uuid)])
+            for iter_uuid in METADATA_UUID_DESCRIPTIONS
+            if str(iter_uuid) in h5_attrs
+        }
+    return record
+
+
+class MetadataCatalog:
+    """SQLite catalog of H5 file metadata, so searches don't need to open the files.
+
+    Args:
+        catalog_path: the path of the SQLite database file. Use ``":memory:"`` for a catalog that only lives as long as this object.
+
+    Attributes:
+        _connection: The open connection to the SQLite database.
+    """
+
+    def __init__(self, catalog_path: str) -> None:
+        self._catalog_path = catalog_path
+        self._connection = sqlite3.connect(catalog_path)
+        self._create_schema()
+
+    @classmethod
+    def for_directory(cls, directory: str) -> "MetadataCatalog":
+        """Open (or create) the catalog stored inside a recording directory."""
+        return cls(os.path.join(directory, CATALOG_FILE_NAME))
+
+    def _create_schema(self) -> None:
+        schema_version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+        if schema_version != CATALOG_SCHEMA_VERSION:
+            # Catalogs are only a cache of what is in the H5 files, so an outdated layout is simply rebuilt
+            self._connection.execute("DROP TABLE IF EXISTS attributes")
+            self._connection.execute("DROP TABLE IF EXISTS files")
+        self._connection.execute(
+            """CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                file_version TEXT NOT NULL,
+                well_name TEXT,
+                well_index INTEGER NOT NULL,
+                plate_barcode TEXT NOT NULL,
+                begin_recording TEXT NOT NULL,
+                user_account TEXT,
+                customer_account TEXT,
+                mantarray_serial_number TEXT
+            )"""
+        )
+        self._connection.execute(
+            """CREATE TABLE IF NOT EXISTS attributes (
+                path TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+                uuid TEXT NOT NULL,
+                value TEXT NOT NULL,
+                PRIMARY KEY (path, uuid)
+            )"""
+        )
+        self._connection.execute(f"PRAGMA user_version = {CATALOG_SCHEMA_VERSION}")
+        self._connection.commit()
+
+    def get_catalog_path(self) -> str:
+        return self._catalog_path
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def add_records(self, records: Sequence[Dict[str, Any]]) -> None:
+        """Insert or replace the given records (from read_catalog_record)."""
+        placeholders = ", ".join("?" for _ in _FILE_COLUMNS)
+        for iter_record in records:
+            self._connection.execute(
+                "DELETE FROM attributes WHERE path = ?", (iter_record["path"],)
+            )
+            self._connection.execute(
+                f"INSERT OR REPLACE INTO files ({', '.join(_FILE_COLUMNS)}) VALUES ({placeholders})",
+                tuple(iter_record[iter_column] for iter_column in _FILE_COLUMNS),
+            )
+            self._connection.executemany(
+                "INSERT INTO attributes (path, uuid, value) VALUES (?, ?, ?)",
+                (
+                    (iter_record["path"], iter_uuid, iter_value)
+                    for iter_uuid, iter_value in iter_record["attributes"].items()
+                ),
+            )
+        self._connection.commit()
+
+    def add_file(self, file_path: str) -> None:
+        self.add_records([read_catalog_record(file_path)])
+
+    def get_cataloged_paths(self) -> Set[str]:
+        return {row[0] for row in self._connection.execute("SELECT path FROM files")}
+
+    def _select_in_directory(
+        self, columns: str, directory: str
+    ) -> List[Tuple[Any, ...]]:
+        """Select columns of the files cataloged anywhere inside a directory tree.
+
+        The paths are selected as a range, so only the part of the index of the path column inside the directory is read.
+        """
+        directory_prefix = os.path.join(os.path.abspath(directory), "")
+        # every path starting with the prefix sorts before the prefix with its last character (the separator) incremented
+        end_of_directory = directory_prefix[:-1] + chr(ord(directory_prefix[-1]) + 1)
+        return self._connection.execute(
+            f"SELECT {columns} FROM files WHERE path >= ? AND path < ?",  # nosec # the columns are only ever given by this class
+            (directory_prefix, end_of_directory),
+        ).fetchall()
+
+    def _get_fingerprints_in_directory(
+        self, directory: str
+    ) -> Dict[str, Tuple[int, int, int]]:
+        return {
+            row[0]: tuple(row[1:])
+            for row in self._select_in_directory("path, size, mtime, inode", directory)
+        }
+
+    def remove_paths(self, file_paths: Sequence[str]) -> None:
+        for iter_path in file_paths:
+            self._connection.execute(
+                "DELETE FROM attributes WHERE path = ?", (iter_path,)
+            )
+            self._connection.execute("DELETE FROM files WHERE path = ?", (iter_path,))
+        self._connection.commit()
+
+    def refresh_directory(
+        self,
+        directory: str,
+        max_workers: Optional[int] = 1,
+        use_processes: bool = True,
+    ) -> Dict[str, List[str]]:
+        """Bring the catalog of a directory tree up to date with what is on disk.
+
+        Each H5 file is only stat'ed. Files are opened only if they are new, or if their (size, mtime, inode) fingerprint differs from when they were cataloged. Cataloged files which no longer exist are evicted.
+
+        Args:
+            directory: the master folder for which all h5 files reside
+            max_workers: the number of workers to read new or changed files with. See scan_files
+            use_processes: whether the workers are processes or threads. See scan_files
+
+        Returns:
+            The absolute paths of the files that were ``added``, ``updated`` and ``removed``.
+        """
+        cataloged_fingerprints = self._get_fingerprints_in_directory(directory)
+        changes: Dict[str, List[str]] = {"added": [], "updated": [], "removed": []}
+        for iter_file in iter_h5_files_in_directory(directory):
+            file_path = os.path.abspath(iter_file)
+            file_stat = os.stat(file_path)
+            fingerprint = (file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino)
+            old_fingerprint = cataloged_fingerprints.pop(file_path, None)
+            if old_fingerprint == fingerprint:
+                continue
+            changes["added" if old_fingerprint is None else "updated"].append(file_path)
+        records = scan_files(
+            read_catalog_record,
+            changes["added"] + changes["updated"],
+            max_workers=max_workers,
+            use_processes=use_processes,
+        )
+        self.add_records(records)
+        changes["removed"] = list(cataloged_fingerprints)
+        self.remove_paths(changes["removed"])
+        return {
+            iter_change: sorted(iter_paths)
+            for iter_change, iter_paths in changes.items()
+        }
+
+    def get_unique_files(self, directory: str) -> List[str]:
+        """Obtain a list of all unique cataloged h5 files in the directory.
+
+        The files are listed and deduplicated in the same order as iter_unique_files_from_directory, so the same duplicates are dropped and the paths have the same form. Only the metadata comes from the catalog, and files which are not cataloged (see refresh_directory) are left out.
+
+        Args:
+            directory: the master folder for which all h5 files reside
+
+        Returns:
+            A list of the file paths for all the unique h5 files in the directory.
+        """
+        dedup_keys = {
+            row[0]: tuple(row[1:])
+            for row in self._select_in_directory(
+                "path, well_index, plate_barcode, begin_recording", directory
+            )
+        }
+        unique_files: List[str] = []
+        seen_keys: Set[Tuple[Any, ...]] = set()
+        for iter_file in iter_h5_files_in_directory(directory):
+            key = dedup_keys.get(os.path.abspath(iter_file))
+            if key is None or key in seen_keys:
+                continue
+            seen_keys.add(key)
+            unique_files.append(iter_file)
+        return unique_files
+
+    def get_specified_files(
+        self,
+        search_criteria: str,
+        criteria_value: Any,
+        unique_files: List[str],
+        max_workers: Optional[int] = 1,
+        use_processes: bool = True,
+    ) -> Dict[str, Dict[Any, List[str]]]:
+        """Obtain a subset of the cataloged h5 files based on search criteria.
+
+        Files which are not cataloged, or have changed since they were (see get_record), are read and cataloged first, so the result is the same as searching the files themselves.
+
+        Args:
+            search_criteria: the display name of the metadata to filter results by
+            criteria_value: the value the metadata must be equal to, of the same type as the getter of the metadata returns (e.g. a UUID for "User ID")
+            unique_files: the file paths to search through
+            max_workers: the number of workers to read uncataloged files with. See scan_files
+            use_processes: whether the workers are processes or threads. See scan_files
+
+        Returns:
+            a dictionary of the Plate Recordings that fall under the specified search criteria.
+        """
+        plate_recording_list: List[str] = []
+        column = CATALOG_SEARCH_CRITERIA_COLUMNS.get(search_criteria)
+        if column is not None:
+            records = self._get_up_to_date_records(
+                unique_files, max_workers=max_workers, use_processes=use_processes
+            )
+            column_type = _CATALOG_COLUMN_TYPES.get(column, str)
+            plate_recording_list = [
+                iter_file
+                for iter_file, iter_record in zip(unique_files, records)
+                if iter_record[column] is not None
+                and column_type(iter_record[column]) == criteria_value
+            ]
+        return {search_criteria: {criteria_value: plate_recording_list}}
+
+    def _get_up_to_date_records(
+        self,
+        file_paths: Sequence[str],
+        max_workers: Optional[int],
+        use_processes: bool,
+    ) -> List[Dict[str, Any]]:
+        """Get the record of each file, cataloging the files that are missing or stale."""
+        cataloged_records = [self.get_record(iter_path) for iter_path in file_paths]
+        new_records = scan_files(
+            read_catalog_record,
+            [
+                iter_path
+                for iter_path, iter_record in zip(file_paths, cataloged_records)
+                if iter_record is None
+            ],
+            max_workers=max_workers,
+            use_processes=use_processes,
+        )
+        self.add_records(new_records)
+        remaining_new_records = iter(new_records)
+        return [
+            next(remaining_new_records) if iter_record is None else iter_record
+            for iter_record in cataloged_records
+        ]
+
+    def get_record(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Get the cataloged columns of a file, if they are up to date.
+
+        Returns:
+            The same columns as read_catalog_record (without ``attributes``), or None if the file is not cataloged, no longer exists, or its (size, mtime, inode) fingerprint has changed since it was cataloged.
+        """
+        file_path = os.path.abspath(file_path)
+        row = self._connection.execute(
+            f"SELECT {', '.join(_FILE_COLUMNS)} FROM files WHERE path = ?",
+            (file_path,),
+        ).fetchone()
+        if row is None:
+            return None
+        record = dict(zip(_FILE_COLUMNS, row))
+        try:
+            file_stat = os.stat(file_path)
+        except OSError:
+            return None
+        if (record["size"], record["mtime"], record["inode"]) != (
+            file_stat.st_size,
+            file_stat.st_mtime_ns,
+            file_stat.st_ino,
+        ):
+            return None
+        return record
+
+    def get_metadata(self, file_path: str) -> Dict[UUID, str]:
+        """Get all cataloged metadata of a file, keyed by UUID."""
+        return {
+            UUID(row[0]): row[1]
+            for row in self._connection.execute(
+                "SELECT uuid, value FROM attributes WHERE path = ?",
+                (os.path.abspath(file_path),),
+            )
+        }
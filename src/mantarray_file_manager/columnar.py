@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""Export plates to columnar files, e.g. for loading into pandas."""
+from collections import Counter
+import datetime
+import json
+import os
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import Union
+import zipfile
+
+from immutable_data_validation import validate_int
+import numpy as np
+
+# pyarrow is only needed to write Parquet files, so it is an optional dependency
+try:
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None  # pylint: disable=invalid-name # the module, which is None when pyarrow is not installed
+
+from .constants import DEFAULT_READING_BLOCK_SIZE
+from .decimation import SampleReader
+from .exceptions import DuplicateWellNameError
+from .exceptions import PlateRecordingWithoutWellsError
+from .exceptions import UnsupportedColumnarFileFormatError
+from .exceptions import UnsupportedSensorNameError
+from .files import MANTARRAY_FILE_NAME_TIMESTAMP_FORMAT
+from .files import PlateRecording
+
+COLUMNAR_FILE_FORMATS = ("parquet", "npz")
+COLUMNAR_METADATA_KEY = "mantarray_metadata"
+SENSOR_NAMES = ("tissue", "reference")
+
+
+def get_supported_columnar_file_formats() -> Tuple[str, ...]:
+    """Get the columnar file formats that can be written.
+
+    Parquet needs the optional pyarrow package.
+    """
+    if pyarrow is None:
+        return tuple(
+            iter_format
+            for iter_format in COLUMNAR_FILE_FORMATS
+            if iter_format != "parquet"
+        )
+    return COLUMNAR_FILE_FORMATS
+
+
+def _get_columnar_metadata(plate_recording: PlateRecording, sensor_name: str) -> str:
+    wells_metadata = list()
+    for iter_well_index in plate_recording.get_well_indices():
+        well_file = plate_recording.get_well_by_index(iter_well_index)
+        time_axis = getattr(well_file, f"get_{sensor_name}_time_axis")()
+        well_metadata: Dict[str, Any] = well_file.get_metadata()._asdict()
+        well_metadata.update(
+            {
+                "num_samples": len(time_axis),
+                "time_offset_centimilliseconds": time_axis.get_offset(),
+                "time_step_centimilliseconds": time_axis.get_step(),
+            }
+        )
+        wells_metadata.append(well_metadata)
+    # UUIDs and datetimes are stored as strings
+    return json.dumps(
+        {"sensor_name": sensor_name, "wells": wells_metadata}, default=str
+    )
+
+
+def _write_parquet_file(
+    file_path: str,
+    column_names: Sequence[str],
+    sample_readers: Sequence[SampleReader],
+    num_samples: Sequence[int],
+    metadata: str,
+    rows_per_group: int,
+) -> None:
+    dtype = np.result_type(
+        np.int32, *(iter_read(0, 0)[1].dtype for iter_read in sample_readers)
+    )
+    schema = pyarrow.schema(
+        [(iter_name, pyarrow.from_numpy_dtype(dtype)) for iter_name in column_names],
+        metadata={COLUMNAR_METADATA_KEY: metadata},
+    )
+    with pyarrow.parquet.ParquetWriter(file_path, schema) as writer:
+        for iter_start in range(0, max(num_samples, default=0), rows_per_group):
+            num_rows = min(rows_per_group, max(num_samples) - iter_start)
+            columns = list()
+            for iter_read, iter_num_samples in zip(sample_readers, num_samples):
+                _, sensor_values = iter_read(
+                    iter_start, min(iter_start + num_rows, iter_num_samples)
+                )
+                # wells with fewer samples are padded with nulls
+                columns.append(
+                    pyarrow.array(
+                        np.resize(sensor_values.astype(dtype), num_rows),
+                        mask=np.arange(num_rows) >= len(sensor_values),
+                    )
+                )
+            writer.write_table(pyarrow.Table.from_arrays(columns, schema=schema))
+
+
+def _write_npz_file(
+    file_path: str,
+    column_names: Sequence[str],
+    sample_readers: Sequence[SampleReader],
+    num_samples: Sequence[int],
+    metadata: str,
+    rows_per_group: int,
+) -> None:
+    with zipfile.ZipFile(file_path, "w", allowZip64=True) as zip_file:
+        for iter_name, iter_read, iter_num_samples in zip(
+            column_names, sample_readers, num_samples
+        ):
+            # the members of a zip file are written one at a time, so each column is streamed into its .npy member
+            dtype = iter_read(0, 0)[1].dtype
+            with zip_file.open(f"{iter_name}.npy", "w", force_zip64=True) as npy_file:
+                np.lib.format.write_array_header_1_0(  # type: ignore[no-untyped-call] # np.lib.format is not annotated
+                    npy_file,
+                    {
+                        "descr": np.lib.format.dtype_to_descr(  # type: ignore[no-untyped-call] # np.lib.format is not annotated
+                            dtype
+                        ),
+                        "fortran_order": False,
+                        "shape": (iter_num_samples,),
+                    },
+                )
+                for iter_start in range(0, iter_num_samples, rows_per_group):
+                    npy_file.write(
+                        np.ascontiguousarray(
+                            iter_read(iter_start, iter_start + rows_per_group)[1],
+                            dtype=dtype,
+                        ).tobytes()
+                    )
+        with zip_file.open(f"{COLUMNAR_METADATA_KEY}.npy", "w") as npy_file:
+            np.lib.format.write_array(  # type: ignore[no-untyped-call] # np.lib.format is not annotated
+                npy_file, np.array(metadata)
+            )
+
+
+def export_plate_recording_to_columns(
+    plate_recording: PlateRecording,
+    file_path: str,
+    sensor_name: str = "tissue",
+    file_format: Optional[str] = None,
+    rows_per_group: int = DEFAULT_READING_BLOCK_SIZE,
+) -> None:
+    """Write the sensor values of a plate into a columnar file, with a column per well.
+
+    The columns are named by well name, in the order of the well indices. The metadata of the plate is stored as JSON under COLUMNAR_METADATA_KEY: the sensor name, and for each well its WellFileMetadata, its number of samples and the time offset and step (centi-milliseconds) of its samples, since the samples of different wells are not taken at exactly the same times.
+
+    Values are read and written rows_per_group samples at a time, so the plate is never held in memory.
+
+    In Parquet files (which need the optional pyarrow package) each group of rows is a row group, the metadata is in the schema metadata, and wells with fewer samples than the longest well are padded with nulls. NPZ files hold an array per well (e.g. ``numpy.load(file_path)["A1"]``) and the metadata as a string array.
+
+    Args:
+        plate_recording: the plate to export
+        file_path: the path of the file to create
+        sensor_name: "tissue" or "reference". The sensors are sampled at different rates, so they are exported to separate files.
+        file_format: "parquet" or "npz". Defaults to the extension of file_path.
+        rows_per_group: the number of samples of each well read and written at a time
+
+    Raises:
+        UnsupportedColumnarFileFormatError: if the format is unknown, or is Parquet and pyarrow is not installed
+        DuplicateWellNameError: if several wells have the same name, since the columns are named after the wells
+    """
+    if file_format is None:
+        file_format = os.path.splitext(file_path)[1].lstrip(".").lower()
+    if file_format not in get_supported_columnar_file_formats():
+        raise UnsupportedColumnarFileFormatError(
+            file_format, get_supported_columnar_file_formats()
+        )
+    if sensor_name not in SENSOR_NAMES:
+        raise UnsupportedSensorNameError(sensor_name, SENSOR_NAMES)
+    validate_int(value=rows_per_group, minimum=1)
+    well_files = [
+        plate_recording.get_well_by_index(iter_index)
+        for iter_index in plate_recording.get_well_indices()
+    ]
+    well_names = [iter_well_file.get_well_name() for iter_well_file in well_files]
+    duplicate_well_names = sorted(
+        iter_name
+        for iter_name, iter_count in Counter(well_names).items()
+        if iter_count > 1
+    )
+    if duplicate_well_names:
+        raise DuplicateWellNameError(duplicate_well_names)
+    write_file = _write_parquet_file if file_format == "parquet" else _write_npz_file
+    write_file(
+        file_path,
+        well_names,
+        [
+            getattr(iter_well_file, f"get_raw_{sensor_name}_reading_with_time_axis")
+            for iter_well_file in well_files
+        ],
+        [
+            len(getattr(iter_well_file, f"get_{sensor_name}_time_axis")())
+            for iter_well_file in well_files
+        ],
+        _get_columnar_metadata(plate_recording, sensor_name),
+        rows_per_group,
+    )
+
+
+def export_plate_recordings_to_columns(
+    plate_recordings: Union[PlateRecording, Sequence[PlateRecording]],
+    output_dir: str,
+    sensor_name: str = "tissue",
+    file_format: str = "npz",
+    rows_per_group: int = DEFAULT_READING_BLOCK_SIZE,
+) -> List[str]:
+    """Write each plate into its own columnar file.
+
+    The files are named ``<barcode>__<YYYY_MM_DD_HHMMSS>__<sensor_name>.<file_format>`` from the plate barcode and beginning of recording. See export_plate_recording_to_columns.
+
+    Args:
+        plate_recordings: the plates to export
+        output_dir: the directory to write the files to
+        sensor_name: see export_plate_recording_to_columns
+        file_format: see export_plate_recording_to_columns
+        rows_per_group: see export_plate_recording_to_columns
+
+    Returns:
+        The paths of the files, in the order of the plates.
+
+    Raises:
+        PlateRecordingWithoutWellsError: if a plate has no wells to name its file after. No file is written.
+    """
+    if isinstance(plate_recordings, PlateRecording):
+        plate_recordings = [plate_recordings]
+    if any(
+        not iter_plate_recording.get_well_indices()
+        for iter_plate_recording in plate_recordings
+    ):
+        raise PlateRecordingWithoutWellsError()
+    file_paths: List[str] = list()
+    for iter_plate_recording in plate_recordings:
+        first_well = iter_plate_recording.get_well_by_index(
+            iter_plate_recording.get_well_indices()[0]
+        )
+        begin_recording: datetime.datetime = first_well.get_begin_recording()
+        file_path = os.path.join(
+            output_dir,
+            f"{first_well.get_plate_barcode()}__{begin_recording.strftime(MANTARRAY_FILE_NAME_TIMESTAMP_FORMAT)}__{sensor_name}.{file_format}",
+        )
+        export_plate_recording_to_columns(
+            iter_plate_recording,
+            file_path,
+            sensor_name=sensor_name,
+            file_format=file_format,
+            rows_per_group=rows_per_group,
+        )
+        file_paths.append(file_path)
+    return file_paths
@@ -114,3 +114,16 @@ CENTIMILLISECONDS_PER_SECOND = 1e5
 MICROSECONDS_PER_CENTIMILLISECOND = 10
 TISSUE_SENSOR_READINGS = "tissue_sensor_readings"
 REFERENCE_SENSOR_READINGS = "reference_sensor_readings"
+
+CATALOG_FILE_NAME = "mantarray_file_catalog.sqlite"
+CATALOG_SCHEMA_VERSION = 2
+DEFAULT_MAX_OPEN_H5_FILES = 128
+DEFAULT_READING_BLOCK_SIZE = 65536
+SENSOR_OVERVIEWS_GROUP_NAME = "sensor_overviews"
+OVERVIEW_REDUCTION_FACTORS = (10, 100, 1000)
+CONSOLIDATED_PLATE_FILE_FORMAT_VERSION = "0.1.0"
+CONSOLIDATED_PLATE_FILE_FORMAT_VERSION_METADATA_KEY = (
+    "Consolidated Plate File Format Version"
+)
+WELL_METADATA_GROUP_NAME = "well_metadata"
+NUM_SAMPLES_METADATA_KEY = "num_samples"
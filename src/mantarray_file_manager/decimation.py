@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""Reduce readings to a fixed number of points for display."""
+from typing import Any
+from typing import Callable
+from typing import List
+from typing import Tuple
+
+from immutable_data_validation import validate_int
+from nptyping import NDArray
+import numpy as np
+
+from .constants import DEFAULT_READING_BLOCK_SIZE
+from .exceptions import UnsupportedDecimationMethodError
+
+# a function that reads the times and values of the samples in [start, stop)
+SampleReader = Callable[
+    [int, int], Tuple["np.ndarray[Any, Any]", "np.ndarray[Any, Any]"]
+]
+
+
+def _stack_reading(
+    times: NDArray[(1, Any), int], values: NDArray[(1, Any), int]
+) -> NDArray[(2, Any), int]:
+    return np.array((times, values), dtype=times.dtype)
+
+
+def _group_bins_into_blocks(
+    bin_edges: NDArray[(1, Any), int], block_size: int
+) -> List[Tuple[int, int]]:
+    """Group consecutive bins into blocks of about block_size samples.
+
+    Returns:
+        the (first bin, stop bin) of each block. Every block has at least one bin.
+    """
+    blocks: List[Tuple[int, int]] = []
+    first_bin = 0
+    num_bins = len(bin_edges) - 1
+    while first_bin < num_bins:
+        stop_bin = int(
+            np.searchsorted(bin_edges, bin_edges[first_bin] + block_size, side="right")
+        )
+        stop_bin = min(max(stop_bin - 1, first_bin + 1), num_bins)
+        blocks.append((first_bin, stop_bin))
+        first_bin = stop_bin
+    return blocks
+
+
+def min_max_decimate_samples(
+    read_samples: SampleReader,
+    num_samples: int,
+    num_points: int,
+    block_size: int = DEFAULT_READING_BLOCK_SIZE,
+) -> NDArray[(2, Any), int]:
+    """Keep the minimum and maximum of each bin of samples, reading blocks at a time.
+
+    Args:
+        read_samples: reads the times and values of a range of samples
+        num_samples: the total number of samples
+        num_points: the maximum number of points to keep. Half as many bins are used.
+        block_size: about how many samples to read at once
+
+    Returns:
+        The kept times and values, in time order, in the layout of a raw reading.
+    """
+    validate_int(value=num_points, minimum=2)
+    if num_samples <= num_points:
+        return _stack_reading(*read_samples(0, num_samples))
+    bin_size = -(-num_samples // (num_points // 2))
+    samples_per_block = bin_size * max(1, block_size // bin_size)
+    kept_blocks = []
+    for iter_block_start in range(0, num_samples, samples_per_block):
+        times, values = read_samples(
+            iter_block_start, min(iter_block_start + samples_per_block, num_samples)
+        )
+        num_block_samples = len(values)
+        num_bins = -(-num_block_samples // bin_size)
+        # pad the last bin with its last value, which cannot change its minimum or maximum
+        padded_values = np.pad(
+            values, (0, num_bins * bin_size - num_block_samples), mode="edge"
+        ).reshape(num_bins, bin_size)
+        bin_starts = np.arange(num_bins) * bin_size
+        min_indices = np.minimum(
+            bin_starts + padded_values.argmin(axis=1), num_block_samples - 1
+        )
+        max_indices = np.minimum(
+            bin_starts + padded_values.argmax(axis=1), num_block_samples - 1
+        )
+        kept_indices = np.unique(np.concatenate((min_indices, max_indices)))
+        kept_blocks.append(_stack_reading(times[kept_indices], values[kept_indices]))
+    return np.concatenate(kept_blocks, axis=1)
+
+
+def _average_lttb_buckets(
+    read_samples: SampleReader,
+    bucket_edges: NDArray[(1, Any), int],
+    block_edges: List[Tuple[int, int]],
+) -> Tuple[NDArray[(1, Any), float], NDArray[(1, Any), float]]:
+    """Average the times and values of each bucket, reading blocks at a time.
+
+    Returns:
+        The average times and values, with room for one more bucket at the end.
+    """
+    num_buckets = len(bucket_edges) - 1
+    average_times = np.empty(num_buckets + 1, dtype=np.float64)
+    average_values = np.empty(num_buckets + 1, dtype=np.float64)
+    for iter_first_bucket, iter_stop_bucket in block_edges:
+        block_start = bucket_edges[iter_first_bucket]
+        times, values = read_samples(block_start, bucket_edges[iter_stop_bucket])
+        bucket_starts = bucket_edges[iter_first_bucket:iter_stop_bucket] - block_start
+        bucket_sizes = np.diff(bucket_edges[iter_first_bucket : iter_stop_bucket + 1])
+        average_times[iter_first_bucket:iter_stop_bucket] = (
+            np.add.reduceat(times.astype(np.float64), bucket_starts) / bucket_sizes
+        )
+        average_values[iter_first_bucket:iter_stop_bucket] = (
+            np.add.reduceat(values.astype(np.float64), bucket_starts) / bucket_sizes
+        )
+    return average_times, average_values
+
+
+def _select_lttb_samples(
+    read_samples: SampleReader,
+    bucket_edges: NDArray[(1, Any), int],
+    block_edges: List[Tuple[int, int]],
+    averages: Tuple[NDArray[(1, Any), float], NDArray[(1, Any), float]],
+    first_sample: Tuple[float, float],
+) -> Tuple[List["np.ndarray[Any, Any]"], List["np.ndarray[Any, Any]"]]:
+    """Pick the sample of each bucket forming the largest triangle, reading blocks at a time.
+
+    Returns:
+        The kept times and values of each block.
+    """
+    average_times, average_values = averages
+    previous_time, previous_value = first_sample
+    kept_times = []
+    kept_values = []
+    for iter_first_bucket, iter_stop_bucket in block_edges:
+        block_start = bucket_edges[iter_first_bucket]
+        times, values = read_samples(block_start, bucket_edges[iter_stop_bucket])
+        float_times = times.astype(np.float64)
+        float_values = values.astype(np.float64)
+        kept_indices = np.empty(iter_stop_bucket - iter_first_bucket, dtype=np.int64)
+        for iter_bucket in range(iter_first_bucket, iter_stop_bucket):
+            bucket_start = bucket_edges[iter_bucket] - block_start
+            bucket_stop = bucket_edges[iter_bucket + 1] - block_start
+            # twice the area of the triangle with the previously kept sample and the next bucket's average
+            areas = np.abs(
+                (previous_time - average_times[iter_bucket + 1])
+                * (float_values[bucket_start:bucket_stop] - previous_value)
+                - (previous_time - float_times[bucket_start:bucket_stop])
+                * (average_values[iter_bucket + 1] - previous_value)
+            )
+            kept_index = bucket_start + int(areas.argmax())
+            kept_indices[iter_bucket - iter_first_bucket] = kept_index
+            previous_time = float_times[kept_index]
+            previous_value = float_values[kept_index]
+        kept_times.append(times[kept_indices])
+        kept_values.append(values[kept_indices])
+    return kept_times, kept_values
+
+
+def lttb_decimate_samples(
+    read_samples: SampleReader,
+    num_samples: int,
+    num_points: int,
+    block_size: int = DEFAULT_READING_BLOCK_SIZE,
+) -> NDArray[(2, Any), int]:
+    """Keep the most visually significant samples with Largest-Triangle-Three-Buckets.
+
+    The first and last samples are always kept. The samples in between are split into ``num_points - 2`` buckets, and from each bucket the sample forming the largest triangle with the previously kept sample and the average of the next bucket is kept. Samples are read in blocks of whole buckets, twice: once to average the buckets and once to pick the samples.
+
+    Args:
+        read_samples: reads the times and values of a range of samples
+        num_samples: the total number of samples
+        num_points: the number of points to keep
+        block_size: about how many samples to read at once
+
+    Returns:
+        The kept times and values, in time order, in the layout of a raw reading.
+    """
+    validate_int(value=num_points, minimum=3)
+    if num_samples <= num_points:
+        return _stack_reading(*read_samples(0, num_samples))
+    num_buckets = num_points - 2
+    bucket_edges = np.linspace(1, num_samples - 1, num_buckets + 1).astype(np.int64)
+    block_edges = _group_bins_into_blocks(bucket_edges, block_size)
+
+    first_times, first_values = read_samples(0, 1)
+    last_times, last_values = read_samples(num_samples - 1, num_samples)
+    average_times, average_values = _average_lttb_buckets(
+        read_samples, bucket_edges, block_edges
+    )
+    # the bucket after the last one is just the last sample
+    average_times[num_buckets] = last_times[0]
+    average_values[num_buckets] = last_values[0]
+
+    kept_times, kept_values = _select_lttb_samples(
+        read_samples,
+        bucket_edges,
+        block_edges,
+        (average_times, average_values),
+        (float(first_times[0]), float(first_values[0])),
+    )
+    return _stack_reading(
+        np.concatenate([first_times, *kept_times, last_times]),
+        np.concatenate([first_values, *kept_values, last_values]),
+    )
+
+
+def reduce_to_min_max_bins(
+    minimums: NDArray[(1, Any), int], maximums: NDArray[(1, Any), int], bin_size: int
+) -> Tuple[NDArray[(1, Any), int], NDArray[(1, Any), int]]:
+    """Combine consecutive (minimum, maximum) pairs into bins.
+
+    Raw values can be reduced by passing them as both the minimums and the maximums. The last bin may be partial.
+
+    Returns:
+        The minimum and the maximum of each bin.
+    """
+    num_values = len(minimums)
+    num_bins = -(-num_values // bin_size)
+    # padding with the last value cannot change the minimum or maximum of the last bin
+    padding = (0, num_bins * bin_size - num_values)
+    return (
+        np.pad(minimums, padding, mode="edge").reshape(num_bins, bin_size).min(axis=1),
+        np.pad(maximums, padding, mode="edge").reshape(num_bins, bin_size).max(axis=1),
+    )
+
+
+DECIMATION_METHODS = {
+    "min_max": min_max_decimate_samples,
+    "lttb": lttb_decimate_samples,
+}
+
+
+def decimate_samples(
+    read_samples: SampleReader,
+    num_samples: int,
+    num_points: int,
+    method: str = "min_max",
+    block_size: int = DEFAULT_READING_BLOCK_SIZE,
+) -> NDArray[(2, Any), int]:
+    """Reduce samples to at most num_points points with one of DECIMATION_METHODS."""
+    if method not in DECIMATION_METHODS:
+        raise UnsupportedDecimationMethodError(method, tuple(DECIMATION_METHODS))
+    return DECIMATION_METHODS[method](
+        read_samples, num_samples, num_points, block_size=block_size
+    )
+
+
+def decimate_reading(
+    reading: NDArray[(2, Any), int], num_points: int, method: str = "min_max"
+) -> NDArray[(2, Any), int]:
+    """Reduce a raw reading already in memory to at most num_points points.
+
+    Args:
+        reading: times in the first row and values in the second, such as from WellFile.get_raw_tissue_reading
+        num_points: the maximum number of points to keep
+        method: one of DECIMATION_METHODS
+    """
+    return decimate_samples(
+        lambda start, stop: (reading[0, start:stop], reading[1, start:stop]),
+        reading.shape[1],
+        num_points,
+        method=method,
+        block_size=max(reading.shape[1], 1),
+    )
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 """Exceptions."""
+from typing import Sequence
 from typing import TYPE_CHECKING
 from uuid import UUID
 
@@ -15,10 +16,23 @@ if TYPE_CHECKING:
 
 
 class WellRecordingsNotFromSameSessionError(Exception):
-    def __init__(self, main_well_file: "WellFile", new_well_file: "WellFile"):
-        super().__init__(
-            f"Previously loaded files for this Plate Recording session were from barcode '{main_well_file.get_plate_barcode()}' taken at {main_well_file.get_begin_recording()}. A new file is attempting to be added that is from barcode '{new_well_file.get_plate_barcode()}' taken at {new_well_file.get_begin_recording()}"
-        )
+    """Error raised if well files from different recording sessions are added to the same PlateRecording."""
+
+    def __init__(
+        self,
+        main_well_file: "WellFile",
+        new_well_file: "WellFile",
+        *other_new_well_files: "WellFile",
+    ):
+        message = f"Previously loaded files for this Plate Recording session were from barcode '{main_well_file.get_plate_barcode()}' taken at {main_well_file.get_begin_recording()}. A new file is attempting to be added that is from barcode '{new_well_file.get_plate_barcode()}' taken at {new_well_file.get_begin_recording()}"
+        if other_new_well_files:
+            mismatched_files = ", ".join(
+                f"{iter_file.get_file_name()} (barcode '{iter_file.get_plate_barcode()}' taken at {iter_file.get_begin_recording()})"
+                for iter_file in (new_well_file,) + other_new_well_files
+            )
+            message += f". All {len(other_new_well_files) + 1} files from other sessions: {mismatched_files}"
+        super().__init__(message)
+        self.mismatched_well_files = (new_well_file,) + other_new_well_files
 
 
 class UnsupportedMantarrayFileVersionError(Exception):
@@ -78,3 +92,64 @@ class MantarrayFileNotLatestVersionError(Exception):
         super().__init__(
             f"Mantarray files of version {file_version} are not supported. Please migrate to the latest file version {CURRENT_HDF5_FILE_FORMAT_VERSION}"
         )
+
+
+class UnsupportedQueryFieldError(Exception):
+    """Error raised if a query predicate is given metadata it cannot search on."""
+
+    def __init__(self, field: str):
+        super().__init__(f"Files cannot be queried by the field '{field}'.")
+
+
+class UnsupportedDecimationMethodError(Exception):
+    """Error raised if readings are asked to be decimated with an unknown method."""
+
+    def __init__(self, method: str, supported_methods: Sequence[str]):
+        super().__init__(
+            f"Readings cannot be decimated with the method '{method}'. Supported methods are: {supported_methods}."
+        )
+
+
+class NotAConsolidatedPlateFileError(Exception):
+    """Error raised if a file opened as a consolidated plate file was not exported as one."""
+
+    def __init__(self, file_path: str):
+        super().__init__(
+            f"The file {file_path} is not a consolidated plate file. Consolidated plate files are written with export_consolidated_plate_file."
+        )
+
+
+class UnsupportedColumnarFileFormatError(Exception):
+    """Error raised if a plate is asked to be exported to a columnar format that cannot be written."""
+
+    def __init__(self, file_format: str, supported_formats: Sequence[str]):
+        super().__init__(
+            f"Plates cannot be exported to the columnar format '{file_format}'. Supported formats are: {supported_formats}. Parquet files need the optional pyarrow package (pip install mantarray_file_manager[parquet])."
+        )
+
+
+class UnsupportedSensorNameError(Exception):
+    """Error raised if readings are asked for from an unknown sensor."""
+
+    def __init__(self, sensor_name: str, supported_sensor_names: Sequence[str]):
+        super().__init__(
+            f"There is no sensor named '{sensor_name}'. Supported sensors are: {supported_sensor_names}."
+        )
+
+
+class DuplicateWellNameError(Exception):
+    """Error raised if a plate is exported to columns named after its wells, but some wells have the same name."""
+
+    def __init__(self, duplicate_well_names: Sequence[str]):
+        super().__init__(
+            f"The columns of each well are named after the well, so the wells of a plate must have different names. These names are used by more than one well: {duplicate_well_names}."
+        )
+
+
+class PlateRecordingWithoutWellsError(Exception):
+    """Error raised if a plate without wells is exported to a file named after its wells."""
+
+    def __init__(self) -> None:
+        super().__init__(
+            "The file of a plate is named after the barcode and beginning of recording of its wells, so a plate without wells cannot be exported with export_plate_recordings_to_columns. Use export_plate_recording_to_columns instead."
+        )
@@ -4,39 +4,48 @@ import datetime
 import ntpath
 import os
 from os import getcwd
-from typing import Any
+from typing import List
 from typing import Optional
+from typing import Sequence
 from typing import Tuple
 from typing import Union
 import uuid
 
 import h5py
 from immutable_data_validation import validate_int
-from nptyping import NDArray
 import numpy as np
 
 from .constants import BACKEND_LOG_UUID
 from .constants import BARCODE_IS_FROM_SCANNER_UUID
 from .constants import COMPUTER_NAME_HASH_UUID
+from .constants import CONSOLIDATED_PLATE_FILE_FORMAT_VERSION
+from .constants import CONSOLIDATED_PLATE_FILE_FORMAT_VERSION_METADATA_KEY
 from .constants import CURRENT_HDF5_FILE_FORMAT_VERSION
 from .constants import DATETIME_STR_FORMAT
+from .constants import DEFAULT_READING_BLOCK_SIZE
 from .constants import FILE_FORMAT_VERSION_METADATA_KEY
 from .constants import FILE_MIGRATION_PATHS
 from .constants import FILE_VERSION_PRIOR_TO_MIGRATION_UUID
 from .constants import IS_FILE_ORIGINAL_UNTRIMMED_UUID
 from .constants import NOT_APPLICABLE_H5_METADATA
+from .constants import NUM_SAMPLES_METADATA_KEY
 from .constants import ORIGINAL_FILE_VERSION_UUID
+from .constants import OVERVIEW_REDUCTION_FACTORS
 from .constants import REFERENCE_SENSOR_READINGS
+from .constants import SENSOR_OVERVIEWS_GROUP_NAME
 from .constants import TISSUE_SENSOR_READINGS
 from .constants import TRIMMED_TIME_FROM_ORIGINAL_END_UUID
 from .constants import TRIMMED_TIME_FROM_ORIGINAL_START_UUID
 from .constants import UTC_TIMESTAMP_OF_FILE_VERSION_MIGRATION_UUID
+from .constants import WELL_METADATA_GROUP_NAME
+from .decimation import reduce_to_min_max_bins
 from .exceptions import MantarrayFileNotLatestVersionError
 from .exceptions import TooTrimmedError
 from .exceptions import UnsupportedArgumentError
 from .exceptions import UnsupportedFileMigrationPath
 from .files import BasicWellFile
-from .files import find_start_index
+from .files import find_evenly_spaced_start_index
+from .files import PlateRecording
 from .files import WELL_FILE_CLASSES
 from .files import WellFile
 
@@ -44,12 +53,19 @@ from .files import WellFile
 class MantarrayH5FileCreator(
     h5py.File
 ):  # pylint: disable=too-many-ancestors # Eli (7/28/20): I don't see a way around this...we need to subclass h5py File
-    """Creates an H5 file with the basic format/layout."""
+    """Creates an H5 file with the basic format/layout.
+
+    Args:
+        file_name: the path of the H5 file to create
+        file_format_version: the version of the file format
+        include_sensor_overviews: whether to write min/max overviews of the sensor datasets (see write_sensor_overviews) when the file is closed
+    """
 
     def __init__(
         self,
         file_name: str,
         file_format_version: str = CURRENT_HDF5_FILE_FORMAT_VERSION,
+        include_sensor_overviews: bool = False,
     ) -> None:
         super().__init__(
             file_name,
@@ -57,9 +73,158 @@ class MantarrayH5FileCreator(
             libver="latest",  # Eli (2/9/20) tried to specify this ('earliest', 'v110') to be more backward compatible but it didn't work for unknown reasons (gave error when trying to set swmr_mode=True)
             userblock_size=512,  # minimum size is 512 bytes
         )
+        self._include_sensor_overviews = include_sensor_overviews
 
         self.attrs[FILE_FORMAT_VERSION_METADATA_KEY] = file_format_version
 
+    def close(self) -> None:
+        if self._include_sensor_overviews and self:  # a closed h5py File is falsy
+            write_sensor_overviews(self)
+        super().close()
+
+
+def write_sensor_overviews(
+    h5_file: h5py.File,
+    reduction_factors: Sequence[int] = OVERVIEW_REDUCTION_FACTORS,
+) -> None:
+    """Store min/max overviews of the sensor datasets in an H5 file.
+
+    For each reduction factor ``f``, the overview holds the minimum (first row) and maximum (second row) of every ``f`` consecutive samples, so zoomed-out views can be drawn without reading every sample. Any existing overviews are replaced. All levels are computed in a single pass over the sensor data.
+
+    Args:
+        h5_file: an H5 file open for writing
+        reduction_factors: the number of samples summarized by each point of each overview level
+    """
+    if SENSOR_OVERVIEWS_GROUP_NAME in h5_file:
+        del h5_file[SENSOR_OVERVIEWS_GROUP_NAME]
+    overviews_group = h5_file.create_group(SENSOR_OVERVIEWS_GROUP_NAME)
+    block_size = int(np.lcm.reduce(reduction_factors))
+    block_size *= max(1, DEFAULT_READING_BLOCK_SIZE // block_size)
+    for iter_dataset_name in (TISSUE_SENSOR_READINGS, REFERENCE_SENSOR_READINGS):
+        if iter_dataset_name not in h5_file:
+            continue
+        sensor_dataset = h5_file[iter_dataset_name]
+        num_samples = len(sensor_dataset)
+        sensor_group = overviews_group.create_group(iter_dataset_name)
+        overview_datasets = {
+            iter_factor: sensor_group.create_dataset(
+                str(iter_factor),
+                shape=(2, -(-num_samples // iter_factor)),
+                dtype=sensor_dataset.dtype,
+            )
+            for iter_factor in reduction_factors
+        }
+        for iter_block_start in range(0, num_samples, block_size):
+            sensor_values = sensor_dataset[
+                iter_block_start : iter_block_start + block_size
+            ]
+            for iter_factor, iter_overview in overview_datasets.items():
+                first_bin = iter_block_start // iter_factor
+                block_overview = reduce_to_min_max_bins(
+                    sensor_values, sensor_values, iter_factor
+                )
+                iter_overview[
+                    :, first_bin : first_bin + len(block_overview[0])
+                ] = block_overview
+
+
+def add_sensor_overviews_to_file(
+    file_path: str, reduction_factors: Sequence[int] = OVERVIEW_REDUCTION_FACTORS
+) -> None:
+    """Store min/max overviews of the sensor datasets in an existing H5 file.
+
+    The file must not be open elsewhere (e.g. by a WellFile).
+
+    Args:
+        file_path: the path to the H5 file
+        reduction_factors: see write_sensor_overviews
+    """
+    with h5py.File(file_path, "r+") as h5_file:
+        write_sensor_overviews(h5_file, reduction_factors=reduction_factors)
+
+
+def export_consolidated_plate_file(
+    plate_recording: PlateRecording,
+    file_path: str,
+    compression: Optional[str] = None,
+) -> None:
+    """Write all the wells of a plate into a single H5 file.
+
+    Each sensor is stored as one chunked (wells x samples) dataset with a row per well, in the order of the well indices, so a whole plate is read with one file open and contiguous reads. Rows of wells with fewer samples than the longest well are padded with zeros, and the number of samples of each well is stored in the NUM_SAMPLES_METADATA_KEY attribute of the dataset. The attributes of each well are copied to its own group of WELL_METADATA_GROUP_NAME.
+
+    The sensor values are copied one block of samples at a time, so the plate is never held in memory. Use PlateRecording.from_consolidated_file to read the file.
+
+    Args:
+        plate_recording: the plate to export
+        file_path: the path of the H5 file to create
+        compression: the h5py compression filter of the sensor datasets (e.g. "gzip"), or None to store them uncompressed
+    """
+    well_files = [
+        plate_recording.get_well_by_index(iter_index)
+        for iter_index in plate_recording.get_well_indices()
+    ]
+    with h5py.File(file_path, "w") as h5_file:
+        h5_file.attrs[
+            CONSOLIDATED_PLATE_FILE_FORMAT_VERSION_METADATA_KEY
+        ] = CONSOLIDATED_PLATE_FILE_FORMAT_VERSION
+        well_metadata_group = h5_file.create_group(WELL_METADATA_GROUP_NAME)
+        for iter_row, iter_well_file in enumerate(well_files):
+            well_group = well_metadata_group.create_group(str(iter_row))
+            with iter_well_file.lease_h5_file():
+                well_attrs = iter_well_file.get_h5_attributes()
+                for iter_name, iter_value in well_attrs.items():
+                    well_group.attrs[iter_name] = iter_value
+        for iter_sensor_name, iter_dataset_name in (
+            ("tissue", TISSUE_SENSOR_READINGS),
+            ("reference", REFERENCE_SENSOR_READINGS),
+        ):
+            _write_consolidated_sensor_dataset(
+                h5_file, iter_dataset_name, iter_sensor_name, well_files, compression
+            )
+
+
+def _write_consolidated_sensor_dataset(
+    h5_file: h5py.File,
+    dataset_name: str,
+    sensor_name: str,
+    well_files: List[WellFile],
+    compression: Optional[str],
+) -> None:
+    read_sensor_values = [
+        getattr(iter_well_file, f"get_raw_{sensor_name}_reading_with_time_axis")
+        for iter_well_file in well_files
+    ]
+    num_samples = np.array(
+        [
+            len(getattr(iter_well_file, f"get_{sensor_name}_time_axis")())
+            for iter_well_file in well_files
+        ],
+        dtype=np.int64,
+    )
+    max_num_samples = max(num_samples.tolist(), default=0)
+    block_size = max(1, min(DEFAULT_READING_BLOCK_SIZE, max_num_samples))
+    # unlimited dimensions let the chunks be larger than a plate without wells or samples
+    sensor_dataset = h5_file.create_dataset(
+        dataset_name,
+        shape=(len(well_files), max_num_samples),
+        maxshape=(None, None),
+        dtype=np.result_type(
+            np.int32,
+            *(iter_read(0, 0)[1].dtype for iter_read in read_sensor_values),
+        ),
+        chunks=(1, block_size),
+        compression=compression,
+    )
+    sensor_dataset.attrs[NUM_SAMPLES_METADATA_KEY] = num_samples
+    for iter_row, iter_read in enumerate(read_sensor_values):
+        for iter_block_start in range(0, num_samples[iter_row], block_size):
+            _, sensor_values = iter_read(
+                iter_block_start, iter_block_start + block_size
+            )
+            sensor_dataset[
+                iter_row, iter_block_start : iter_block_start + len(sensor_values)
+            ] = sensor_values
+
 
 def _get_format_version_of_file(file_path: str) -> str:
     file = BasicWellFile(file_path)
@@ -174,6 +339,7 @@ def h5_file_trimmer(
     working_directory: Optional[str] = None,
     from_start: Optional[int] = 0,
     from_end: Optional[int] = 0,
+    use_wide_times: bool = False,
 ) -> str:
     """Trims an H5 file.
 
@@ -184,6 +350,7 @@ def h5_file_trimmer(
         working_directory: the directory in which to create the new files. Defaults to current working directory.
         from_start: centimilliseconds to trim from the start
         from_end: centimilliseconds to trim from the end
+        use_wide_times: whether to compute the times (and so the amounts trimmed) as int64 even if they fit in int32. See WellFile.
 
     Returns:
         The path to the trimmed H5 file. The amount actually trimmed off the file is dependent on the timepoints of the tissue sensor data and will be reflected in the new file name, message to the terminal, and the metadata. If the amount to be trimmed off is in between two time points, less time will be trimmed off and the lower timepoint will be used if from_start or upper timepoint if from_last. Reference sensor readings are trimmed according to the amount trimmed from tissue data.
@@ -210,31 +377,33 @@ def h5_file_trimmer(
     if working_directory is None:
         working_directory = getcwd()
 
-    old_file = WellFile(file_path)
+    old_file = WellFile(file_path, use_wide_times=use_wide_times)
     old_file_basename = ntpath.basename(file_path)[:-3]
 
-    # finding amount to trim
-    old_raw_reference_data = old_file.get_raw_reference_reading()
-    old_tissue_data = old_file.get_raw_tissue_reading()
+    # finding amount to trim from the evenly spaced times, without reading the sensor values
+    tissue_time_axis = old_file.get_tissue_time_axis()
+    reference_time_axis = old_file.get_reference_time_axis()
 
-    tissue_data_start_val = old_tissue_data[0][0]
-    tissue_data_last_val = old_tissue_data[0][-1]
+    tissue_data_start_val = tissue_time_axis[0]
+    tissue_data_last_val = tissue_time_axis[-1]
     total_time = tissue_data_last_val - tissue_data_start_val
-    tissue_data_start_index = find_start_index(from_start, old_tissue_data[0])
-    tissue_data_last_index = _find_last_index(from_end, old_tissue_data)
+    tissue_data_start_index = find_evenly_spaced_start_index(
+        from_start, tissue_time_axis.get_step(), len(tissue_time_axis)
+    )
+    tissue_data_last_index = _find_last_evenly_spaced_index(
+        from_end, tissue_time_axis.get_step(), len(tissue_time_axis)
+    )
 
     actual_start_trimmed = (
-        old_tissue_data[0][tissue_data_start_index] - tissue_data_start_val
-    )
-    actual_end_trimmed = (
-        tissue_data_last_val - old_tissue_data[0][tissue_data_last_index]
+        tissue_time_axis[tissue_data_start_index] - tissue_data_start_val
     )
+    actual_end_trimmed = tissue_data_last_val - tissue_time_axis[tissue_data_last_index]
 
-    reference_data_start_index = find_start_index(
-        actual_start_trimmed, old_raw_reference_data[0]
+    reference_data_start_index = find_evenly_spaced_start_index(
+        actual_start_trimmed, reference_time_axis.get_step(), len(reference_time_axis)
     )
-    reference_data_last_index = _find_last_index(
-        actual_end_trimmed, old_raw_reference_data
+    reference_data_last_index = _find_last_evenly_spaced_index(
+        actual_end_trimmed, reference_time_axis.get_step(), len(reference_time_axis)
     )
 
     if (
@@ -243,84 +412,95 @@ def h5_file_trimmer(
     ):
         raise TooTrimmedError(from_start, from_end, total_time)
 
-    # old metadata
-    old_h5_file = old_file.get_h5_file()
-    old_metadata_keys = set(old_h5_file.attrs.keys())
-    old_from_end = 0
-    old_from_start = 0
-    is_untrimmed = old_h5_file.attrs[str(IS_FILE_ORIGINAL_UNTRIMMED_UUID)]
-
-    if not is_untrimmed:
-        old_from_start = old_h5_file.attrs[str(TRIMMED_TIME_FROM_ORIGINAL_START_UUID)]
-        old_from_end = old_h5_file.attrs[str(TRIMMED_TIME_FROM_ORIGINAL_END_UUID)]
-
-        old_metadata_keys.remove(str(TRIMMED_TIME_FROM_ORIGINAL_START_UUID))
-        old_metadata_keys.remove(str(TRIMMED_TIME_FROM_ORIGINAL_END_UUID))
-        old_metadata_keys.remove(str(IS_FILE_ORIGINAL_UNTRIMMED_UUID))
-
-        old_file_basename = old_file_basename.split("__trimmed")[0]
-
-    if actual_start_trimmed != from_start:
-
-        print(  # allow-print
-            f"{actual_start_trimmed} centimilliseconds was trimmed from the start instead of {from_start}"
+    # the file is kept open while its metadata and readings are copied
+    with old_file.lease_h5_file() as old_h5_file:
+        # old metadata
+        old_metadata_keys = set(old_h5_file.attrs.keys())
+        old_from_end = 0
+        old_from_start = 0
+        is_untrimmed = old_h5_file.attrs[str(IS_FILE_ORIGINAL_UNTRIMMED_UUID)]
+
+        if not is_untrimmed:
+            old_from_start = old_h5_file.attrs[
+                str(TRIMMED_TIME_FROM_ORIGINAL_START_UUID)
+            ]
+            old_from_end = old_h5_file.attrs[str(TRIMMED_TIME_FROM_ORIGINAL_END_UUID)]
+
+            old_metadata_keys.remove(str(TRIMMED_TIME_FROM_ORIGINAL_START_UUID))
+            old_metadata_keys.remove(str(TRIMMED_TIME_FROM_ORIGINAL_END_UUID))
+            old_metadata_keys.remove(str(IS_FILE_ORIGINAL_UNTRIMMED_UUID))
+
+            old_file_basename = old_file_basename.split("__trimmed")[0]
+
+        if actual_start_trimmed != from_start:
+            print(  # allow-print
+                f"{actual_start_trimmed} centimilliseconds was trimmed from the start instead of {from_start}"
+            )
+
+        if actual_end_trimmed != from_end:
+            print(  # allow-print
+                f"{actual_end_trimmed} centimilliseconds was trimmed from the end instead of {from_end}"
+            )
+
+        # create new file
+        new_file_name = os.path.join(
+            working_directory,
+            f"{old_file_basename}__trimmed_{actual_start_trimmed + old_from_start}_{actual_end_trimmed + old_from_end}.h5",
         )
 
-    if actual_end_trimmed != from_end:
-
-        print(  # allow-print
-            f"{actual_end_trimmed} centimilliseconds was trimmed from the end instead of {from_end}"
+        # overviews of the old readings would not match the trimmed ones, so they are recomputed instead of copied
+        new_file = MantarrayH5FileCreator(
+            new_file_name,
+            include_sensor_overviews=SENSOR_OVERVIEWS_GROUP_NAME in old_h5_file,
         )
 
-    # create new file
-    new_file_name = os.path.join(
-        working_directory,
-        f"{old_file_basename}__trimmed_{actual_start_trimmed + old_from_start}_{actual_end_trimmed + old_from_end}.h5",
-    )
+        for iter_metadata_key in old_metadata_keys:
+            new_file.attrs[iter_metadata_key] = old_h5_file.attrs[iter_metadata_key]
 
-    new_file = MantarrayH5FileCreator(new_file_name)
+        # new metadata
+        metadata_to_create: Tuple[Tuple[uuid.UUID, Union[str, bool, int, float]], ...]
 
-    for iter_metadata_key in old_metadata_keys:
-        new_file.attrs[iter_metadata_key] = old_h5_file.attrs[iter_metadata_key]
-
-    # new metadata
-    metadata_to_create: Tuple[Tuple[uuid.UUID, Union[str, bool, int, float]], ...]
-
-    metadata_to_create = (
-        (IS_FILE_ORIGINAL_UNTRIMMED_UUID, False),
-        (TRIMMED_TIME_FROM_ORIGINAL_START_UUID, actual_start_trimmed + old_from_start),
-        (TRIMMED_TIME_FROM_ORIGINAL_END_UUID, actual_end_trimmed + old_from_end),
-    )
-
-    for iter_metadata_key, iter_metadata_value in metadata_to_create:
-        new_file.attrs[str(iter_metadata_key)] = iter_metadata_value
+        metadata_to_create = (
+            (IS_FILE_ORIGINAL_UNTRIMMED_UUID, False),
+            (
+                TRIMMED_TIME_FROM_ORIGINAL_START_UUID,
+                actual_start_trimmed + old_from_start,
+            ),
+            (TRIMMED_TIME_FROM_ORIGINAL_END_UUID, actual_end_trimmed + old_from_end),
+        )
 
-    # adding new trimmed data
-    new_tissue_sensor_data = old_h5_file[TISSUE_SENSOR_READINGS]
-    new_tissue_sensor_data = np.array(new_tissue_sensor_data)
-    new_tissue_sensor_data = new_tissue_sensor_data[
-        tissue_data_start_index : tissue_data_last_index + 1
-    ]  # +1 because needs to be inclusive of last index
+        for iter_metadata_key, iter_metadata_value in metadata_to_create:
+            new_file.attrs[str(iter_metadata_key)] = iter_metadata_value
 
-    new_reference_sensor_data = old_h5_file[REFERENCE_SENSOR_READINGS]
-    new_reference_sensor_data = np.array(new_reference_sensor_data)
-    new_reference_sensor_data = new_reference_sensor_data[
-        reference_data_start_index : reference_data_last_index + 1
-    ]  # +1 because needs to be indclusive of last index
+        # adding new trimmed data, reading only the samples that are kept
+        new_tissue_sensor_data = old_h5_file[TISSUE_SENSOR_READINGS][
+            tissue_data_start_index : tissue_data_last_index + 1
+        ]  # +1 because needs to be inclusive of last index
+        new_reference_sensor_data = old_h5_file[REFERENCE_SENSOR_READINGS][
+            reference_data_start_index : reference_data_last_index + 1
+        ]  # +1 because needs to be inclusive of last index
 
-    new_file.create_dataset(TISSUE_SENSOR_READINGS, data=new_tissue_sensor_data)
-    new_file.create_dataset(REFERENCE_SENSOR_READINGS, data=new_reference_sensor_data)
+        new_file.create_dataset(TISSUE_SENSOR_READINGS, data=new_tissue_sensor_data)
+        new_file.create_dataset(
+            REFERENCE_SENSOR_READINGS, data=new_reference_sensor_data
+        )
 
-    old_h5_file.close()
+    old_file.close()
     new_file.close()
     return new_file_name
 
 
-def _find_last_index(from_end: int, old_data: NDArray[(2, Any), int]) -> int:
-    last_index = len(old_data[0]) - 1
-    time_elapsed = 0
-    while last_index > 0 and from_end >= time_elapsed:
-        time_elapsed += old_data[0][last_index] - old_data[0][last_index - 1]
-        last_index -= 1
-    last_index += 1
-    return last_index
+def _find_last_evenly_spaced_index(
+    from_end: int, time_step: int, num_times: int
+) -> int:
+    """Get the index of the last time kept when trimming from the end.
+
+    The counterpart of find_evenly_spaced_start_index. If from_end is between two times, the later time is kept.
+
+    Args:
+        from_end: the non-negative amount of time trimmed from the end
+        time_step: the constant time between consecutive times
+        num_times: the number of times
+    """
+    num_steps = min(num_times - 1, from_end // time_step + 1)
+    return num_times - num_steps
@@ -1,35 +1,55 @@
 # -*- coding: utf-8 -*-
 """Classes and functions for finding and reading files."""
+from collections import OrderedDict
+from concurrent.futures import Executor
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 import datetime
+import functools
 from glob import glob
 import os
+import re
+import threading
 from typing import Any
+from typing import Callable
+from typing import ContextManager
 from typing import Dict
+from typing import Iterator
 from typing import List
+from typing import NamedTuple
 from typing import Optional
 from typing import Sequence
 from typing import Set
 from typing import Tuple
+from typing import TYPE_CHECKING
+from typing import TypeVar
 from typing import Union
 from uuid import UUID
 
 import h5py
+from immutable_data_validation import validate_int
 from immutabledict import immutabledict
 from nptyping import NDArray
 import numpy as np
 from semver import VersionInfo
 from stdlib_utils import get_current_file_abs_directory
 
+from .constants import CONSOLIDATED_PLATE_FILE_FORMAT_VERSION_METADATA_KEY
 from .constants import CUSTOMER_ACCOUNT_ID_UUID
 from .constants import DATETIME_STR_FORMAT
+from .constants import DEFAULT_MAX_OPEN_H5_FILES
+from .constants import DEFAULT_READING_BLOCK_SIZE
 from .constants import FILE_FORMAT_VERSION_METADATA_KEY
 from .constants import IS_FILE_ORIGINAL_UNTRIMMED_UUID
 from .constants import MANTARRAY_SERIAL_NUMBER_UUID
 from .constants import MICROSECONDS_PER_CENTIMILLISECOND
 from .constants import MIN_SUPPORTED_FILE_VERSION
+from .constants import NUM_SAMPLES_METADATA_KEY
 from .constants import PLATE_BARCODE_UUID
 from .constants import REF_SAMPLING_PERIOD_UUID
 from .constants import REFERENCE_SENSOR_READINGS
+from .constants import SENSOR_OVERVIEWS_GROUP_NAME
 from .constants import START_RECORDING_TIME_INDEX_UUID
 from .constants import TISSUE_SAMPLING_PERIOD_UUID
 from .constants import TISSUE_SENSOR_READINGS
@@ -40,93 +60,255 @@ from .constants import UTC_BEGINNING_RECORDING_UUID
 from .constants import UTC_FIRST_REF_DATA_POINT_UUID
 from .constants import UTC_FIRST_TISSUE_DATA_POINT_UUID
 from .constants import WELL_INDEX_UUID
+from .constants import WELL_METADATA_GROUP_NAME
 from .constants import WELL_NAME_UUID
+from .decimation import decimate_samples
+from .decimation import reduce_to_min_max_bins
 from .exceptions import FileAttributeNotFoundError
+from .exceptions import NotAConsolidatedPlateFileError
 from .exceptions import UnsupportedMantarrayFileVersionError
 from .exceptions import WellRecordingsNotFromSameSessionError
+from .time_axis import TimeAxis
+
+if TYPE_CHECKING:
+    from .catalog import MetadataCatalog
 
 PATH_OF_CURRENT_FILE = get_current_file_abs_directory()
 
+S = TypeVar("S")
+T = TypeVar("T")
+
+_MANTARRAY_FILE_NAME_PATTERN = re.compile(
+    r"^(?P<plate_barcode>.+?)__(?P<timestamp>\d{4}_\d{2}_\d{2}_\d{6})__(?P<well_name>[A-Z]+\d+)(?:_.*)?\.h5$"
+)
+MANTARRAY_FILE_NAME_TIMESTAMP_FORMAT = "%Y_%m_%d_%H%M%S"
+
 
-def _get_file_attr(h5_file: h5py.File, attr_name: str, file_version: str) -> Any:
+def _get_file_attr(
+    h5_file: Union[h5py.File, "_FileAttributes"], attr_name: str, file_version: str
+) -> Any:
     if attr_name not in h5_file.attrs:
         file_path = h5_file.filename
         raise FileAttributeNotFoundError(attr_name, file_version, file_path)
     return h5_file.attrs[attr_name]
 
 
-def get_unique_files_from_directory(directory: str) -> List[str]:
+def parse_mantarray_file_name(file_path: str) -> Optional[Dict[str, Any]]:
+    """Extract the metadata encoded in a Mantarray file name.
+
+    Files are named ``<barcode>__<YYYY_MM_DD_HHMMSS>__<well>.h5``, optionally with a suffix after the well name (e.g. from trimming or migrating).
+
+    Args:
+        file_path: the path to the H5 file
+
+    Returns:
+        The ``plate_barcode``, ``well_name`` and UTC ``timestamp`` from the file name, or None if the name doesn't follow the pattern.
+    """
+    match = _MANTARRAY_FILE_NAME_PATTERN.match(os.path.basename(file_path))
+    if match is None:
+        return None
+    try:
+        timestamp = datetime.datetime.strptime(
+            match.group("timestamp"), MANTARRAY_FILE_NAME_TIMESTAMP_FORMAT
+        ).replace(tzinfo=datetime.timezone.utc)
+    except ValueError:
+        return None
+    return {
+        "plate_barcode": match.group("plate_barcode"),
+        "well_name": match.group("well_name"),
+        "timestamp": timestamp,
+    }
+
+
+def scan_files(
+    func: Callable[[S], T],
+    file_paths: Sequence[S],
+    max_workers: Optional[int] = 1,
+    use_processes: bool = True,
+) -> List[T]:
+    """Apply a function to every file path, optionally sharded across a pool.
+
+    Args:
+        func: the function to call on each file path. Must be picklable (i.e. defined at module level) when using processes.
+        file_paths: the file paths to scan
+        max_workers: the number of workers in the pool. 1 scans serially in this thread, None uses as many workers as there are CPUs.
+        use_processes: whether to use a process pool (best for h5py parsing, which holds the GIL) or a thread pool (best when bound by network share latency)
+
+    Returns:
+        The results in the same order as file_paths, regardless of the order the workers finish in.
+    """
+    if max_workers == 1 or len(file_paths) <= 1:
+        return [func(iter_path) for iter_path in file_paths]
+    num_workers = max_workers if max_workers is not None else os.cpu_count() or 1
+    chunksize = max(1, len(file_paths) // (num_workers * 4))
+    executor: Executor
+    if use_processes:
+        executor = ProcessPoolExecutor(max_workers=num_workers)
+    else:
+        executor = ThreadPoolExecutor(max_workers=num_workers)
+    with executor:
+        return list(executor.map(func, file_paths, chunksize=chunksize))
+
+
+def iter_h5_files_in_directory(directory: str) -> Iterator[str]:
+    """Yield the path of each h5 file in a directory tree as soon as its directory is listed.
+
+    Files are yielded in the same order as os.walk would list them, but without waiting for the whole tree to be listed. As with os.walk, directories that cannot be listed are skipped and symlinks to directories are not followed.
+
+    Args:
+        directory: the master folder for which all h5 files reside
+    """
+    subdirectories: List[str] = []
+    h5_files: List[str] = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                    is_h5_file = entry.is_file() and entry.name.endswith(".h5")
+                    is_symlink = entry.is_symlink()
+                except OSError:
+                    continue
+                if is_dir:
+                    # like os.walk, symlinks to directories are not followed
+                    if not is_symlink:
+                        subdirectories.append(entry.path)
+                elif is_h5_file:
+                    h5_files.append(entry.path)
+    except OSError:
+        # like os.walk, directories that cannot be listed (e.g. removed or unreadable) are skipped
+        return
+    yield from h5_files
+    for iter_subdirectory in subdirectories:
+        yield from iter_h5_files_in_directory(iter_subdirectory)
+
+
+def _get_dedup_key(file_path: str) -> Tuple[int, str, datetime.datetime]:
+    well = WellFile(file_path)
+    return (
+        well.get_well_index(),
+        well.get_plate_barcode(),
+        well.get_begin_recording(),
+    )
+
+
+def iter_unique_files_from_directory(directory: str) -> Iterator[str]:
+    """Yield each unique h5 file in a directory tree as soon as it is found.
+
+    Args:
+        directory: the master folder for which all h5 files reside
+    """
+    seen_keys: Set[Tuple[int, str, datetime.datetime]] = set()
+    for iter_file in iter_h5_files_in_directory(directory):
+        key = _get_dedup_key(iter_file)
+        if key in seen_keys:
+            continue
+        seen_keys.add(key)
+        yield iter_file
+
+
+def get_unique_files_from_directory(
+    directory: str,
+    catalog: Optional["MetadataCatalog"] = None,
+    max_workers: Optional[int] = 1,
+    use_processes: bool = True,
+) -> List[str]:
     """Obtain a list of all unique h5 files in the current directory.
 
     Args:
         directory: the master folder for which all h5 files reside
+        catalog: if given, the catalog is refreshed (only opening new or changed files) and the result is answered from it
+        max_workers: the number of workers to read file metadata with. See scan_files
+        use_processes: whether the workers are processes or threads. See scan_files
 
     Returns:
         A list of the file paths for all the h5 files in the directory.
     """
-    unique_files: List[str] = []
+    if catalog is not None:
+        catalog.refresh_directory(
+            directory, max_workers=max_workers, use_processes=use_processes
+        )
+        return catalog.get_unique_files(directory)
 
-    for path, _, files in os.walk(directory):
-        for name in files:
-            if not name.endswith(".h5"):
-                continue
+    if max_workers == 1:
+        return list(iter_unique_files_from_directory(directory))
 
-            file = os.path.join(path, name)
-            well = WellFile(file)
-            index = well.get_well_index()
-            barcode = well.get_plate_barcode()
-            start_time = well.get_begin_recording()
-
-            for item in unique_files:
-                new_well = WellFile(item)
-                if (
-                    new_well.get_well_index() == index
-                    and new_well.get_plate_barcode() == barcode
-                    and new_well.get_begin_recording() == start_time
-                ):
-                    break
-            else:
-                unique_files.append(file)
+    unique_files: List[str] = []
+    seen_keys: Set[Tuple[int, str, datetime.datetime]] = set()
+
+    h5_files = list(iter_h5_files_in_directory(directory))
+    keys = scan_files(
+        _get_dedup_key, h5_files, max_workers=max_workers, use_processes=use_processes
+    )
+    for file, key in zip(h5_files, keys):
+        if key in seen_keys:
+            continue
+        seen_keys.add(key)
+        unique_files.append(file)
 
     return unique_files
 
 
+def _file_matches_search_criteria(
+    file: str, search_criteria: str, criteria_value: str
+) -> bool:
+    well = WellFile(file)
+    if search_criteria == "Well Name":
+        return well.get_well_name() == criteria_value
+    if search_criteria == "Plate Barcode":
+        return well.get_plate_barcode() == criteria_value
+    if search_criteria == "User ID":
+        return well.get_user_account() == criteria_value
+    if search_criteria == "Account ID":
+        return well.get_customer_account() == criteria_value
+    if search_criteria == "Mantarray Serial Number":
+        return well.get_mantarray_serial_number() == criteria_value
+    return False
+
+
 def get_specified_files(
-    search_criteria: str, criteria_value: str, unique_files: List[str]
+    search_criteria: str,
+    criteria_value: str,
+    unique_files: List[str],
+    catalog: Optional["MetadataCatalog"] = None,
+    max_workers: Optional[int] = 1,
+    use_processes: bool = True,
 ) -> Dict[str, Dict[str, List[str]]]:
     """Obtain a subset of all the h5 files based on search criteria from user.
 
     Args:
         search_criteria: A str representing a UUID to a piece a metadata to filter results
+        catalog: if given, the search is answered from the catalog, only opening the H5 files which are not cataloged or have changed since
+        max_workers: the number of workers to read file metadata with. See scan_files
+        use_processes: whether the workers are processes or threads. See scan_files
 
     Returns:
         a dictionary of the Plate Recordings that fall under the specified search criteria.
     """
+    if catalog is not None:
+        return catalog.get_specified_files(
+            search_criteria,
+            criteria_value,
+            unique_files,
+            max_workers=max_workers,
+            use_processes=use_processes,
+        )
     value_dict: Dict[str, List[str]] = {}
     full_dict: Dict[str, Dict[str, List[str]]] = {}
-    plate_recording_list: List[str] = []
 
-    for file in unique_files:
-        well = WellFile(file)
-        if search_criteria == "Well Name" and well.get_well_name() == criteria_value:
-            plate_recording_list.append(file)
-        if (
-            search_criteria == "Plate Barcode"
-            and well.get_plate_barcode() == criteria_value
-        ):
-            plate_recording_list.append(file)
-        if search_criteria == "User ID" and well.get_user_account() == criteria_value:
-            plate_recording_list.append(file)
-        if (
-            search_criteria == "Account ID"
-            and well.get_customer_account() == criteria_value
-        ):
-            plate_recording_list.append(file)
-        if (
-            search_criteria == "Mantarray Serial Number"
-            and well.get_mantarray_serial_number() == criteria_value
-        ):
-            plate_recording_list.append(file)
+    matches = scan_files(
+        functools.partial(
+            _file_matches_search_criteria,
+            search_criteria=search_criteria,
+            criteria_value=criteria_value,
+        ),
+        unique_files,
+        max_workers=max_workers,
+        use_processes=use_processes,
+    )
+    plate_recording_list = [
+        file for file, is_match in zip(unique_files, matches) if is_match
+    ]
 
     value_dict = {criteria_value: plate_recording_list}
     full_dict = {search_criteria: value_dict}
@@ -135,7 +317,7 @@ def get_specified_files(
 
 
 def _extract_datetime_from_h5(
-    open_h5_file: h5py.File,
+    open_h5_file: Union[h5py.File, "_FileAttributes"],
     file_version: str,
     metadata_uuid: UUID,
 ) -> datetime.datetime:
@@ -182,28 +364,292 @@ def _extract_datetime_from_h5(
     )
 
 
+class _FileAttributes:  # pylint: disable=too-few-public-methods # only needs to look like an h5py File to the attribute readers
+    """The attributes of a well, looked up once.
+
+    Has the same ``attrs`` and ``filename`` interface as an h5py File,
+    so the attribute readers can parse it. h5py looks up the root group
+    every time ``attrs`` is accessed on a File, and reading an attribute
+    is slow, so only the attributes the readers ask for are read.
+    """
+
+    def __init__(self, attrs: h5py.AttributeManager, filename: str) -> None:
+        self.attrs = attrs
+        self.filename = filename
+
+
+class WellFileMetadata(NamedTuple):
+    """Immutable snapshot of the metadata of a WellFile, parsed into Python types.
+
+    Any metadata that is missing from the file (or can't be parsed) is None.
+    """
+
+    file_version: str
+    plate_barcode: Optional[str]
+    well_name: Optional[str]
+    well_index: Optional[int]
+    mantarray_serial_number: Optional[str]
+    user_account: Optional[UUID]
+    customer_account: Optional[UUID]
+    begin_recording: Optional[datetime.datetime]
+    beginning_of_data_acquisition: Optional[datetime.datetime]
+    first_tissue_data_point: Optional[datetime.datetime]
+    first_ref_data_point: Optional[datetime.datetime]
+    # pylint: disable=invalid-name # named after the matching WellFile getters
+    tissue_sampling_period_microseconds: Optional[int]
+    reference_sampling_period_microseconds: Optional[int]
+    # pylint: enable=invalid-name
+    recording_start_index: Optional[int]
+
+
+_METADATA_READERS: Dict[str, Callable[[_FileAttributes, str], Any]] = {
+    "plate_barcode": lambda attrs, file_version: str(
+        _get_file_attr(attrs, str(PLATE_BARCODE_UUID), file_version)
+    ),
+    "well_name": lambda attrs, file_version: str(
+        _get_file_attr(attrs, str(WELL_NAME_UUID), file_version)
+    ),
+    "well_index": lambda attrs, file_version: int(
+        _get_file_attr(attrs, str(WELL_INDEX_UUID), file_version)
+    ),
+    "mantarray_serial_number": lambda attrs, file_version: str(
+        _get_file_attr(attrs, str(MANTARRAY_SERIAL_NUMBER_UUID), file_version)
+    ),
+    "user_account": lambda attrs, file_version: UUID(
+        _get_file_attr(attrs, str(USER_ACCOUNT_ID_UUID), file_version)
+    ),
+    "customer_account": lambda attrs, file_version: UUID(
+        _get_file_attr(attrs, str(CUSTOMER_ACCOUNT_ID_UUID), file_version)
+    ),
+    "begin_recording": lambda attrs, file_version: _extract_datetime_from_h5(
+        attrs, file_version, UTC_BEGINNING_RECORDING_UUID
+    ),
+    "beginning_of_data_acquisition": lambda attrs, file_version: _extract_datetime_from_h5(
+        attrs, file_version, UTC_BEGINNING_DATA_ACQUISTION_UUID
+    ),
+    "first_tissue_data_point": lambda attrs, file_version: _extract_datetime_from_h5(
+        attrs, file_version, UTC_FIRST_TISSUE_DATA_POINT_UUID
+    ),
+    "first_ref_data_point": lambda attrs, file_version: _extract_datetime_from_h5(
+        attrs, file_version, UTC_FIRST_REF_DATA_POINT_UUID
+    ),
+    "tissue_sampling_period_microseconds": lambda attrs, file_version: int(
+        _get_file_attr(attrs, str(TISSUE_SAMPLING_PERIOD_UUID), file_version)
+    ),
+    "reference_sampling_period_microseconds": lambda attrs, file_version: int(
+        _get_file_attr(attrs, str(REF_SAMPLING_PERIOD_UUID), file_version)
+    ),
+    "recording_start_index": lambda attrs, file_version: int(
+        _get_file_attr(attrs, str(START_RECORDING_TIME_INDEX_UUID), file_version)
+    ),
+}
+
+
+class H5FileHandlePool:
+    """Bounded pool of open H5 file handles, closing the least recently used.
+
+    Each owner (e.g. a WellFile) gets its own handle, which is opened on demand and transparently reopened if it was evicted or closed.
+
+    A handle from get_file may be closed by any later call to the pool, so handles that are read from while other threads use the pool must be leased instead. Leased handles are never closed, so the pool holds more than max_open_files while more handles than that are leased.
+
+    Args:
+        max_open_files: the maximum number of H5 files kept open at once, other than leased ones.
+    """
+
+    def __init__(self, max_open_files: int) -> None:
+        self._max_open_files = max_open_files
+        self._open_files: "OrderedDict[int, h5py.File]" = OrderedDict()
+        self._num_leases: Dict[int, int] = dict()
+        # files closed while they were leased, which are closed once the last lease is released
+        self._owners_to_close: Set[int] = set()
+        # re-entrant, because garbage collection while the lock is held can run the __del__ of another WellFile, which closes its file
+        self._lock = threading.RLock()
+
+    def get_max_open_files(self) -> int:
+        return self._max_open_files
+
+    def set_max_open_files(self, max_open_files: int) -> None:
+        with self._lock:
+            self._max_open_files = max_open_files
+            self._evict_least_recently_used()
+
+    def get_num_open_files(self) -> int:
+        return len(self._open_files)
+
+    def is_open(self, owner_key: int) -> bool:
+        return owner_key in self._open_files
+
+    def is_leased(self, owner_key: int) -> bool:
+        return owner_key in self._num_leases
+
+    def get_file(self, owner_key: int, file_name: str) -> h5py.File:
+        """Get the open handle of an owner, opening the file if needed.
+
+        The handle may be closed by the next call to the pool. Use lease to keep it open while reading from it.
+        """
+        with self._lock:
+            h5_file = self._open_files.pop(owner_key, None)
+            if h5_file is None or not h5_file:  # h5py Files are falsy once closed
+                h5_file = h5py.File(file_name, "r")
+            self._open_files[owner_key] = h5_file
+            self._owners_to_close.discard(owner_key)
+            self._evict_least_recently_used(owner_key_to_keep=owner_key)
+            return h5_file
+
+    @contextmanager
+    def lease(self, owner_key: int, file_name: str) -> Iterator[h5py.File]:
+        """Get the open handle of an owner, keeping it open until the end of the with block.
+
+        Leases can be nested, and the same handle can be leased by several threads at once.
+        """
+        with self._lock:
+            self._num_leases[owner_key] = self._num_leases.get(owner_key, 0) + 1
+            try:
+                h5_file = self.get_file(owner_key, file_name)
+            except BaseException:
+                self._release(owner_key)
+                raise
+        try:
+            yield h5_file
+        finally:
+            with self._lock:
+                self._release(owner_key)
+
+    def _release(self, owner_key: int) -> None:
+        num_leases = self._num_leases.pop(owner_key) - 1
+        if num_leases > 0:
+            self._num_leases[owner_key] = num_leases
+            return
+        if owner_key in self._owners_to_close:
+            self.close_file(owner_key)
+        self._evict_least_recently_used()
+
+    def close_file(self, owner_key: int) -> None:
+        """Close the handle of an owner, or once it is no longer leased."""
+        with self._lock:
+            if owner_key in self._num_leases:
+                self._owners_to_close.add(owner_key)
+                return
+            self._owners_to_close.discard(owner_key)
+            h5_file = self._open_files.pop(owner_key, None)
+        if h5_file is not None:
+            h5_file.close()
+
+    def _evict_least_recently_used(
+        self, owner_key_to_keep: Optional[int] = None
+    ) -> None:
+        num_to_evict = len(self._open_files) - self._max_open_files
+        if num_to_evict <= 0:
+            return
+        owners_to_evict = [
+            iter_key
+            for iter_key in tuple(self._open_files)
+            if iter_key not in self._num_leases and iter_key != owner_key_to_keep
+        ][:num_to_evict]
+        for iter_key in owners_to_evict:
+            h5_file = self._open_files.pop(iter_key, None)
+            if h5_file is not None:
+                h5_file.close()
+
+
+_H5_FILE_HANDLE_POOL = H5FileHandlePool(DEFAULT_MAX_OPEN_H5_FILES)
+
+
+def get_h5_file_handle_pool() -> H5FileHandlePool:
+    """Get the pool which holds the open H5 files of all WellFiles."""
+    return _H5_FILE_HANDLE_POOL
+
+
+def get_memmap_of_dataset(dataset: h5py.Dataset) -> Optional["np.memmap[Any, Any]"]:
+    """Memory-map a dataset directly from its file, if its layout allows it.
+
+    This is only possible for datasets stored contiguously, which excludes chunked (and therefore compressed) datasets.
+
+    Args:
+        dataset: the open H5 dataset
+
+    Returns:
+        A read-only memory map of the dataset, or None if it cannot be mapped.
+    """
+    if dataset.chunks is not None:
+        return None
+    byte_offset = dataset.id.get_offset()
+    if byte_offset is None:  # storage has not been allocated (e.g. an empty dataset)
+        return None
+    return np.memmap(
+        dataset.file.filename,
+        dtype=dataset.dtype,
+        mode="r",
+        offset=byte_offset,
+        shape=dataset.shape,
+    )
+
+
+def _get_time_range(time_axes: Sequence[TimeAxis]) -> Tuple[int, int]:
+    """Get the range of time spanned by all samples of the time axes.
+
+    Returns:
+        The earliest time and the time just after the latest one. Both are 0 if there are no samples.
+    """
+    non_empty_axes = [iter_axis for iter_axis in time_axes if len(iter_axis) > 0]
+    if not non_empty_axes:
+        return 0, 0
+    return (
+        min(int(iter_axis[0]) for iter_axis in non_empty_axes),
+        max(int(iter_axis[-1]) for iter_axis in non_empty_axes) + 1,
+    )
+
+
 class BasicWellFile:
     """Very thin wrapper around an H5 file for a single well of data.
 
     Used typically just for assessing file version when migrating.
 
+    The H5 file is held in the shared H5FileHandlePool, so it may be closed to stay under the limit of open files, and is reopened the next time it is needed. It can also be closed explicitly with close(), or by using the object as a context manager.
+
     Args:
         file_name: The path of the H5 file to open.
-
-    Attributes:
-        _h5_file: The opened H5 file object.
     """
 
     def __init__(self, file_name: str) -> None:
-        self._h5_file: h5py.File = h5py.File(
-            file_name,
-            "r",
-        )
         self._file_name = file_name
-        self._file_version: str = self._h5_file.attrs[FILE_FORMAT_VERSION_METADATA_KEY]
+        with self.lease_h5_file():
+            self._file_version: str = self.get_h5_attributes()[
+                FILE_FORMAT_VERSION_METADATA_KEY
+            ]
+
+    def _get_pool_key(self) -> int:
+        return id(self)
 
     def get_h5_file(self) -> h5py.File:
-        return self._h5_file
+        """Get the open H5 file.
+
+        It may be closed by any later use of the pool of open files, e.g. by another thread. Use lease_h5_file to keep it open while reading from it.
+        """
+        return _H5_FILE_HANDLE_POOL.get_file(self._get_pool_key(), self._file_name)
+
+    def lease_h5_file(self) -> ContextManager[h5py.File]:
+        """Keep the H5 file open until the end of a with block.
+
+        Within the block, get_h5_file gives the same open file.
+        """
+        return _H5_FILE_HANDLE_POOL.lease(self._get_pool_key(), self._file_name)
+
+    def get_h5_attributes(self) -> h5py.AttributeManager:
+        """Get the H5 attributes holding the metadata of the well."""
+        return self.get_h5_file().attrs
+
+    def is_open(self) -> bool:
+        return _H5_FILE_HANDLE_POOL.is_open(self._get_pool_key())
+
+    def close(self) -> None:
+        _H5_FILE_HANDLE_POOL.close_file(self._get_pool_key())
+
+    def __enter__(self) -> "BasicWellFile":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
 
     def get_file_name(self) -> str:
         return self._file_name
@@ -212,84 +658,55 @@ class BasicWellFile:
         return self._file_version
 
     def get_h5_attribute(self, attr_name: str) -> Any:
-        return _get_file_attr(self._h5_file, attr_name, self._file_version)
+        with self.lease_h5_file():
+            return _get_file_attr(
+                _FileAttributes(self.get_h5_attributes(), self._file_name),
+                attr_name,
+                self._file_version,
+            )
 
     def __del__(self) -> None:
-        self._h5_file.close()
+        self.close()
 
 
 class WellFileMixIn:
     # pylint: disable=too-few-public-methods # Eli (1/18/21): If these mixins don't have these base attributes then mypy complains
     _file_version: str
-    _h5_file: h5py.File
+    _get_metadata_value: Callable[[str], Any]
 
 
 class PlateMetadataMixIn(WellFileMixIn):
     # pylint: disable=too-few-public-methods # Eli (1/18/21): I think its better to keep these MixIns well separated for better future flexibility
     def get_plate_barcode(self) -> str:
-        return str(
-            _get_file_attr(
-                self._h5_file,
-                str(PLATE_BARCODE_UUID),
-                self._file_version,
-            )
-        )
+        return str(self._get_metadata_value("plate_barcode"))
 
 
 class WellMetadataMixIn(WellFileMixIn):
     """Mixin for metadata related to the well itself."""
 
     def get_well_name(self) -> str:
-        return str(
-            _get_file_attr(
-                self._h5_file,
-                str(WELL_NAME_UUID),
-                self._file_version,
-            )
-        )
+        return str(self._get_metadata_value("well_name"))
 
     def get_well_index(self) -> int:
-        return int(
-            _get_file_attr(
-                self._h5_file,
-                str(WELL_INDEX_UUID),
-                self._file_version,
-            )
-        )
+        return int(self._get_metadata_value("well_index"))
 
 
 class InstrumentMetadataMixIn(WellFileMixIn):
     # pylint: disable=too-few-public-methods # Eli (1/18/21): I think its better to keep these MixIns well separated for better future flexibility
     def get_mantarray_serial_number(self) -> str:
-        return str(
-            _get_file_attr(
-                self._h5_file,
-                str(MANTARRAY_SERIAL_NUMBER_UUID),
-                self._file_version,
-            )
-        )
+        return str(self._get_metadata_value("mantarray_serial_number"))
 
 
 class CustomerMetadataMixIn(WellFileMixIn):
     """Mixin for metadata related to the customer."""
 
     def get_user_account(self) -> UUID:
-        return UUID(
-            _get_file_attr(
-                self._h5_file,
-                str(USER_ACCOUNT_ID_UUID),
-                self._file_version,
-            )
-        )
+        user_account: UUID = self._get_metadata_value("user_account")
+        return user_account
 
     def get_customer_account(self) -> UUID:
-        return UUID(
-            _get_file_attr(
-                self._h5_file,
-                str(CUSTOMER_ACCOUNT_ID_UUID),
-                self._file_version,
-            )
-        )
+        customer_account: UUID = self._get_metadata_value("customer_account")
+        return customer_account
 
 
 class LikelyConsistentMetadata(
@@ -304,22 +721,86 @@ class LikelyConsistentMetadata(
 class WellFile(
     BasicWellFile, LikelyConsistentMetadata
 ):  # pylint: disable=too-many-ancestors # Eli (7/28/20): I don't see a way around this...we need to subclass h5py File
+    # pylint: disable=too-many-public-methods # the readings can be read whole, in windows, in blocks, decimated or from overviews, and each has its own method
     """Wrapper around an H5 file for a single well of data.
 
     This is only guaranteed to function correctly on the current working file format version.
     Use the file migrate_to_latest_version to get files up to date with the current working version.
 
+    Times are centi-milliseconds stored as int32, unless a recording is too long for them to fit (about 5.9 hours), in which case they are int64. The raw readings have the same dtype as their times.
+
     Args:
         file_name: The path of the H5 file to open.
-
-    Attributes:
-        _h5_file: The opened H5 file object.
+        use_wide_times: whether to always give times as int64, so that all recordings have the same dtype regardless of length.
+        use_memmap: whether to read sensor values through a memory map of the file when the dataset is stored contiguously. Sensor values are then read-only views backed by the OS page cache, and the memory maps are released by close. Otherwise they are read with h5py.
     """
 
-    def __init__(self, file_name: str) -> None:
+    def __init__(
+        self, file_name: str, use_wide_times: bool = False, use_memmap: bool = False
+    ) -> None:
+        # set before opening the file, because a WellFile that fails to open is still closed when it is collected
+        self._sensor_memmaps: Dict[str, Optional["np.memmap[Any, Any]"]] = dict()
         super().__init__(file_name)
+        self._use_wide_times = use_wide_times
+        self._use_memmap = use_memmap
         self._raw_tissue_reading: Optional[NDArray[(2, Any), int]] = None
         self._raw_ref_reading: Optional[NDArray[(2, Any), int]] = None
+        self._time_axes: Dict[str, TimeAxis] = dict()
+        self._metadata: Optional[WellFileMetadata] = None
+        self._metadata_values: Dict[str, Any] = dict()
+        self._metadata_errors: Dict[str, Exception] = dict()
+
+    def close(self) -> None:
+        """Close the H5 file and release the memory maps of the sensor datasets.
+
+        Sensor values already read through a memory map keep it open until they are garbage collected. Reading again reopens the file and maps it again.
+        """
+        self._sensor_memmaps.clear()
+        super().close()
+
+    def load_metadata(self, field_names: Sequence[str]) -> None:
+        """Read and parse some of the metadata now, instead of when it is first used.
+
+        Each field is only read from the file once. This is useful to read the metadata while the file is known to be open.
+
+        Args:
+            field_names: the fields of WellFileMetadata to read
+        """
+        field_names_to_read = [
+            iter_name
+            for iter_name in field_names
+            if iter_name not in self._metadata_values
+        ]
+        if not field_names_to_read:
+            return
+        with self.lease_h5_file():
+            attributes = _FileAttributes(self.get_h5_attributes(), self._file_name)
+            for iter_name in field_names_to_read:
+                try:
+                    value = _METADATA_READERS[iter_name](attributes, self._file_version)
+                except (FileAttributeNotFoundError, ValueError, TypeError) as e:
+                    # the error is raised again if the getter for this metadata is called
+                    value = None
+                    self._metadata_errors[iter_name] = e
+                self._metadata_values[iter_name] = value
+
+    def get_metadata(self) -> WellFileMetadata:
+        """Get a snapshot of all the metadata used by the getters.
+
+        Each getter only reads and parses its own metadata, the first time it is called. This reads whatever the getters have not read yet.
+        """
+        if self._metadata is None:
+            self.load_metadata(tuple(_METADATA_READERS))
+            self._metadata = WellFileMetadata(
+                file_version=self._file_version, **self._metadata_values
+            )
+        return self._metadata
+
+    def _get_metadata_value(self, field_name: str) -> Any:
+        self.load_metadata((field_name,))
+        if field_name in self._metadata_errors:
+            raise self._metadata_errors[field_name]
+        return self._metadata_values[field_name]
 
     def get_unique_recording_key(self) -> Tuple[str, datetime.datetime]:
         barcode = self.get_plate_barcode()
@@ -327,42 +808,30 @@ class WellFile(
         return barcode, start_time
 
     def get_timestamp_of_beginning_of_data_acquisition(self) -> datetime.datetime:
-        return _extract_datetime_from_h5(
-            self._h5_file, self._file_version, UTC_BEGINNING_DATA_ACQUISTION_UUID
+        timestamp: datetime.datetime = self._get_metadata_value(
+            "beginning_of_data_acquisition"
         )
+        return timestamp
 
     def get_begin_recording(self) -> datetime.datetime:
-        return _extract_datetime_from_h5(
-            self._h5_file, self._file_version, UTC_BEGINNING_RECORDING_UUID
-        )
+        timestamp: datetime.datetime = self._get_metadata_value("begin_recording")
+        return timestamp
 
     def get_timestamp_of_first_tissue_data_point(self) -> datetime.datetime:
-        return _extract_datetime_from_h5(
-            self._h5_file, self._file_version, UTC_FIRST_TISSUE_DATA_POINT_UUID
+        timestamp: datetime.datetime = self._get_metadata_value(
+            "first_tissue_data_point"
         )
+        return timestamp
 
     def get_timestamp_of_first_ref_data_point(self) -> datetime.datetime:
-        return _extract_datetime_from_h5(
-            self._h5_file, self._file_version, UTC_FIRST_REF_DATA_POINT_UUID
-        )
+        timestamp: datetime.datetime = self._get_metadata_value("first_ref_data_point")
+        return timestamp
 
     def get_tissue_sampling_period_microseconds(self) -> int:
-        return int(
-            _get_file_attr(
-                self._h5_file,
-                str(TISSUE_SAMPLING_PERIOD_UUID),
-                self._file_version,
-            )
-        )
+        return int(self._get_metadata_value("tissue_sampling_period_microseconds"))
 
     def get_reference_sampling_period_microseconds(self) -> int:
-        return int(
-            _get_file_attr(
-                self._h5_file,
-                str(REF_SAMPLING_PERIOD_UUID),
-                self._file_version,
-            )
-        )
+        return int(self._get_metadata_value("reference_sampling_period_microseconds"))
 
     def get_recording_start_index(self) -> int:
         """Get the time index when recording was requested.
@@ -371,23 +840,11 @@ class WellFile(
         start of data acquisition that was displayed on the screen when
         the user pressed the Record button.
         """
-        return int(
-            _get_file_attr(
-                self._h5_file,
-                str(START_RECORDING_TIME_INDEX_UUID),
-                self._file_version,
-            )
-        )
-
-    def get_raw_tissue_reading(self) -> NDArray[(2, Any), int]:
-        """Get a value vs time array.
-
-        Time (centi-milliseconds) is first dimension, value is second
-        dimension.
+        return int(self._get_metadata_value("recording_start_index"))
 
-        Time is given relative to the start of the recording, so that arrays from different wells can be displayed together
-        """
-        if self._raw_tissue_reading is None:
+    def _get_time_axis(self, dataset_name: str) -> TimeAxis:
+        if dataset_name not in self._time_axes:
+            is_tissue = dataset_name == TISSUE_SENSOR_READINGS
             recording_start_index_useconds = (
                 self.get_recording_start_index() * MICROSECONDS_PER_CENTIMILLISECOND
             )
@@ -397,80 +854,516 @@ class WellFile(
             )
             time_delta = (
                 self.get_timestamp_of_first_tissue_data_point()
-                - timestamp_of_start_index
-            )
+                if is_tissue
+                else self.get_timestamp_of_first_ref_data_point()
+            ) - timestamp_of_start_index
             time_delta_centimilliseconds = int(
                 time_delta
                 / datetime.timedelta(microseconds=MICROSECONDS_PER_CENTIMILLISECOND)
             )
-
-            time_step = int(
+            sampling_period = (
                 self.get_tissue_sampling_period_microseconds()
-                / MICROSECONDS_PER_CENTIMILLISECOND
+                if is_tissue
+                else self.get_reference_sampling_period_microseconds()
             )
-            tissue_data = self._h5_file[TISSUE_SENSOR_READINGS]
-
-            times = np.arange(len(tissue_data), dtype=np.int32) * time_step
-            len_time = len(times)
+            time_step = int(sampling_period / MICROSECONDS_PER_CENTIMILLISECOND)
+            num_samples = self._get_num_sensor_samples(dataset_name)
 
             time_delta_centimilliseconds = self._check_for_trimmed_file(
-                times, time_delta_centimilliseconds
+                time_step, num_samples, time_delta_centimilliseconds
+            )
+            self._time_axes[dataset_name] = TimeAxis(
+                time_delta_centimilliseconds,
+                time_step,
+                num_samples,
+                dtype=self._get_time_dtype(
+                    time_delta_centimilliseconds, time_step, num_samples
+                ),
             )
+        return self._time_axes[dataset_name]
+
+    def _get_time_dtype(
+        self, time_offset: int, time_step: int, num_samples: int
+    ) -> "np.dtype[Any]":
+        if self._use_wide_times:
+            return np.dtype(np.int64)
+        int32_info = np.iinfo(np.int32)
+        last_time = time_offset + max(num_samples - 1, 0) * time_step
+        if (
+            int32_info.min <= min(time_offset, last_time)
+            and max(time_offset, last_time) <= int32_info.max
+        ):
+            return np.dtype(np.int32)
+        return np.dtype(np.int64)
+
+    def get_tissue_time_axis(self) -> TimeAxis:
+        """Get the times (centi-milliseconds) of the tissue readings.
+
+        Time is given relative to the start of the recording, the same as in get_raw_tissue_reading.
+        """
+        return self._get_time_axis(TISSUE_SENSOR_READINGS)
 
-            self._raw_tissue_reading = np.array(
-                (times + time_delta_centimilliseconds, tissue_data[:len_time]),
-                dtype=np.int32,
+    def get_reference_time_axis(self) -> TimeAxis:
+        """Get the times (centi-milliseconds) of the reference readings.
+
+        Time is given relative to the start of the recording, the same as in get_raw_reference_reading.
+        """
+        return self._get_time_axis(REFERENCE_SENSOR_READINGS)
+
+    def _get_indices_of_time_window(
+        self,
+        dataset_name: str,
+        start_centimilliseconds: Optional[int],
+        stop_centimilliseconds: Optional[int],
+    ) -> Tuple[int, int]:
+        time_axis = self._get_time_axis(dataset_name)
+        start_index = 0
+        stop_index = len(time_axis)
+        if start_centimilliseconds is not None:
+            start_index = int(time_axis.searchsorted(start_centimilliseconds))
+        if stop_centimilliseconds is not None:
+            stop_index = int(time_axis.searchsorted(stop_centimilliseconds))
+        return start_index, max(start_index, stop_index)
+
+    def _read_sensor_values(
+        self,
+        dataset_name: str,
+        start_index: Optional[int],
+        stop_index: Optional[int],
+    ) -> Tuple[TimeAxis, NDArray[(1, Any), int]]:
+        time_axis = self._get_time_axis(dataset_name)
+        sample_indices = range(len(time_axis))[start_index:stop_index]
+        sensor_selection = slice(
+            sample_indices.start, sample_indices.start + len(sample_indices)
+        )
+        sensor_memmap = self._get_sensor_memmap(dataset_name)
+        if sensor_memmap is not None:
+            sensor_values = sensor_memmap[self._get_sensor_selection(sensor_selection)]
+        else:
+            with self.lease_h5_file():
+                # only the requested hyperslab is read from the H5 file
+                sensor_values = self._get_sensor_dataset(dataset_name)[
+                    self._get_sensor_selection(sensor_selection)
+                ]
+        return time_axis[start_index:stop_index], sensor_values
+
+    def _get_sensor_dataset(self, dataset_name: str) -> h5py.Dataset:
+        """Get a sensor dataset. Must be called (and the dataset used) within lease_h5_file."""
+        return self.get_h5_file()[dataset_name]
+
+    def _get_sensor_selection(
+        self, sample_selection: slice
+    ) -> Union[slice, Tuple[int, slice]]:
+        """Get the selection of the sensor dataset holding a slice of samples."""
+        return sample_selection
+
+    def _get_num_sensor_samples(self, dataset_name: str) -> int:
+        with self.lease_h5_file():
+            return len(self._get_sensor_dataset(dataset_name))
+
+    def _get_sensor_memmap(self, dataset_name: str) -> Optional["np.memmap[Any, Any]"]:
+        if not self._use_memmap:
+            return None
+        if dataset_name not in self._sensor_memmaps:
+            with self.lease_h5_file():
+                self._sensor_memmaps[dataset_name] = get_memmap_of_dataset(
+                    self._get_sensor_dataset(dataset_name)
+                )
+        return self._sensor_memmaps[dataset_name]
+
+    def _read_sensor_values_into(
+        self,
+        dataset_name: str,
+        out: NDArray[(1, Any), int],
+        out_offset: int,
+        start_index: Optional[int],
+        stop_index: Optional[int],
+    ) -> int:
+        sample_indices = range(len(self._get_time_axis(dataset_name)))[
+            start_index:stop_index
+        ]
+        num_samples = len(sample_indices)
+        with self.lease_h5_file():
+            self._get_sensor_dataset(dataset_name).read_direct(
+                out,
+                source_sel=self._get_sensor_selection(
+                    np.s_[sample_indices.start : sample_indices.start + num_samples]
+                ),
+                dest_sel=np.s_[out_offset : out_offset + num_samples],
             )
-        return self._raw_tissue_reading
+        return num_samples
+
+    def _read_raw_reading(
+        self,
+        dataset_name: str,
+        start_index: Optional[int],
+        stop_index: Optional[int],
+    ) -> NDArray[(2, Any), int]:
+        time_axis, sensor_values = self._read_sensor_values(
+            dataset_name, start_index, stop_index
+        )
+        return np.array(
+            (time_axis.to_array(), sensor_values), dtype=time_axis.get_dtype()
+        )
+
+    def get_raw_tissue_reading_with_time_axis(
+        self, start_index: Optional[int] = None, stop_index: Optional[int] = None
+    ) -> Tuple[TimeAxis, NDArray[(1, Any), int]]:
+        """Get the tissue values with their times as a TimeAxis.
+
+        Unlike get_raw_tissue_reading, the times are not materialized and the values are not copied into a new 2D array.
+
+        Args:
+            start_index: the index of the first sample to get. Follows the rules of Python slicing, so it may be negative.
+            stop_index: the index of the sample to stop before. Follows the rules of Python slicing, so it may be negative.
+        """
+        return self._read_sensor_values(TISSUE_SENSOR_READINGS, start_index, stop_index)
+
+    def get_raw_reference_reading_with_time_axis(
+        self, start_index: Optional[int] = None, stop_index: Optional[int] = None
+    ) -> Tuple[TimeAxis, NDArray[(1, Any), int]]:
+        """Get the reference values with their times as a TimeAxis.
+
+        Unlike get_raw_reference_reading, the times are not materialized and the values are not copied into a new 2D array.
 
-    def get_raw_reference_reading(self) -> NDArray[(2, Any), int]:
+        Args:
+            start_index: the index of the first sample to get. Follows the rules of Python slicing, so it may be negative.
+            stop_index: the index of the sample to stop before. Follows the rules of Python slicing, so it may be negative.
+        """
+        return self._read_sensor_values(
+            REFERENCE_SENSOR_READINGS, start_index, stop_index
+        )
+
+    def get_raw_tissue_reading(
+        self, start_index: Optional[int] = None, stop_index: Optional[int] = None
+    ) -> NDArray[(2, Any), int]:
+        """Get a value vs time array.
+
+        Time (centi-milliseconds) is first dimension, value is second
+        dimension.
+
+        Time is given relative to the start of the recording, so that arrays from different wells can be displayed together
+
+        Args:
+            start_index: the index of the first sample to get. Follows the rules of Python slicing, so it may be negative.
+            stop_index: the index of the sample to stop before. Follows the rules of Python slicing, so it may be negative.
+        """
+        if start_index is None and stop_index is None:
+            if self._raw_tissue_reading is None:
+                self._raw_tissue_reading = self._read_raw_reading(
+                    TISSUE_SENSOR_READINGS, None, None
+                )
+            return self._raw_tissue_reading
+        if self._raw_tissue_reading is not None:
+            return self._raw_tissue_reading[:, start_index:stop_index]
+        return self._read_raw_reading(TISSUE_SENSOR_READINGS, start_index, stop_index)
+
+    def get_raw_reference_reading(
+        self, start_index: Optional[int] = None, stop_index: Optional[int] = None
+    ) -> NDArray[(2, Any), int]:
         """Get a reference value vs time array.
 
         Time (centi-milliseconds) is first dimension, reference value is second
         dimension.
 
         Time is given relative to the start of the recording, so that arrays from different wells can be displayed together
+
+        Args:
+            start_index: the index of the first sample to get. Follows the rules of Python slicing, so it may be negative.
+            stop_index: the index of the sample to stop before. Follows the rules of Python slicing, so it may be negative.
         """
-        if self._raw_ref_reading is None:
-            recording_start_index_useconds = (
-                self.get_recording_start_index() * MICROSECONDS_PER_CENTIMILLISECOND
+        if start_index is None and stop_index is None:
+            if self._raw_ref_reading is None:
+                self._raw_ref_reading = self._read_raw_reading(
+                    REFERENCE_SENSOR_READINGS, None, None
+                )
+            return self._raw_ref_reading
+        if self._raw_ref_reading is not None:
+            return self._raw_ref_reading[:, start_index:stop_index]
+        return self._read_raw_reading(
+            REFERENCE_SENSOR_READINGS, start_index, stop_index
+        )
+
+    def read_raw_tissue_values_into(
+        self,
+        out: NDArray[(1, Any), int],
+        out_offset: int = 0,
+        start_index: Optional[int] = None,
+        stop_index: Optional[int] = None,
+    ) -> int:
+        """Read tissue values from the H5 file directly into an existing array.
+
+        No intermediate arrays are created, so a large array (e.g. for a whole plate) can be allocated once and filled well by well. The times of the values are given by get_tissue_time_axis.
+
+        Args:
+            out: a writable, C-contiguous 1D array, such as a row of a 2D array. The values are converted to its dtype.
+            out_offset: the index in ``out`` to write the first value to
+            start_index: the index of the first sample to read. Follows the rules of Python slicing, so it may be negative.
+            stop_index: the index of the sample to stop before. Follows the rules of Python slicing, so it may be negative.
+
+        Returns:
+            The number of values read.
+        """
+        return self._read_sensor_values_into(
+            TISSUE_SENSOR_READINGS, out, out_offset, start_index, stop_index
+        )
+
+    def read_raw_reference_values_into(
+        self,
+        out: NDArray[(1, Any), int],
+        out_offset: int = 0,
+        start_index: Optional[int] = None,
+        stop_index: Optional[int] = None,
+    ) -> int:
+        """Read reference values from the H5 file directly into an existing array.
+
+        The times of the values are given by get_reference_time_axis. See read_raw_tissue_values_into for the arguments.
+
+        Returns:
+            The number of values read.
+        """
+        return self._read_sensor_values_into(
+            REFERENCE_SENSOR_READINGS, out, out_offset, start_index, stop_index
+        )
+
+    def _get_default_block_size(self, dataset_name: str) -> int:
+        with self.lease_h5_file():
+            chunk_shape = self._get_sensor_dataset(dataset_name).chunks
+        if chunk_shape is None:
+            return DEFAULT_READING_BLOCK_SIZE
+        # a whole number of chunks, so that no chunk is read for two blocks. Samples are along the last dimension
+        return int(
+            chunk_shape[-1] * max(1, DEFAULT_READING_BLOCK_SIZE // chunk_shape[-1])
+        )
+
+    def _iter_raw_reading_blocks(
+        self, dataset_name: str, block_size: Optional[int]
+    ) -> Iterator[NDArray[(2, Any), int]]:
+        if block_size is None:
+            block_size = self._get_default_block_size(dataset_name)
+        for iter_start_index in range(
+            0, len(self._get_time_axis(dataset_name)), block_size
+        ):
+            yield self._read_raw_reading(
+                dataset_name, iter_start_index, iter_start_index + block_size
             )
-            timestamp_of_start_index = (
-                self.get_timestamp_of_beginning_of_data_acquisition()
-                + datetime.timedelta(microseconds=recording_start_index_useconds)
+
+    def iter_raw_tissue_reading_blocks(
+        self, block_size: Optional[int] = None
+    ) -> Iterator[NDArray[(2, Any), int]]:
+        """Iterate over the value vs time array in blocks of samples.
+
+        Only one block is held in memory at a time, so recordings larger than memory can be processed. Each block has the same layout as get_raw_tissue_reading.
+
+        Args:
+            block_size: the number of samples per block (the last block may be smaller). Defaults to a whole number of HDF5 chunks close to DEFAULT_READING_BLOCK_SIZE.
+        """
+        return self._iter_raw_reading_blocks(TISSUE_SENSOR_READINGS, block_size)
+
+    def iter_raw_reference_reading_blocks(
+        self, block_size: Optional[int] = None
+    ) -> Iterator[NDArray[(2, Any), int]]:
+        """Iterate over the reference value vs time array in blocks of samples.
+
+        See iter_raw_tissue_reading_blocks.
+        """
+        return self._iter_raw_reading_blocks(REFERENCE_SENSOR_READINGS, block_size)
+
+    def iter_raw_reading_blocks(
+        self, block_duration_cms: Optional[int] = None
+    ) -> Iterator[Tuple[NDArray[(2, Any), int], NDArray[(2, Any), int]]]:
+        """Iterate over the tissue and reference readings in blocks of time.
+
+        Args:
+            block_duration_cms: the length of time (centi-milliseconds) covered by each block. Must be positive. Defaults to DEFAULT_READING_BLOCK_SIZE tissue samples.
+
+        Yields:
+            The tissue and reference readings within the same window of time. Either may be empty.
+        """
+        tissue_time_axis = self.get_tissue_time_axis()
+        if block_duration_cms is None:
+            block_duration_cms = (
+                DEFAULT_READING_BLOCK_SIZE * tissue_time_axis.get_step()
             )
-            time_delta = (
-                self.get_timestamp_of_first_ref_data_point() - timestamp_of_start_index
+        validate_int(value=block_duration_cms, minimum=1)
+        start_time, stop_time = _get_time_range(
+            [tissue_time_axis, self.get_reference_time_axis()]
+        )
+        for iter_start_time in range(start_time, stop_time, block_duration_cms):
+            iter_stop_time = iter_start_time + block_duration_cms
+            yield (
+                self.get_raw_tissue_reading_in_time_window(
+                    iter_start_time, iter_stop_time
+                ),
+                self.get_raw_reference_reading_in_time_window(
+                    iter_start_time, iter_stop_time
+                ),
             )
 
-            time_delta_centimilliseconds = int(
-                time_delta
-                / datetime.timedelta(microseconds=MICROSECONDS_PER_CENTIMILLISECOND)
-            )
+    def _read_times_and_sensor_values(
+        self, dataset_name: str, start_index: int, stop_index: int
+    ) -> Tuple[NDArray[(1, Any), int], NDArray[(1, Any), int]]:
+        time_axis, sensor_values = self._read_sensor_values(
+            dataset_name, start_index, stop_index
+        )
+        return time_axis.to_array(), sensor_values
+
+    def _decimate_reading(
+        self, dataset_name: str, num_points: int, method: str
+    ) -> NDArray[(2, Any), int]:
+        return decimate_samples(
+            functools.partial(self._read_times_and_sensor_values, dataset_name),
+            len(self._get_time_axis(dataset_name)),
+            num_points,
+            method=method,
+            block_size=self._get_default_block_size(dataset_name),
+        )
 
-            time_step = int(
-                self.get_reference_sampling_period_microseconds()
-                / MICROSECONDS_PER_CENTIMILLISECOND
-            )
+    def get_decimated_tissue_reading(
+        self, num_points: int, method: str = "min_max"
+    ) -> NDArray[(2, Any), int]:
+        """Get the value vs time array reduced to a number of points for display.
 
-            ref_data = self._h5_file[REFERENCE_SENSOR_READINGS]
+        The dataset is read in blocks, so the whole reading is never held in memory.
 
-            times = np.arange(len(ref_data), dtype=np.int32) * time_step
-            len_time = len(times)
+        Args:
+            num_points: the maximum number of points to keep
+            method: ``"min_max"`` keeps the minimum and maximum of each of ``num_points // 2`` bins. ``"lttb"`` keeps ``num_points`` points chosen by Largest-Triangle-Three-Buckets.
 
-            time_delta_centimilliseconds = self._check_for_trimmed_file(
-                times, time_delta_centimilliseconds
-            )
+        Returns:
+            The kept points in the layout of get_raw_tissue_reading.
+        """
+        return self._decimate_reading(TISSUE_SENSOR_READINGS, num_points, method)
+
+    def get_decimated_reference_reading(
+        self, num_points: int, method: str = "min_max"
+    ) -> NDArray[(2, Any), int]:
+        """Get the reference value vs time array reduced to a number of points for display.
+
+        See get_decimated_tissue_reading.
+        """
+        return self._decimate_reading(REFERENCE_SENSOR_READINGS, num_points, method)
+
+    def _get_overview_level(
+        self, dataset_name: str, max_reduction_factor: int
+    ) -> Tuple[int, Optional[h5py.Dataset]]:
+        """Find the coarsest stored overview that is not coarser than needed.
 
-            self._raw_ref_reading = np.array(
-                (times + time_delta_centimilliseconds, ref_data[:len_time]),
-                dtype=np.int32,
+        Must be called (and the overview used) within lease_h5_file.
+
+        Returns:
+            The reduction factor and the overview dataset, or 1 and None if the raw samples must be used.
+        """
+        overviews = self.get_h5_file().get(
+            f"{SENSOR_OVERVIEWS_GROUP_NAME}/{dataset_name}"
+        )
+        num_samples = len(self._get_time_axis(dataset_name))
+        best_level: Tuple[int, Optional[h5py.Dataset]] = (1, None)
+        if overviews is None:
+            return best_level
+        for iter_name, iter_overview in overviews.items():
+            reduction_factor = int(iter_name)
+            # an overview written for a different number of samples is out of date, so it can't be trusted
+            if iter_overview.shape != (2, -(-num_samples // reduction_factor)):
+                continue
+            if best_level[0] < reduction_factor <= max_reduction_factor:
+                best_level = (reduction_factor, iter_overview)
+        return best_level
+
+    def _get_overview(self, dataset_name: str, num_bins: int) -> NDArray[(3, Any), int]:
+        validate_int(value=num_bins, minimum=1)
+        time_axis = self._get_time_axis(dataset_name)
+        num_samples = len(time_axis)
+        samples_per_bin = max(1, -(-num_samples // num_bins))
+        # the stored overview is read block by block, so the file is kept open until the end
+        with self.lease_h5_file():
+            reduction_factor, overview = self._get_overview_level(
+                dataset_name, samples_per_bin
+            )
+            values_per_bin = -(-samples_per_bin // reduction_factor)
+            num_values = -(-num_samples // reduction_factor)
+            bin_time_axis = time_axis[:: reduction_factor * values_per_bin]
+            envelope = np.empty((3, len(bin_time_axis)), dtype=time_axis.get_dtype())
+            envelope[0] = bin_time_axis.to_array()
+            values_per_block = values_per_bin * max(
+                1, DEFAULT_READING_BLOCK_SIZE // values_per_bin
             )
+            for iter_block_start in range(0, num_values, values_per_block):
+                block_stop = min(iter_block_start + values_per_block, num_values)
+                if overview is None:
+                    _, minimums = self._read_sensor_values(
+                        dataset_name, iter_block_start, block_stop
+                    )
+                    maximums = minimums
+                else:
+                    minimums, maximums = overview[:, iter_block_start:block_stop]
+                first_bin = iter_block_start // values_per_bin
+                block_minimums, block_maximums = reduce_to_min_max_bins(
+                    minimums, maximums, values_per_bin
+                )
+                block_bins = slice(first_bin, first_bin + len(block_minimums))
+                envelope[1, block_bins] = block_minimums
+                envelope[2, block_bins] = block_maximums
+        return envelope
+
+    def get_tissue_overview(self, num_bins: int) -> NDArray[(3, Any), int]:
+        """Get the minimum and maximum tissue value of each bin of time, for zoomed-out display.
+
+        The overview stored in the file (see write_sensor_overviews) with the largest reduction factor that still gives at least num_bins bins is used, so only a fraction of the samples are read. Without stored overviews the raw samples are read in blocks.
+
+        Args:
+            num_bins: the maximum number of bins. Each bin covers the same whole number of samples (the last bin may be partial), so there may be fewer.
+
+        Returns:
+            The time of the first sample of each bin in the first row, and the minimum and maximum value of each bin in the second and third rows.
+        """
+        return self._get_overview(TISSUE_SENSOR_READINGS, num_bins)
 
-        return self._raw_ref_reading
+    def get_reference_overview(self, num_bins: int) -> NDArray[(3, Any), int]:
+        """Get the minimum and maximum reference value of each bin of time.
+
+        See get_tissue_overview.
+        """
+        return self._get_overview(REFERENCE_SENSOR_READINGS, num_bins)
+
+    def get_raw_tissue_reading_in_time_window(
+        self,
+        start_centimilliseconds: Optional[int] = None,
+        stop_centimilliseconds: Optional[int] = None,
+    ) -> NDArray[(2, Any), int]:
+        """Get the part of the value vs time array within a window of time.
+
+        Only the samples in the window are read from the H5 file.
+
+        Args:
+            start_centimilliseconds: the earliest time (inclusive) relative to the start of the recording. None means from the first sample
+            stop_centimilliseconds: the time (exclusive) to stop before. None means until the last sample
+        """
+        start_index, stop_index = self._get_indices_of_time_window(
+            TISSUE_SENSOR_READINGS, start_centimilliseconds, stop_centimilliseconds
+        )
+        return self.get_raw_tissue_reading(start_index, stop_index)
+
+    def get_raw_reference_reading_in_time_window(
+        self,
+        start_centimilliseconds: Optional[int] = None,
+        stop_centimilliseconds: Optional[int] = None,
+    ) -> NDArray[(2, Any), int]:
+        """Get the part of the reference value vs time array within a window of time.
+
+        Only the samples in the window are read from the H5 file.
+
+        Args:
+            start_centimilliseconds: the earliest time (inclusive) relative to the start of the recording. None means from the first sample
+            stop_centimilliseconds: the time (exclusive) to stop before. None means until the last sample
+        """
+        start_index, stop_index = self._get_indices_of_time_window(
+            REFERENCE_SENSOR_READINGS, start_centimilliseconds, stop_centimilliseconds
+        )
+        return self.get_raw_reference_reading(start_index, stop_index)
 
     def _check_for_trimmed_file(
-        self, times: NDArray[(1, Any), int], time_delta_centimilliseconds: int
+        self, time_step: int, num_samples: int, time_delta_centimilliseconds: int
     ) -> int:
         try:
             is_untrimmed = self.get_h5_attribute(str(IS_FILE_ORIGINAL_UNTRIMMED_UUID))
@@ -480,10 +1373,29 @@ class WellFile(
         if is_untrimmed:
             return time_delta_centimilliseconds
         time_trimmed = self.get_h5_attribute(str(TRIMMED_TIME_FROM_ORIGINAL_START_UUID))
-        new_times = times + time_delta_centimilliseconds
-        start_index = find_start_index(time_trimmed, new_times)
-        new_time_delta = int(new_times[start_index])
-        return new_time_delta
+        start_index = find_evenly_spaced_start_index(
+            time_trimmed, time_step, num_samples
+        )
+        return time_delta_centimilliseconds + start_index * time_step
+
+
+def find_evenly_spaced_start_index(
+    from_start: int, time_step: int, num_times: int
+) -> int:
+    """Get the same index as find_start_index, without building the times.
+
+    Args:
+        from_start: the amount of time trimmed from the start
+        time_step: the constant time between consecutive times
+        num_times: the number of times
+
+    Returns:
+        A non-negative index (unlike find_start_index, which can return -1 to mean the last index).
+    """
+    num_steps = 0
+    if from_start >= 0:
+        num_steps = min(num_times - 1, from_start // time_step + 1)
+    return (num_steps - 1) % num_times
 
 
 def find_start_index(from_start: int, old_data: NDArray[(1, Any), int]) -> int:
@@ -532,58 +1444,584 @@ class WellFile_0_4_2(  # pylint:disable=invalid-name,too-many-ancestors # Eli (1
     """
 
 
+class _SharedH5File:  # pylint: disable=too-few-public-methods # only needs to be an owner of a file in the pool
+    """An H5 file in the pool of open files that is shared by several owners.
+
+    The file is closed once none of its owners holds it any more.
+    """
+
+    def get_pool_key(self) -> int:
+        return id(self)
+
+    def __del__(self) -> None:
+        _H5_FILE_HANDLE_POOL.close_file(self.get_pool_key())
+
+
+class ConsolidatedWellFile(  # pylint:disable=too-many-ancestors # a WellFile, with the ancestors of its mixins
+    WellFile
+):
+    """A single well of a consolidated plate file.
+
+    Has the same API as a WellFile. The metadata of the well is read from its group of the well metadata, and its sensor values from its row of the (wells x samples) dataset of each sensor. All wells of a file share one open H5 file.
+
+    Args:
+        file_name: the path of the consolidated plate file (see export_consolidated_plate_file)
+        row: the row of the well in the sensor datasets
+        use_wide_times: see WellFile
+        shared_file: the open file shared with the other wells of the plate. By default the well gets a file of its own.
+    """
+
+    def __init__(
+        self,
+        file_name: str,
+        row: int,
+        use_wide_times: bool = False,
+        shared_file: Optional[_SharedH5File] = None,
+    ) -> None:
+        self._row = row
+        self._shared_file = _SharedH5File() if shared_file is None else shared_file
+        super().__init__(file_name, use_wide_times=use_wide_times)
+
+    def _get_pool_key(self) -> int:
+        return self._shared_file.get_pool_key()
+
+    def __del__(self) -> None:
+        # the file is closed by the _SharedH5File once no well holds it, instead of by the first well to be collected
+        pass
+
+    def get_h5_attributes(self) -> h5py.AttributeManager:
+        return self.get_h5_file()[f"{WELL_METADATA_GROUP_NAME}/{self._row}"].attrs
+
+    def _get_sensor_selection(
+        self, sample_selection: slice
+    ) -> Union[slice, Tuple[int, slice]]:
+        return self._row, sample_selection
+
+    def _get_num_sensor_samples(self, dataset_name: str) -> int:
+        with self.lease_h5_file():
+            num_samples = self._get_sensor_dataset(dataset_name).attrs[
+                NUM_SAMPLES_METADATA_KEY
+            ]
+        return int(num_samples[self._row])
+
+
+def _check_file_version_is_supported(file_version_str: str) -> None:
+    if file_version_str.split(".") < VersionInfo.parse(MIN_SUPPORTED_FILE_VERSION):
+        raise UnsupportedMantarrayFileVersionError(file_version_str)
+
+
+class _UnopenedWellFile(NamedTuple):
+    """What a lazy PlateRecording knows about a well before its WellFile is opened."""
+
+    file_path: str
+    well_index: int
+    well_name: Optional[str]
+    session_key: Tuple[str, datetime.datetime]
+
+
+# the metadata a PlateRecording needs to validate and index its wells
+_PLATE_METADATA_FIELDS = ("plate_barcode", "begin_recording", "well_index", "well_name")
+
+
+def _open_well_file_of_plate(
+    file_path: Union[str, WellFile], use_wide_times: bool, use_memmap: bool
+) -> Union[WellFile, Exception]:
+    """Open a WellFile and check its version, returning any error instead of raising it.
+
+    This lets files be opened concurrently while their errors are still raised in the order of the files.
+    """
+    try:
+        well_file = file_path
+        if isinstance(well_file, str):
+            well_file = WellFile(
+                well_file, use_wide_times=use_wide_times, use_memmap=use_memmap
+            )
+        _check_file_version_is_supported(well_file.get_file_version())
+        # read while the file is still open, since on plates with more wells than the pool of open files it would otherwise be closed (and reopened) before the session key is checked
+        well_file.load_metadata(_PLATE_METADATA_FIELDS)
+    except Exception as e:  # pylint: disable=broad-except
+        # the PlateRecording re-raises it in the same order it would have been raised when opening files one at a time
+        return e
+    return well_file
+
+
+def _read_unopened_well_file_of_plate(
+    file_path: Union[str, WellFile], catalog_records: Dict[str, Dict[str, Any]]
+) -> Union[WellFile, _UnopenedWellFile, Exception]:
+    """Read just the metadata a lazy PlateRecording needs, returning any error instead of raising it.
+
+    Files with an up to date catalog record are not opened at all. Other files are opened only long enough to read their metadata. WellFile objects are kept as they are.
+    """
+    if not isinstance(file_path, str):
+        return _open_well_file_of_plate(file_path, False, False)
+    record = catalog_records.get(file_path)
+    try:
+        if record is not None:
+            _check_file_version_is_supported(record["file_version"])
+            begin_recording = datetime.datetime.strptime(
+                record["begin_recording"], DATETIME_STR_FORMAT
+            ).replace(tzinfo=datetime.timezone.utc)
+            return _UnopenedWellFile(
+                file_path,
+                record["well_index"],
+                record["well_name"],
+                (record["plate_barcode"], begin_recording),
+            )
+        well_file = WellFile(file_path)
+        try:
+            _check_file_version_is_supported(well_file.get_file_version())
+            well_file.load_metadata(_PLATE_METADATA_FIELDS)
+            session_key = well_file.get_unique_recording_key()
+            well_name: Optional[str] = None
+            try:
+                well_name = well_file.get_well_name()
+            except (FileAttributeNotFoundError, ValueError, TypeError):
+                # the error is raised when the well name is used, after the WellFile is opened
+                pass
+            return _UnopenedWellFile(
+                file_path, well_file.get_well_index(), well_name, session_key
+            )
+        finally:
+            well_file.close()
+    except Exception as e:  # pylint: disable=broad-except
+        # the PlateRecording re-raises it in the same order as for any other file
+        return e
+
+
+def _prefetch_sensor_data(well_file: WellFile) -> None:
+    well_file.get_raw_tissue_reading()
+    well_file.get_raw_reference_reading()
+
+
+def _get_session_key(
+    well_file: Union[WellFile, _UnopenedWellFile]
+) -> Tuple[str, datetime.datetime]:
+    if isinstance(well_file, WellFile):
+        return well_file.get_unique_recording_key()
+    return well_file.session_key
+
+
+def _get_well_index(well_file: Union[WellFile, _UnopenedWellFile]) -> int:
+    if isinstance(well_file, WellFile):
+        return well_file.get_well_index()
+    return well_file.well_index
+
+
 class PlateRecording:
-    """Wrapper around 24 WellFiles for a single plate of data.
+    """Wrapper around the WellFiles of a single plate of data.
+
+    Plates can have any number of wells (e.g. 24, 96 or 384). The well indices and names are worked out once and kept, so they cost the same to get no matter how many wells there are.
 
     Args:
         file_paths: A list of all the file paths for each h5 file to open, or already instantiated WellFile objects.
+        use_wide_times: whether the WellFiles opened from file paths always give times as int64. See WellFile
+        max_workers: the number of threads to open the files (and prefetch their sensor data) with. 1 opens them one at a time, None uses as many threads as there are CPUs. Errors are raised in the same order regardless. Every file from a different session than the first file is reported in a single WellRecordingsNotFromSameSessionError.
+        prefetch_sensor_data: whether to load the raw tissue and reference readings of every well up front, so later calls to get_raw_tissue_reading and get_raw_reference_reading are served from memory
+        use_memmap: whether the WellFiles opened from file paths read contiguous sensor datasets through memory maps. See WellFile. h5py runs one call at a time, so this is what lets sensor data of different wells be prefetched at the same time.
+        lazy: whether to only read the metadata needed to validate the wells, and open each WellFile the first time it is accessed
+        catalog: in lazy mode, files with an up to date record in the catalog are validated from it without being opened at all
 
     Attributes:
-        _files : WellFiles of all the file paths provided.
+        _files : WellFiles of all the file paths provided, or in lazy mode what is known about them until they are opened.
     """
 
-    def __init__(self, file_paths: Sequence[Union[str, WellFile]]) -> None:
-        self._files: List[WellFile] = list()
-        self._wells_by_index: Dict[int, WellFile] = dict()
-        min_supported_version = VersionInfo.parse(MIN_SUPPORTED_FILE_VERSION)
-        for iter_file_path in file_paths:
-
-            well_file = iter_file_path
-            if isinstance(well_file, str):
-                well_file = WellFile(well_file)
-            file_version_str = well_file.get_file_version()
-            if file_version_str.split(".") < min_supported_version:
-                raise UnsupportedMantarrayFileVersionError(file_version_str)
+    def __init__(
+        self,
+        file_paths: Sequence[Union[str, WellFile]],
+        use_wide_times: bool = False,
+        max_workers: Optional[int] = 1,
+        prefetch_sensor_data: bool = False,
+        use_memmap: bool = False,
+        lazy: bool = False,
+        catalog: Optional["MetadataCatalog"] = None,
+    ) -> None:
+        self._use_wide_times = use_wide_times
+        self._use_memmap = use_memmap
+        self._files: List[Union[WellFile, _UnopenedWellFile]] = list()
+        self._wells_by_index: Dict[int, Union[WellFile, _UnopenedWellFile]] = dict()
+        self._well_indices: Optional[Tuple[int, ...]] = None
+        self._well_names: Optional[Tuple[str, ...]] = None
+        load_file: Callable[
+            [Union[str, WellFile]], Union[WellFile, _UnopenedWellFile, Exception]
+        ]
+        if lazy:
+            catalog_records: Dict[str, Dict[str, Any]] = dict()
+            if catalog is not None:
+                # SQLite connections can only be used by the thread that made them, so the catalog is read before the files are handed to the workers
+                for iter_file_path in file_paths:
+                    if isinstance(iter_file_path, str):
+                        record = catalog.get_record(iter_file_path)
+                        if record is not None:
+                            catalog_records[iter_file_path] = record
+            load_file = functools.partial(
+                _read_unopened_well_file_of_plate, catalog_records=catalog_records
+            )
+        else:
+            load_file = functools.partial(
+                _open_well_file_of_plate,
+                use_wide_times=use_wide_times,
+                use_memmap=use_memmap,
+            )
+        loaded_files = scan_files(
+            load_file,
+            file_paths,
+            max_workers=max_workers,
+            use_processes=False,  # WellFiles hold open h5py files, which can't be sent between processes
+        )
+        plate_session_key: Optional[Tuple[str, datetime.datetime]] = None
+        mismatched_files: List[Union[WellFile, _UnopenedWellFile]] = list()
+        for well_file in loaded_files:
+            if isinstance(well_file, Exception):
+                if mismatched_files:
+                    # the mismatches came first
+                    break
+                raise well_file
             if len(self._files) > 0:
-                new_session_key = well_file.get_unique_recording_key()
-                old_file = self._files[0]
-                old_session_key = old_file.get_unique_recording_key()
-                if new_session_key != old_session_key:
-                    raise WellRecordingsNotFromSameSessionError(old_file, well_file)
-            self._files.append(well_file)
-            self._wells_by_index[well_file.get_well_index()] = well_file
+                if plate_session_key is None:
+                    plate_session_key = _get_session_key(self._files[0])
+                if _get_session_key(well_file) != plate_session_key:
+                    mismatched_files.append(well_file)
+                    continue
+            self._add_well_file(well_file, _get_well_index(well_file))
+        if mismatched_files:
+            raise WellRecordingsNotFromSameSessionError(
+                self._open_well_file(self._files[0]),
+                *(self._open_well_file(iter_file) for iter_file in mismatched_files),
+            )
+        if prefetch_sensor_data:
+            scan_files(
+                _prefetch_sensor_data,
+                [
+                    self.get_well_by_index(iter_index)
+                    for iter_index in self.get_well_indices()
+                ],
+                max_workers=max_workers,
+                use_processes=False,
+            )
+
+    def _add_well_file(
+        self, well_file: Union[WellFile, _UnopenedWellFile], well_index: int
+    ) -> None:
+        self._files.append(well_file)
+        self._wells_by_index[well_index] = well_file
+        self._well_indices = None
+        self._well_names = None
+
+    def _open_well_file(
+        self, well_file: Union[WellFile, _UnopenedWellFile]
+    ) -> WellFile:
+        if isinstance(well_file, WellFile):
+            return well_file
+        return WellFile(
+            well_file.file_path,
+            use_wide_times=self._use_wide_times,
+            use_memmap=self._use_memmap,
+        )
+
+    @classmethod
+    def from_directory(
+        cls,
+        dir_to_load_files_from: str,
+        use_wide_times: bool = False,
+        max_workers: Optional[int] = 1,
+        prefetch_sensor_data: bool = False,
+        use_memmap: bool = False,
+        lazy: bool = False,
+        catalog: Optional["MetadataCatalog"] = None,
+    ) -> "PlateRecording":
+        """Open every h5 file directly inside a directory as a plate.
+
+        Sub-directories are not searched. See PlateRecording.discover to find the plates of a whole directory tree.
+
+        Args:
+            dir_to_load_files_from: the directory holding the h5 file of each well
+            use_wide_times: whether the WellFiles always give times as int64. See WellFile
+            max_workers: the number of threads to open the files (and prefetch their sensor data) with. See PlateRecording
+            prefetch_sensor_data: whether to load the raw readings of every well up front. See PlateRecording
+            use_memmap: whether the WellFiles read contiguous sensor datasets through memory maps. See WellFile
+            lazy: whether to only read the metadata needed to validate the wells, and open each WellFile the first time it is accessed
+            catalog: in lazy mode, files with an up to date record in the catalog are validated from it without being opened at all
+
+        Raises:
+            WellRecordingsNotFromSameSessionError: if the files are not all from the same recording session
+        """
+        return cls(
+            glob(os.path.join(dir_to_load_files_from, "*.h5")),
+            use_wide_times=use_wide_times,
+            max_workers=max_workers,
+            prefetch_sensor_data=prefetch_sensor_data,
+            use_memmap=use_memmap,
+            lazy=lazy,
+            catalog=catalog,
+        )
+
+    @classmethod
+    def from_consolidated_file(
+        cls, file_path: str, use_wide_times: bool = False
+    ) -> "PlateRecording":
+        """Open a plate that was exported to a single file.
+
+        The file is opened once, and shared by the ConsolidatedWellFile of every well.
+
+        Args:
+            file_path: the path of the file written by export_consolidated_plate_file
+            use_wide_times: whether the WellFiles always give times as int64. See WellFile
+
+        Raises:
+            NotAConsolidatedPlateFileError: if the file was not exported as a consolidated plate file
+        """
+        shared_file = _SharedH5File()
+        pool_key = shared_file.get_pool_key()
+        with _H5_FILE_HANDLE_POOL.lease(pool_key, file_path) as h5_file:
+            if CONSOLIDATED_PLATE_FILE_FORMAT_VERSION_METADATA_KEY not in h5_file.attrs:
+                raise NotAConsolidatedPlateFileError(file_path)
+            num_wells = len(h5_file[WELL_METADATA_GROUP_NAME])
+        return cls(
+            [
+                ConsolidatedWellFile(
+                    file_path,
+                    iter_row,
+                    use_wide_times=use_wide_times,
+                    shared_file=shared_file,
+                )
+                for iter_row in range(num_wells)
+            ]
+        )
 
     @classmethod
-    def from_directory(cls, dir_to_load_files_from: str) -> "PlateRecording":
-        return cls(glob(os.path.join(dir_to_load_files_from, "*.h5")))
+    def discover(
+        cls, root: str, use_wide_times: bool = False
+    ) -> List["PlateRecording"]:
+        """Group every h5 file in a directory tree into PlateRecordings.
+
+        Each file is opened once and its session key and well index are read once. Plates are built directly from those already opened WellFiles, so they are not validated again. Duplicate recordings of a well are dropped, keeping the first one found.
+
+        Args:
+            root: the master folder for which all h5 files reside
+            use_wide_times: whether the WellFiles always give times as int64. See WellFile
+
+        Returns:
+            One PlateRecording per recording session, sorted by plate barcode and then beginning of recording.
+        """
+        wells_by_session: Dict[Tuple[str, datetime.datetime], Dict[int, WellFile]] = {}
+        for iter_file_path in iter_h5_files_in_directory(root):
+            well_file = WellFile(iter_file_path, use_wide_times=use_wide_times)
+            _check_file_version_is_supported(well_file.get_file_version())
+            session_wells = wells_by_session.setdefault(
+                well_file.get_unique_recording_key(), {}
+            )
+            well_index = well_file.get_well_index()
+            if well_index not in session_wells:
+                session_wells[well_index] = well_file
+
+        plate_recordings: List["PlateRecording"] = []
+        for iter_session_key in sorted(wells_by_session):
+            plate_recording = cls([])
+            for iter_well_index, iter_well_file in wells_by_session[
+                iter_session_key
+            ].items():
+                plate_recording._add_well_file(iter_well_file, iter_well_index)
+            plate_recordings.append(plate_recording)
+        return plate_recordings
+
+    def iter_raw_reading_blocks(
+        self, block_duration_cms: Optional[int] = None
+    ) -> Iterator[Dict[int, Tuple[NDArray[(2, Any), int], NDArray[(2, Any), int]]]]:
+        """Iterate over the readings of all wells in blocks of time.
+
+        Only one block of each well is held in memory at a time.
+
+        Args:
+            block_duration_cms: the length of time (centi-milliseconds) covered by each block. Must be positive. Defaults to DEFAULT_READING_BLOCK_SIZE samples of the slowest sampled tissue sensor.
+
+        Yields:
+            The tissue and reference readings of each well within the same window of time, keyed by well index in the order of get_well_indices.
+        """
+        well_files = [
+            self.get_well_by_index(iter_index) for iter_index in self.get_well_indices()
+        ]
+        if block_duration_cms is None:
+            block_duration_cms = DEFAULT_READING_BLOCK_SIZE * max(
+                (
+                    iter_file.get_tissue_time_axis().get_step()
+                    for iter_file in well_files
+                ),
+                default=1,
+            )
+        validate_int(value=block_duration_cms, minimum=1)
+        start_time, stop_time = _get_time_range(
+            [
+                iter_axis
+                for iter_file in well_files
+                for iter_axis in (
+                    iter_file.get_tissue_time_axis(),
+                    iter_file.get_reference_time_axis(),
+                )
+            ]
+        )
+        for iter_start_time in range(start_time, stop_time, block_duration_cms):
+            iter_stop_time = iter_start_time + block_duration_cms
+            yield {
+                iter_index: (
+                    iter_file.get_raw_tissue_reading_in_time_window(
+                        iter_start_time, iter_stop_time
+                    ),
+                    iter_file.get_raw_reference_reading_in_time_window(
+                        iter_start_time, iter_stop_time
+                    ),
+                )
+                for iter_index, iter_file in zip(self.get_well_indices(), well_files)
+            }
+
+    def get_decimated_tissue_readings(
+        self, num_points: int, method: str = "min_max"
+    ) -> Dict[int, NDArray[(2, Any), int]]:
+        """Get the tissue readings of all wells reduced for display.
+
+        See WellFile.get_decimated_tissue_reading.
+
+        Returns:
+            The decimated reading of each well, keyed by well index in the order of get_well_indices.
+        """
+        return {
+            iter_index: self.get_well_by_index(iter_index).get_decimated_tissue_reading(
+                num_points, method=method
+            )
+            for iter_index in self.get_well_indices()
+        }
+
+    def get_decimated_reference_readings(
+        self, num_points: int, method: str = "min_max"
+    ) -> Dict[int, NDArray[(2, Any), int]]:
+        """Get the reference readings of all wells reduced for display.
+
+        See WellFile.get_decimated_tissue_reading.
+
+        Returns:
+            The decimated reading of each well, keyed by well index in the order of get_well_indices.
+        """
+        return {
+            iter_index: self.get_well_by_index(
+                iter_index
+            ).get_decimated_reference_reading(num_points, method=method)
+            for iter_index in self.get_well_indices()
+        }
+
+    def get_tissue_overviews(self, num_bins: int) -> Dict[int, NDArray[(3, Any), int]]:
+        """Get the tissue overview of all wells.
+
+        See WellFile.get_tissue_overview.
+
+        Returns:
+            The overview of each well, keyed by well index in the order of get_well_indices.
+        """
+        return {
+            iter_index: self.get_well_by_index(iter_index).get_tissue_overview(num_bins)
+            for iter_index in self.get_well_indices()
+        }
+
+    def get_reference_overviews(
+        self, num_bins: int
+    ) -> Dict[int, NDArray[(3, Any), int]]:
+        """Get the reference overview of all wells.
+
+        See WellFile.get_tissue_overview.
+
+        Returns:
+            The overview of each well, keyed by well index in the order of get_well_indices.
+        """
+        return {
+            iter_index: self.get_well_by_index(iter_index).get_reference_overview(
+                num_bins
+            )
+            for iter_index in self.get_well_indices()
+        }
+
+    def _get_stacked_sensor_values(
+        self, sensor_name: str, dtype: Any
+    ) -> NDArray[(Any, Any), int]:
+        well_files = [
+            self.get_well_by_index(iter_index) for iter_index in self.get_well_indices()
+        ]
+        num_samples = min(
+            (
+                len(getattr(iter_file, f"get_{sensor_name}_time_axis")())
+                for iter_file in well_files
+            ),
+            default=0,
+        )
+        # allocated once and filled in place, so no per-well arrays are created
+        stacked_values = np.empty((len(well_files), num_samples), dtype=dtype)
+        for iter_row, iter_file in enumerate(well_files):
+            getattr(iter_file, f"read_raw_{sensor_name}_values_into")(
+                stacked_values[iter_row], stop_index=num_samples
+            )
+        return stacked_values
+
+    def get_stacked_tissue_values(
+        self, dtype: Any = np.int32
+    ) -> NDArray[(Any, Any), int]:
+        """Get the tissue values of all wells as a single (wells x samples) array.
+
+        Wells of the same recording can differ by a sample, so every well is cut to the number of samples of the shortest one. The times of each row are given by the first samples of that well's get_tissue_time_axis.
+
+        Args:
+            dtype: the NumPy type of the array. The sensor datasets are int32.
+
+        Returns:
+            One row per well, in the order of get_well_indices.
+        """
+        return self._get_stacked_sensor_values("tissue", dtype)
+
+    def get_stacked_reference_values(
+        self, dtype: Any = np.int32
+    ) -> NDArray[(Any, Any), int]:
+        """Get the reference values of all wells as a single (wells x samples) array.
+
+        See get_stacked_tissue_values. The times of each row are given by the first samples of that well's get_reference_time_axis.
+        """
+        return self._get_stacked_sensor_values("reference", dtype)
 
     def get_well_by_index(self, well_index: int) -> WellFile:
-        return self._wells_by_index[well_index]
+        """Get the WellFile of a well, opening it first in lazy mode."""
+        well_file = self._wells_by_index[well_index]
+        if not isinstance(well_file, WellFile):
+            well_file = self._open_well_file(well_file)
+            self._wells_by_index[well_index] = well_file
+        return well_file
+
+    def is_well_open(self, well_index: int) -> bool:
+        """Check whether the WellFile of a well has been opened yet.
+
+        Always true unless the PlateRecording is lazy.
+        """
+        return isinstance(self._wells_by_index[well_index], WellFile)
+
+    def _get_well_name(self, well_file: Union[WellFile, _UnopenedWellFile]) -> str:
+        if isinstance(well_file, WellFile):
+            return well_file.get_well_name()
+        if well_file.well_name is not None:
+            return well_file.well_name
+        # the getter raises the error of the missing or unreadable well name
+        return self.get_well_by_index(well_file.well_index).get_well_name()
+
+    def _get_cached_well_names(self) -> Tuple[str, ...]:
+        if self._well_names is None:
+            self._well_names = tuple(
+                self._get_well_name(iter_well_file) for iter_well_file in self._files
+            )
+        return self._well_names
 
     def get_wellfile_names(self) -> Sequence[str]:
-        well_files = []
-        for well in self._files:
-            well_files.append(well.get_well_name())
-        return well_files
+        return list(self._get_cached_well_names())
 
     def get_well_names(self) -> Set[str]:
-        out_set: Set[str] = set()
-        for iter_well_file in self._files:
-            out_set.add(iter_well_file.get_well_name())
-        return out_set
+        return set(self._get_cached_well_names())
 
     def get_well_indices(self) -> Tuple[int, ...]:
-        return tuple(sorted(self._wells_by_index.keys()))
+        if self._well_indices is None:
+            self._well_indices = tuple(sorted(self._wells_by_index))
+        return self._well_indices
 
 
 WELL_FILE_CLASSES = immutabledict(
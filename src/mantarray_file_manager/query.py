@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""Multi-criteria searches over Mantarray H5 files."""
+import abc
+import datetime
+import functools
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Sequence
+
+from immutabledict import immutabledict
+
+from .exceptions import FileAttributeNotFoundError
+from .exceptions import UnsupportedQueryFieldError
+from .files import parse_mantarray_file_name
+from .files import scan_files
+from .files import WellFile
+
+QUERY_FIELD_GETTERS = immutabledict(
+    {
+        "Well Name": "get_well_name",
+        "Well Index": "get_well_index",
+        "Plate Barcode": "get_plate_barcode",
+        "User ID": "get_user_account",
+        "Account ID": "get_customer_account",
+        "Mantarray Serial Number": "get_mantarray_serial_number",
+        "Begin Recording": "get_begin_recording",
+    }
+)
+
+FILE_NAME_QUERY_FIELDS = immutabledict(
+    {
+        "Well Name": "well_name",
+        "Plate Barcode": "plate_barcode",
+        "Begin Recording": "timestamp",
+    }
+)
+# The timestamp in the file name is when the file was created, which is close to but not exactly the beginning of the recording, and may have been written in local time rather than UTC
+FILE_NAME_TIMESTAMP_TOLERANCE = datetime.timedelta(days=1)
+
+
+def _is_near_file_name_timestamp(
+    value: datetime.datetime, file_name_timestamp: datetime.datetime
+) -> bool:
+    return abs(value - file_name_timestamp) <= FILE_NAME_TIMESTAMP_TOLERANCE
+
+
+class Predicate(abc.ABC):
+    """Base class for a condition on a single piece of file metadata.
+
+    Args:
+        field: the display name of the metadata, one of the keys of QUERY_FIELD_GETTERS
+    """
+
+    def __init__(self, field: str) -> None:
+        if field not in QUERY_FIELD_GETTERS:
+            raise UnsupportedQueryFieldError(field)
+        self.field = field
+
+    def get_getter_name(self) -> str:
+        return str(QUERY_FIELD_GETTERS[self.field])
+
+    @abc.abstractmethod
+    def matches(self, value: Any) -> bool:
+        """Check whether the metadata of a file meets the condition."""
+
+    def could_match_file_name(self, file_name_metadata: Dict[str, Any]) -> bool:
+        """Check whether a file could match, judging only by its file name.
+
+        Args:
+            file_name_metadata: the result of parse_mantarray_file_name
+        """
+        file_name_key = FILE_NAME_QUERY_FIELDS.get(self.field)
+        if file_name_key is None:
+            return True
+        return self._file_name_value_matches(file_name_metadata[file_name_key])
+
+    def _file_name_value_matches(self, value: Any) -> bool:
+        return self.matches(value)
+
+
+class Equals(Predicate):
+    """The metadata must be equal to the given value."""
+
+    def __init__(self, field: str, value: Any) -> None:
+        super().__init__(field)
+        self.value = value
+
+    def matches(self, value: Any) -> bool:
+        return bool(value == self.value)
+
+    def _file_name_value_matches(self, value: Any) -> bool:
+        if FILE_NAME_QUERY_FIELDS[self.field] == "timestamp":
+            return _is_near_file_name_timestamp(self.value, value)
+        return super()._file_name_value_matches(value)
+
+
+class IsIn(Predicate):
+    """The metadata must be one of the given values."""
+
+    def __init__(self, field: str, values: Iterable[Any]) -> None:
+        super().__init__(field)
+        self.values = frozenset(values)
+
+    def matches(self, value: Any) -> bool:
+        return value in self.values
+
+    def _file_name_value_matches(self, value: Any) -> bool:
+        if FILE_NAME_QUERY_FIELDS[self.field] == "timestamp":
+            return any(
+                _is_near_file_name_timestamp(iter_value, value)
+                for iter_value in self.values
+            )
+        return super()._file_name_value_matches(value)
+
+
+class DateRange(Predicate):
+    """The metadata must fall within ``[start, end)``.
+
+    Args:
+        start: the earliest allowed datetime (inclusive). None means no lower bound
+        end: the datetime that must not be reached (exclusive). None means no upper bound
+        field: the display name of the timestamp metadata. Defaults to the beginning of the recording
+    """
+
+    def __init__(
+        self,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        field: str = "Begin Recording",
+    ) -> None:
+        super().__init__(field)
+        self.start = start
+        self.end = end
+
+    def matches(self, value: Any) -> bool:
+        if self.start is not None and value < self.start:
+            return False
+        return self.end is None or value < self.end
+
+    def _file_name_value_matches(self, value: Any) -> bool:
+        if (
+            self.start is not None
+            and value < self.start - FILE_NAME_TIMESTAMP_TOLERANCE
+        ):
+            return False
+        return self.end is None or value < self.end + FILE_NAME_TIMESTAMP_TOLERANCE
+
+
+def file_matches_predicates(
+    file_path: str,
+    predicates: Sequence[Predicate],
+    prefilter_by_file_name: bool = False,
+) -> bool:
+    """Check one file against all predicates, stopping at the first failure.
+
+    Only the metadata attribute needed by each predicate is read. A file that is missing an attribute does not match.
+
+    Args:
+        file_path: the path to the H5 file
+        predicates: the conditions which must all be met
+        prefilter_by_file_name: whether to first reject files whose name rules them out, without opening them. Files whose name does not follow the Mantarray pattern are always opened.
+    """
+    if prefilter_by_file_name:
+        file_name_metadata = parse_mantarray_file_name(file_path)
+        if file_name_metadata is not None and not all(
+            iter_predicate.could_match_file_name(file_name_metadata)
+            for iter_predicate in predicates
+        ):
+            return False
+    well_file = WellFile(file_path)
+    for iter_predicate in predicates:
+        try:
+            value = getattr(well_file, iter_predicate.get_getter_name())()
+        except FileAttributeNotFoundError:
+            return False
+        if not iter_predicate.matches(value):
+            return False
+    return True
+
+
+def query_files(
+    file_paths: Sequence[str],
+    predicates: Sequence[Predicate],
+    max_workers: Optional[int] = 1,
+    use_processes: bool = True,
+    prefilter_by_file_name: bool = False,
+) -> List[str]:
+    """Obtain the files whose metadata satisfies every predicate.
+
+    Args:
+        file_paths: the file paths to search through
+        predicates: the conditions which must all be met. They are evaluated in the order given, so put the most selective first.
+        max_workers: the number of workers to read file metadata with. See scan_files
+        use_processes: whether the workers are processes or threads. See scan_files
+        prefilter_by_file_name: whether to skip opening files whose name already rules them out. Only safe if files have not been renamed.
+
+    Returns:
+        The matching file paths, in the same order as file_paths.
+    """
+    matches = scan_files(
+        functools.partial(
+            file_matches_predicates,
+            predicates=predicates,
+            prefilter_by_file_name=prefilter_by_file_name,
+        ),
+        file_paths,
+        max_workers=max_workers,
+        use_processes=use_processes,
+    )
+    return [iter_path for iter_path, is_match in zip(file_paths, matches) if is_match]
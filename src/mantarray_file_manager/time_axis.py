@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""Evenly spaced time values that are computed instead of stored."""
+from typing import Any
+from typing import Optional
+from typing import Union
+
+from nptyping import NDArray
+import numpy as np
+
+
+class TimeAxis:
+    """The times of evenly spaced samples, ``offset + i * step``.
+
+    Behaves like a read-only 1D array of times without allocating one. Call to_array (or np.asarray) to materialize it.
+
+    Args:
+        offset: the time of the first sample
+        step: the time between consecutive samples. Must be positive
+        num_samples: the number of samples
+        dtype: the NumPy type of the materialized times
+    """
+
+    def __init__(
+        self, offset: int, step: int, num_samples: int, dtype: Any = np.int32
+    ) -> None:
+        self._offset = offset
+        self._step = step
+        self._num_samples = num_samples
+        self._dtype = np.dtype(dtype)
+
+    def get_offset(self) -> int:
+        return self._offset
+
+    def get_step(self) -> int:
+        return self._step
+
+    def get_dtype(self) -> "np.dtype[Any]":
+        return self._dtype
+
+    def __len__(self) -> int:
+        return self._num_samples
+
+    def __repr__(self) -> str:
+        return f"TimeAxis(offset={self._offset}, step={self._step}, num_samples={self._num_samples}, dtype={self._dtype})"
+
+    def __getitem__(self, key: Union[int, slice]) -> Any:
+        """Get the time of one sample, or a TimeAxis of a slice of samples.
+
+        The times of a slice with a negative step are decreasing, so they are returned as an array instead.
+        """
+        if isinstance(key, slice):
+            sample_indices = range(self._num_samples)[key]
+            if sample_indices.step < 0:
+                return self.to_array()[key]
+            return TimeAxis(
+                self._offset + sample_indices.start * self._step,
+                sample_indices.step * self._step,
+                len(sample_indices),
+                dtype=self._dtype,
+            )
+        sample_index = key + self._num_samples if key < 0 else key
+        if not 0 <= sample_index < self._num_samples:
+            raise IndexError(f"Sample index out of range of the time axis: {key}")
+        return self._dtype.type(self._offset + sample_index * self._step)
+
+    def searchsorted(self, times: Any, side: str = "left") -> Any:
+        """Find the indices where the times would be inserted to keep order.
+
+        Matches np.searchsorted on the materialized times, in constant time per value.
+
+        Args:
+            times: a single time or an array of times
+            side: ``"left"`` for the first index with a time not less than the value, ``"right"`` for the first index with a greater time
+        """
+        if side == "left":
+            # ceiling division
+            indices = -((self._offset - np.asarray(times)) // self._step)
+        elif side == "right":
+            indices = (np.asarray(times) - self._offset) // self._step + 1
+        else:
+            raise ValueError(f"side must be 'left' or 'right', not '{side}'")
+        return np.clip(indices, 0, self._num_samples)
+
+    def to_array(self) -> NDArray[(1, Any), int]:
+        return (
+            np.arange(self._num_samples, dtype=self._dtype) * self._step + self._offset
+        )
+
+    def __array__(self, dtype: Optional[Any] = None) -> NDArray[(1, Any), int]:
+        times = self.to_array()
+        if dtype is not None:
+            return times.astype(dtype, copy=False)
+        return times
@@ -1,10 +1,20 @@
 # -*- coding: utf-8 -*-
 import os
+import shutil
 import tempfile
 
+import h5py
+from mantarray_file_manager import add_sensor_overviews_to_file
+from mantarray_file_manager import export_consolidated_plate_file
 from mantarray_file_manager import migrate_to_latest_version
+from mantarray_file_manager import PlateRecording
+from mantarray_file_manager import TISSUE_SAMPLING_PERIOD_UUID
+from mantarray_file_manager import TISSUE_SENSOR_READINGS
+from mantarray_file_manager import WELL_INDEX_UUID
+from mantarray_file_manager import WELL_NAME_UUID
 from mantarray_file_manager import WellFile
 from mantarray_file_manager.file_writer import h5_file_trimmer
+import numpy as np
 import pytest
 from stdlib_utils import get_current_file_abs_directory
 
@@ -25,6 +35,51 @@ PATH_TO_GENERIC_0_4_1_FILE = os.path.join(
 )
 
 
+def get_well_name_of_plate(well_index, num_rows):
+    # wells are numbered down each column, starting from A1
+    return f"{chr(ord('A') + well_index % num_rows)}{well_index // num_rows + 1}"
+
+
+def make_synthetic_plate(dir_path, num_rows, num_columns):
+    # a copy of a v0.3.1 well for every well of the plate, all from the same session
+    for iter_well_index in range(num_rows * num_columns):
+        well_name = get_well_name_of_plate(iter_well_index, num_rows)
+        file_path = os.path.join(
+            dir_path, f"MA20123456__2020_08_17_145752__{well_name}.h5"
+        )
+        shutil.copy(PATH_TO_GENERIC_0_3_1_FILE, file_path)
+        with h5py.File(file_path, "r+") as h5_file:
+            h5_file.attrs[str(WELL_INDEX_UUID)] = iter_well_index
+            h5_file.attrs[str(WELL_NAME_UUID)] = well_name
+
+
+def record_h5_attribute_reads(mocker):
+    # the names of all the H5 attributes read from now on
+    read_attribute_names = list()
+    original_read_attribute = h5py.AttributeManager.__getitem__
+
+    def read_attribute(attrs, name):
+        read_attribute_names.append(name)
+        return original_read_attribute(attrs, name)
+
+    mocker.patch.object(h5py.AttributeManager, "__getitem__", read_attribute)
+    return read_attribute_names
+
+
+@pytest.fixture(scope="module", name="plate_96_well_dir")
+def fixture_plate_96_well_dir():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        make_synthetic_plate(tmp_dir, 8, 12)
+        yield tmp_dir
+
+
+@pytest.fixture(scope="module", name="plate_384_well_dir")
+def fixture_plate_384_well_dir():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        make_synthetic_plate(tmp_dir, 16, 24)
+        yield tmp_dir
+
+
 @pytest.fixture(scope="module", name="current_version_file_path")
 def fixture_current_version_file_path():
     with tempfile.TemporaryDirectory() as tmp_dir:
@@ -52,6 +107,39 @@ def fixture_trimmed_file_path():
         yield trimmed_file_path
 
 
+@pytest.fixture(scope="module", name="long_recording_file_path")
+def fixture_long_recording_file_path(current_version_file_path):
+    # a tissue sampling period of one second makes the recording long enough (about 8 hours) to overflow int32 centimilliseconds, without needing a large file
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, "long_recording.h5")
+        shutil.copy(current_version_file_path, file_path)
+        with h5py.File(file_path, "r+") as h5_file:
+            h5_file.attrs[str(TISSUE_SAMPLING_PERIOD_UUID)] = 1000000
+            del h5_file[TISSUE_SENSOR_READINGS]
+            h5_file.create_dataset(
+                TISSUE_SENSOR_READINGS, data=np.arange(30000, dtype=np.int32)
+            )
+        yield file_path
+
+
+@pytest.fixture(scope="module", name="sensor_overviews_file_path")
+def fixture_sensor_overviews_file_path(current_version_file_path):
+    # enough noisy tissue samples that every overview level has many points, with a partial last bin in each
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, "sensor_overviews.h5")
+        shutil.copy(current_version_file_path, file_path)
+        with h5py.File(file_path, "r+") as h5_file:
+            del h5_file[TISSUE_SENSOR_READINGS]
+            h5_file.create_dataset(
+                TISSUE_SENSOR_READINGS,
+                data=np.random.default_rng(0).integers(
+                    -(2**20), 2**20, size=123457, dtype=np.int32
+                ),
+            )
+        add_sensor_overviews_to_file(file_path)
+        yield file_path
+
+
 @pytest.fixture(scope="function", name="generic_well_file")
 def fixture_generic_well_file():
     wf = WellFile(
@@ -81,3 +169,14 @@ def fixture_generic_well_file_0_3_1__2():
         )
     )
     yield wf
+
+
+@pytest.fixture(scope="module", name="consolidated_plate_file_path")
+def fixture_consolidated_plate_file_path():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, "consolidated_plate.h5")
+        export_consolidated_plate_file(
+            PlateRecording.from_directory(os.path.dirname(PATH_TO_GENERIC_0_3_1_FILE)),
+            file_path,
+        )
+        yield file_path
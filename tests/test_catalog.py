@@ -0,0 +1,410 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import sqlite3
+import tempfile
+from uuid import UUID
+
+import h5py
+from mantarray_file_manager import CATALOG_FILE_NAME
+from mantarray_file_manager import files
+from mantarray_file_manager import MetadataCatalog
+from mantarray_file_manager import PLATE_BARCODE_UUID
+from mantarray_file_manager import PlateRecording
+from mantarray_file_manager import UnsupportedMantarrayFileVersionError
+from mantarray_file_manager import WELL_NAME_UUID
+from mantarray_file_manager.catalog import read_catalog_record
+import pytest
+from stdlib_utils import get_current_file_abs_directory
+
+PATH_OF_CURRENT_FILE = get_current_file_abs_directory()
+PATH_TO_BUILD_775_DIR = os.path.join(PATH_OF_CURRENT_FILE, "2020_08_04_build_775")
+
+
+@pytest.fixture(scope="function", name="build_775_catalog")
+def fixture_build_775_catalog():
+    catalog = MetadataCatalog(":memory:")
+    catalog.refresh_directory(PATH_TO_BUILD_775_DIR)
+    yield catalog
+    catalog.close()
+
+
+def test_read_catalog_record__reads_key_metadata_and_file_stats():
+    file_path = os.path.join(
+        PATH_OF_CURRENT_FILE, "h5", "v0.3.1", "MA20123456__2020_08_17_145752__A1.h5"
+    )
+    record = read_catalog_record(file_path)
+    assert record["path"] == os.path.abspath(file_path)
+    assert record["size"] == os.path.getsize(file_path)
+    assert record["mtime"] == os.stat(file_path).st_mtime_ns
+    assert record["file_version"] == "0.3.1"
+    assert record["well_name"] == "A1"
+    assert record["well_index"] == 0
+    assert record["plate_barcode"] == "MA20123456"
+    assert record["begin_recording"] == "2020-08-17 14:58:10.728254"
+    assert record["user_account"] == "87187e44-2e8e-4f37-ba0f-cd2df366f3bc"
+    assert record["mantarray_serial_number"] == "M02001900"
+    assert record["attributes"][str(PLATE_BARCODE_UUID)] == "MA20123456"
+
+
+def test_read_catalog_record__stores_None_for_metadata_that_cannot_be_read():
+    record = read_catalog_record(
+        os.path.join(
+            PATH_OF_CURRENT_FILE, "h5", "v0.1", "MA20001100__2020_07_15_172203__A4.h5"
+        )
+    )
+    assert record["user_account"] is None
+    assert record["customer_account"] is None
+    assert record["plate_barcode"] == "MA20001100"
+
+
+def test_MetadataCatalog__for_directory__creates_catalog_file_inside_directory():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        catalog = MetadataCatalog.for_directory(tmp_dir)
+        expected_path = os.path.join(tmp_dir, CATALOG_FILE_NAME)
+        assert catalog.get_catalog_path() == expected_path
+        assert os.path.isfile(expected_path)
+        catalog.close()
+
+
+def test_MetadataCatalog__persists_records_between_instances():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        catalog_path = os.path.join(tmp_dir, "my_catalog.sqlite")
+        catalog = MetadataCatalog(catalog_path)
+        catalog.refresh_directory(PATH_TO_BUILD_775_DIR)
+        catalog.close()
+
+        reopened_catalog = MetadataCatalog(catalog_path)
+        assert len(reopened_catalog.get_cataloged_paths()) == 26
+        reopened_catalog.close()
+
+
+def test_MetadataCatalog__rebuilds_tables_when_schema_version_does_not_match():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        catalog_path = os.path.join(tmp_dir, "my_catalog.sqlite")
+        catalog = MetadataCatalog(catalog_path)
+        catalog.refresh_directory(PATH_TO_BUILD_775_DIR)
+        catalog.close()
+        connection = sqlite3.connect(catalog_path)
+        connection.execute("PRAGMA user_version = 0")
+        connection.commit()
+        connection.close()
+
+        reopened_catalog = MetadataCatalog(catalog_path)
+        assert reopened_catalog.get_cataloged_paths() == set()
+        reopened_catalog.close()
+
+
+def test_MetadataCatalog__refresh_directory__does_not_reopen_files_already_cataloged(
+    build_775_catalog, mocker
+):
+    spied_read = mocker.spy(files.WellFile, "get_plate_barcode")
+    build_775_catalog.refresh_directory(PATH_TO_BUILD_775_DIR)
+    spied_read.assert_not_called()
+
+
+def test_MetadataCatalog__refresh_directory__only_opens_new_or_changed_files_and_evicts_removed_files(
+    mocker,
+):
+    source_dir = os.path.join(PATH_OF_CURRENT_FILE, "h5", "v0.3.1")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_names = [
+            f"MA20123456__2020_08_17_145752__{iter_well}.h5"
+            for iter_well in ("A1", "A2", "A3")
+        ]
+        for iter_name in file_names[:2]:
+            shutil.copy(os.path.join(source_dir, iter_name), tmp_dir)
+        catalog = MetadataCatalog(":memory:")
+        tmp_paths = [os.path.join(tmp_dir, iter_name) for iter_name in file_names]
+        assert catalog.refresh_directory(tmp_dir) == {
+            "added": sorted(tmp_paths[:2]),
+            "updated": [],
+            "removed": [],
+        }
+
+        os.remove(tmp_paths[0])
+        original_stat = os.stat(tmp_paths[1])
+        os.utime(
+            tmp_paths[1],
+            ns=(original_stat.st_atime_ns, original_stat.st_mtime_ns + 1000),
+        )
+        shutil.copy(os.path.join(source_dir, file_names[2]), tmp_dir)
+        spied_read = mocker.spy(files.WellFile, "get_plate_barcode")
+        assert catalog.refresh_directory(tmp_dir) == {
+            "added": [tmp_paths[2]],
+            "updated": [tmp_paths[1]],
+            "removed": [tmp_paths[0]],
+        }
+        assert spied_read.call_count == 2
+        assert catalog.get_cataloged_paths() == set(tmp_paths[1:])
+        assert catalog.get_metadata(tmp_paths[0]) == {}
+        catalog.close()
+
+
+def test_MetadataCatalog__refresh_directory__can_read_files_with_a_pool_of_workers():
+    catalog = MetadataCatalog(":memory:")
+    changes = catalog.refresh_directory(
+        PATH_TO_BUILD_775_DIR, max_workers=2, use_processes=True
+    )
+    assert len(changes["added"]) == 26
+    assert len(catalog.get_unique_files(PATH_TO_BUILD_775_DIR)) == 24
+    catalog.close()
+
+
+def test_MetadataCatalog__add_file__catalogs_a_single_file():
+    catalog = MetadataCatalog(":memory:")
+    file_path = os.path.join(
+        PATH_OF_CURRENT_FILE, "h5", "v0.3.1", "MA20123456__2020_08_17_145752__B3.h5"
+    )
+    catalog.add_file(file_path)
+    assert catalog.get_cataloged_paths() == {os.path.abspath(file_path)}
+    assert catalog.get_metadata(file_path)[WELL_NAME_UUID] == "B3"
+
+
+def test_MetadataCatalog__refresh_directory__evicts_all_files_of_a_deleted_directory():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        plate_dir = os.path.join(tmp_dir, "plate")
+        shutil.copytree(os.path.join(PATH_OF_CURRENT_FILE, "h5", "v0.3.1"), plate_dir)
+        catalog = MetadataCatalog(":memory:")
+        added_paths = catalog.refresh_directory(plate_dir)["added"]
+        shutil.rmtree(plate_dir)
+        assert catalog.refresh_directory(plate_dir) == {
+            "added": [],
+            "updated": [],
+            "removed": added_paths,
+        }
+        assert catalog.get_cataloged_paths() == set()
+        catalog.close()
+
+
+def test_MetadataCatalog__get_unique_files__drops_duplicates_and_only_returns_files_in_directory(
+    build_775_catalog,
+):
+    build_775_catalog.refresh_directory(
+        os.path.join(PATH_OF_CURRENT_FILE, "h5", "v0.3.1")
+    )
+    unique_files = build_775_catalog.get_unique_files(PATH_TO_BUILD_775_DIR)
+    assert len(unique_files) == 24
+    assert unique_files == files.get_unique_files_from_directory(PATH_TO_BUILD_775_DIR)
+
+
+def test_get_unique_files_from_directory__gives_the_same_files_with_a_catalog_as_without():
+    # with a relative path, and duplicates of some wells in the directory
+    directory = os.path.relpath(PATH_TO_BUILD_775_DIR)
+    catalog = MetadataCatalog(":memory:")
+    actual = files.get_unique_files_from_directory(directory, catalog=catalog)
+    assert actual == files.get_unique_files_from_directory(directory)
+    assert not os.path.isabs(actual[0])
+    catalog.close()
+
+
+def test_MetadataCatalog__only_gives_cataloged_files_inside_the_directory_tree():
+    source_dir = os.path.join(PATH_OF_CURRENT_FILE, "h5", "v0.3.1")
+    file_names = [
+        f"MA20123456__2020_08_17_145752__{iter_well}.h5"
+        for iter_well in ("A1", "A2", "A3", "B1")
+    ]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        plate_dir = os.path.join(tmp_dir, "plate")
+        # a sibling directory whose name starts with the name of the directory
+        other_plate_dir = os.path.join(tmp_dir, "plate_2")
+        os.makedirs(os.path.join(plate_dir, "sub_dir"))
+        os.makedirs(other_plate_dir)
+        for iter_name, iter_dir in zip(
+            file_names[:3],
+            (plate_dir, os.path.join(plate_dir, "sub_dir"), other_plate_dir),
+        ):
+            shutil.copy(os.path.join(source_dir, iter_name), iter_dir)
+        catalog = MetadataCatalog(":memory:")
+        catalog.refresh_directory(tmp_dir)
+        assert catalog.refresh_directory(plate_dir)["removed"] == []
+        # a file added after the directory was refreshed is not cataloged yet
+        shutil.copy(os.path.join(source_dir, file_names[3]), plate_dir)
+        assert catalog.get_unique_files(plate_dir) == [
+            os.path.join(plate_dir, file_names[0]),
+            os.path.join(plate_dir, "sub_dir", file_names[1]),
+        ]
+        catalog.close()
+
+
+def test_MetadataCatalog__get_specified_files__returns_matching_files(
+    build_775_catalog,
+):
+    unique_files = build_775_catalog.get_unique_files(PATH_TO_BUILD_775_DIR)
+    actual = build_775_catalog.get_specified_files("Well Name", "D6", unique_files)
+    assert actual == {
+        "Well Name": {
+            "D6": [
+                os.path.join(
+                    PATH_TO_BUILD_775_DIR, "MA20001010__2020_08_04_220041__D6.h5"
+                )
+            ]
+        }
+    }
+    user_id = UUID("455b93eb-c78f-4494-9f73-d3291130f126")
+    actual = build_775_catalog.get_specified_files("User ID", user_id, unique_files)
+    assert len(actual["User ID"][user_id]) == 24
+
+
+def test_MetadataCatalog__get_specified_files__returns_no_files_for_unrecognized_criteria(
+    build_775_catalog,
+):
+    unique_files = build_775_catalog.get_unique_files(PATH_TO_BUILD_775_DIR)
+    actual = build_775_catalog.get_specified_files("Color", "Blue", unique_files)
+    assert actual == {"Color": {"Blue": []}}
+
+
+def test_get_unique_files_from_directory__answers_from_catalog_when_given_one(mocker):
+    catalog = MetadataCatalog(":memory:")
+    unique_files = files.get_unique_files_from_directory(
+        PATH_TO_BUILD_775_DIR, catalog=catalog
+    )
+    assert len(unique_files) == 24
+
+    spied_read = mocker.spy(files.WellFile, "get_plate_barcode")
+    assert (
+        files.get_unique_files_from_directory(PATH_TO_BUILD_775_DIR, catalog=catalog)
+        == unique_files
+    )
+    spied_read.assert_not_called()
+
+
+def test_get_specified_files__answers_from_catalog_without_opening_files(
+    build_775_catalog, mocker
+):
+    unique_files = build_775_catalog.get_unique_files(PATH_TO_BUILD_775_DIR)
+    mocked_well_file = mocker.patch.object(files, "WellFile", autospec=True)
+    dictionary = files.get_specified_files(
+        "Plate Barcode", "MA20001010", unique_files, catalog=build_775_catalog
+    )
+    assert len(dictionary["Plate Barcode"]["MA20001010"]) == 24
+    mocked_well_file.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "search_criteria,criteria_value",
+    [
+        ("Plate Barcode", "MA20001010"),
+        ("Well Name", "A1"),
+        ("User ID", UUID("455b93eb-c78f-4494-9f73-d3291130f126")),
+        ("User ID", "455b93eb-c78f-4494-9f73-d3291130f126"),
+    ],
+)
+def test_get_specified_files__gives_the_same_files_with_an_unrefreshed_catalog_as_without(
+    search_criteria, criteria_value
+):
+    build_775_files = sorted(
+        os.path.join(PATH_TO_BUILD_775_DIR, iter_name)
+        for iter_name in os.listdir(PATH_TO_BUILD_775_DIR)
+        if iter_name.endswith(".h5")
+    )
+    expected = files.get_specified_files(
+        search_criteria, criteria_value, build_775_files
+    )
+    catalog = MetadataCatalog(":memory:")
+    actual = files.get_specified_files(
+        search_criteria, criteria_value, build_775_files, catalog=catalog
+    )
+    assert actual == expected
+    # the files that were read are now cataloged
+    assert len(catalog.get_cataloged_paths()) == 26
+    catalog.close()
+
+
+def test_MetadataCatalog__get_specified_files__reads_files_changed_since_they_were_cataloged():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, "MA20123456__2020_08_17_145752__A1.h5")
+        shutil.copy(
+            os.path.join(
+                PATH_OF_CURRENT_FILE,
+                "h5",
+                "v0.3.1",
+                "MA20123456__2020_08_17_145752__A1.h5",
+            ),
+            file_path,
+        )
+        catalog = MetadataCatalog(":memory:")
+        catalog.refresh_directory(tmp_dir)
+        with h5py.File(file_path, "r+") as h5_file:
+            h5_file.attrs[str(PLATE_BARCODE_UUID)] = "MA20999999"
+        assert catalog.get_specified_files(
+            "Plate Barcode", "MA20999999", [file_path]
+        ) == {"Plate Barcode": {"MA20999999": [file_path]}}
+        assert catalog.get_record(file_path)["plate_barcode"] == "MA20999999"
+        catalog.close()
+
+
+def test_MetadataCatalog__get_record__gives_cataloged_columns_of_an_unchanged_file(
+    build_775_catalog,
+):
+    file_path = os.path.join(
+        PATH_TO_BUILD_775_DIR, "MA20001010__2020_08_04_220041__D6.h5"
+    )
+    actual = build_775_catalog.get_record(file_path)
+    expected = read_catalog_record(file_path)
+    del expected["attributes"]
+    assert actual == expected
+
+
+def test_MetadataCatalog__get_record__gives_None_for_files_not_cataloged_or_changed_since(
+    build_775_catalog,
+):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, "MA20001010__2020_08_04_220041__D6.h5")
+        shutil.copy(
+            os.path.join(PATH_TO_BUILD_775_DIR, os.path.basename(file_path)), file_path
+        )
+        assert build_775_catalog.get_record(file_path) is None
+
+        build_775_catalog.add_file(file_path)
+        assert build_775_catalog.get_record(file_path) is not None
+        os.utime(file_path, ns=(0, 0))
+        assert build_775_catalog.get_record(file_path) is None
+
+        build_775_catalog.add_file(file_path)
+        os.remove(file_path)
+        assert build_775_catalog.get_record(file_path) is None
+
+
+def test_PlateRecording__lazy__validates_cataloged_wells_without_opening_them(
+    build_775_catalog, mocker
+):
+    spied_init = mocker.spy(files.WellFile, "__init__")
+    plate_recording = PlateRecording.from_directory(
+        PATH_TO_BUILD_775_DIR, lazy=True, catalog=build_775_catalog
+    )
+    spied_init.assert_not_called()
+    expected = PlateRecording.from_directory(PATH_TO_BUILD_775_DIR)
+    assert plate_recording.get_well_indices() == expected.get_well_indices()
+    assert plate_recording.get_wellfile_names() == expected.get_wellfile_names()
+    spied_init.reset_mock()
+    assert plate_recording.get_well_by_index(0).get_well_name() == "A1"
+    assert spied_init.call_count == 1
+
+
+def test_PlateRecording__lazy__opens_only_wells_whose_catalog_record_is_out_of_date(
+    mocker,
+):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for iter_file_name in os.listdir(PATH_TO_BUILD_775_DIR):
+            shutil.copy(os.path.join(PATH_TO_BUILD_775_DIR, iter_file_name), tmp_dir)
+        catalog = MetadataCatalog(":memory:")
+        catalog.refresh_directory(tmp_dir)
+        os.utime(
+            os.path.join(tmp_dir, "MA20001010__2020_08_04_220041__D6.h5"), ns=(0, 0)
+        )
+        spied_init = mocker.spy(files.WellFile, "__init__")
+        PlateRecording.from_directory(tmp_dir, lazy=True, catalog=catalog)
+        catalog.close()
+    assert spied_init.call_count == 1
+
+
+def test_PlateRecording__lazy__raises_error_for_a_cataloged_file_version_that_is_not_supported():
+    file_path = os.path.join(
+        PATH_OF_CURRENT_FILE, "h5", "v0.1", "MA20001100__2020_07_15_172203__A4.h5"
+    )
+    catalog = MetadataCatalog(":memory:")
+    catalog.add_file(file_path)
+    with pytest.raises(UnsupportedMantarrayFileVersionError):
+        PlateRecording([file_path], lazy=True, catalog=catalog)
+    catalog.close()
@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+import importlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import h5py
+from immutable_data_validation.errors import ValidationCollectionMinimumValueError
+from mantarray_file_manager import columnar
+from mantarray_file_manager import COLUMNAR_FILE_FORMATS
+from mantarray_file_manager import COLUMNAR_METADATA_KEY
+from mantarray_file_manager import DuplicateWellNameError
+from mantarray_file_manager import export_plate_recording_to_columns
+from mantarray_file_manager import export_plate_recordings_to_columns
+from mantarray_file_manager import get_supported_columnar_file_formats
+from mantarray_file_manager import PlateRecording
+from mantarray_file_manager import PlateRecordingWithoutWellsError
+from mantarray_file_manager import SENSOR_NAMES
+from mantarray_file_manager import UnsupportedColumnarFileFormatError
+from mantarray_file_manager import UnsupportedSensorNameError
+from mantarray_file_manager import WELL_INDEX_UUID
+from mantarray_file_manager import WellFile
+import numpy as np
+import pytest
+from stdlib_utils import get_current_file_abs_directory
+
+from .fixtures import fixture_plate_96_well_dir
+from .fixtures import PATH_TO_GENERIC_0_3_1_FILE
+
+PATH_OF_CURRENT_FILE = get_current_file_abs_directory()
+
+__fixtures__ = (fixture_plate_96_well_dir,)
+
+
+def _assert_columns_match_plate(columns, metadata, plate_recording, sensor_name):
+    well_indices = plate_recording.get_well_indices()
+    assert metadata["sensor_name"] == sensor_name
+    assert len(metadata["wells"]) == len(well_indices)
+    for iter_well_metadata, iter_well_index in zip(metadata["wells"], well_indices):
+        well_file = plate_recording.get_well_by_index(iter_well_index)
+        times, expected_values = getattr(
+            well_file, f"get_raw_{sensor_name}_reading_with_time_axis"
+        )()
+        assert iter_well_metadata["well_name"] == well_file.get_well_name()
+        assert iter_well_metadata["well_index"] == iter_well_index
+        assert iter_well_metadata["plate_barcode"] == well_file.get_plate_barcode()
+        assert iter_well_metadata["num_samples"] == len(expected_values)
+        np.testing.assert_array_equal(
+            iter_well_metadata["time_offset_centimilliseconds"]
+            + iter_well_metadata["time_step_centimilliseconds"]
+            * np.arange(len(expected_values)),
+            times,
+        )
+        np.testing.assert_array_equal(
+            columns[well_file.get_well_name()], expected_values
+        )
+
+
+def _read_npz_file(file_path):
+    with np.load(file_path) as npz_file:
+        metadata = json.loads(str(npz_file[COLUMNAR_METADATA_KEY]))
+        columns = {
+            iter_name: npz_file[iter_name]
+            for iter_name in npz_file.files
+            if iter_name != COLUMNAR_METADATA_KEY
+        }
+    return columns, metadata
+
+
+def test_columnar_constants():
+    assert COLUMNAR_FILE_FORMATS == ("parquet", "npz")
+    assert COLUMNAR_METADATA_KEY == "mantarray_metadata"
+    assert SENSOR_NAMES == ("tissue", "reference")
+
+
+@pytest.mark.parametrize("sensor_name", ["tissue", "reference"])
+def test_export_plate_recording_to_columns__writes_an_npz_file_with_an_array_per_well_and_the_metadata(
+    sensor_name,
+):
+    plate_recording = PlateRecording.from_directory(
+        os.path.dirname(PATH_TO_GENERIC_0_3_1_FILE)
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, "plate.npz")
+        export_plate_recording_to_columns(
+            plate_recording, file_path, sensor_name=sensor_name
+        )
+        columns, metadata = _read_npz_file(file_path)
+    assert list(columns) == [
+        plate_recording.get_well_by_index(iter_index).get_well_name()
+        for iter_index in plate_recording.get_well_indices()
+    ]
+    _assert_columns_match_plate(columns, metadata, plate_recording, sensor_name)
+    assert metadata["wells"][0]["begin_recording"] == str(
+        plate_recording.get_well_by_index(0).get_begin_recording()
+    )
+
+
+def test_export_plate_recording_to_columns__reads_and_writes_one_group_of_rows_at_a_time(
+    mocker,
+):
+    plate_recording = PlateRecording.from_directory(
+        os.path.join(PATH_OF_CURRENT_FILE, "2020_08_04_build_775")
+    )
+    spied_read = mocker.spy(WellFile, "get_raw_tissue_reading_with_time_axis")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, "plate")
+        export_plate_recording_to_columns(
+            plate_recording, file_path, file_format="npz", rows_per_group=1000
+        )
+        assert spied_read.call_count > 2 * 24
+        for iter_call in spied_read.call_args_list:
+            _, start_index, stop_index = iter_call[0]
+            assert stop_index - start_index <= 1000
+        columns, metadata = _read_npz_file(file_path)
+    _assert_columns_match_plate(columns, metadata, plate_recording, "tissue")
+
+
+def test_export_plate_recording_to_columns__writes_a_plate_without_wells():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, "plate.npz")
+        export_plate_recording_to_columns(PlateRecording([]), file_path)
+        columns, metadata = _read_npz_file(file_path)
+    assert columns == dict()
+    assert metadata == {"sensor_name": "tissue", "wells": []}
+
+
+def test_export_plate_recording_to_columns__writes_a_parquet_file_with_a_row_group_per_group_of_rows():
+    pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+    plate_recording = PlateRecording.from_directory(
+        os.path.dirname(PATH_TO_GENERIC_0_3_1_FILE)
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, "plate.parquet")
+        export_plate_recording_to_columns(
+            plate_recording, file_path, sensor_name="reference", rows_per_group=1000
+        )
+        parquet_file = pyarrow_parquet.ParquetFile(file_path)
+        max_num_samples = parquet_file.metadata.num_rows
+        assert parquet_file.num_row_groups == -(-max_num_samples // 1000)
+        table = parquet_file.read()
+    metadata = json.loads(table.schema.metadata[COLUMNAR_METADATA_KEY.encode()])
+    columns = dict()
+    for iter_name in table.column_names:
+        column = table.column(iter_name).to_numpy()
+        num_samples = len(column) - table.column(iter_name).null_count
+        # wells with fewer samples are padded with nulls
+        assert np.isnan(column[num_samples:]).all()
+        columns[iter_name] = column[:num_samples]
+    _assert_columns_match_plate(columns, metadata, plate_recording, "reference")
+
+
+@pytest.mark.parametrize(
+    "file_name,file_format",
+    [("plate.csv", None), ("plate.npz", "csv"), ("plate", None)],
+)
+def test_export_plate_recording_to_columns__raises_error_if_format_is_not_supported(
+    file_name, file_format
+):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with pytest.raises(UnsupportedColumnarFileFormatError, match="npz"):
+            export_plate_recording_to_columns(
+                PlateRecording([]),
+                os.path.join(tmp_dir, file_name),
+                file_format=file_format,
+            )
+        assert os.listdir(tmp_dir) == []
+
+
+def test_export_plate_recording_to_columns__raises_error_for_parquet_if_pyarrow_is_not_installed(
+    mocker,
+):
+    mocker.patch.object(columnar, "pyarrow", None)
+    assert get_supported_columnar_file_formats() == ("npz",)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with pytest.raises(UnsupportedColumnarFileFormatError, match="pyarrow"):
+            export_plate_recording_to_columns(
+                PlateRecording([]), os.path.join(tmp_dir, "plate.parquet")
+            )
+
+
+def test_columnar__does_not_support_parquet_if_pyarrow_cannot_be_imported(mocker):
+    mocker.patch.dict(sys.modules, {"pyarrow": None, "pyarrow.parquet": None})
+    try:
+        importlib.reload(columnar)
+        assert columnar.pyarrow is None
+        assert get_supported_columnar_file_formats() == ("npz",)
+    finally:
+        mocker.stopall()
+        importlib.reload(columnar)
+    assert get_supported_columnar_file_formats() == COLUMNAR_FILE_FORMATS
+
+
+def test_get_supported_columnar_file_formats__includes_parquet_if_pyarrow_is_installed(
+    mocker,
+):
+    mocker.patch.object(columnar, "pyarrow", object())
+    assert get_supported_columnar_file_formats() == COLUMNAR_FILE_FORMATS
+
+
+def test_export_plate_recording_to_columns__raises_error_if_sensor_is_unknown():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with pytest.raises(UnsupportedSensorNameError, match="'magnetometer'"):
+            export_plate_recording_to_columns(
+                PlateRecording([]),
+                os.path.join(tmp_dir, "plate.npz"),
+                sensor_name="magnetometer",
+            )
+
+
+def test_export_plate_recording_to_columns__raises_error_if_rows_per_group_is_not_positive():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with pytest.raises(ValidationCollectionMinimumValueError):
+            export_plate_recording_to_columns(
+                PlateRecording([]),
+                os.path.join(tmp_dir, "plate.npz"),
+                rows_per_group=0,
+            )
+
+
+def test_export_plate_recording_to_columns__raises_error_if_wells_have_the_same_name():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for iter_well_index in range(3):
+            file_path = os.path.join(tmp_dir, f"well_{iter_well_index}.h5")
+            shutil.copy(PATH_TO_GENERIC_0_3_1_FILE, file_path)
+            with h5py.File(file_path, "r+") as h5_file:
+                h5_file.attrs[str(WELL_INDEX_UUID)] = iter_well_index
+        plate_recording = PlateRecording.from_directory(tmp_dir)
+        file_path = os.path.join(tmp_dir, "plate.npz")
+        with pytest.raises(DuplicateWellNameError, match=r"\['B3'\]"):
+            export_plate_recording_to_columns(plate_recording, file_path)
+        assert not os.path.exists(file_path)
+
+
+def test_export_plate_recordings_to_columns__raises_error_before_writing_any_file_if_a_plate_has_no_wells():
+    plate_recordings = [
+        PlateRecording.from_directory(os.path.dirname(PATH_TO_GENERIC_0_3_1_FILE)),
+        PlateRecording([]),
+    ]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with pytest.raises(PlateRecordingWithoutWellsError):
+            export_plate_recordings_to_columns(plate_recordings, tmp_dir)
+        assert os.listdir(tmp_dir) == []
+
+
+def test_export_plate_recordings_to_columns__writes_a_file_per_plate():
+    plate_recordings = [
+        PlateRecording.from_directory(os.path.dirname(PATH_TO_GENERIC_0_3_1_FILE)),
+        PlateRecording.from_directory(
+            os.path.join(PATH_OF_CURRENT_FILE, "2020_08_04_build_775")
+        ),
+    ]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_paths = export_plate_recordings_to_columns(
+            plate_recordings, tmp_dir, sensor_name="reference"
+        )
+        assert [os.path.basename(iter_path) for iter_path in file_paths] == [
+            "MA20123456__2020_08_17_145810__reference.npz",
+            "MA20001010__2020_08_04_220127__reference.npz",
+        ]
+        for iter_path, iter_plate_recording in zip(file_paths, plate_recordings):
+            columns, metadata = _read_npz_file(iter_path)
+            _assert_columns_match_plate(
+                columns, metadata, iter_plate_recording, "reference"
+            )
+
+
+def test_export_plate_recordings_to_columns__accepts_a_single_plate():
+    plate_recording = PlateRecording.from_directory(
+        os.path.dirname(PATH_TO_GENERIC_0_3_1_FILE)
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_paths = export_plate_recordings_to_columns(plate_recording, tmp_dir)
+        assert file_paths == [
+            os.path.join(tmp_dir, "MA20123456__2020_08_17_145810__tissue.npz")
+        ]
+        columns, metadata = _read_npz_file(file_paths[0])
+    _assert_columns_match_plate(columns, metadata, plate_recording, "tissue")
+
+
+def test_prof_export_plate_recording_to_columns(plate_96_well_dir):
+    # export the reference values of a 96-well plate
+    #                                 duration (ns)    peak bytes allocated
+    # a dict of rows, cell by cell:   1031946341.00    43462897
+    # columnar npz file:              103179032.00     769543
+    plate_recording = PlateRecording.from_directory(plate_96_well_dir)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, "plate.npz")
+        start = time.perf_counter_ns()
+        export_plate_recording_to_columns(
+            plate_recording, file_path, sensor_name="reference"
+        )
+        dur = time.perf_counter_ns() - start
+
+        tracemalloc.start()
+        try:
+            export_plate_recording_to_columns(
+                plate_recording, file_path, sensor_name="reference"
+            )
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    # print(dur, peak)
+    assert dur < 1000000000
+    assert peak < 5000000
@@ -6,13 +6,19 @@ from mantarray_file_manager import ADC_REF_OFFSET_UUID
 from mantarray_file_manager import ADC_TISSUE_OFFSET_UUID
 from mantarray_file_manager import BACKEND_LOG_UUID
 from mantarray_file_manager import BARCODE_IS_FROM_SCANNER_UUID
+from mantarray_file_manager import CATALOG_FILE_NAME
+from mantarray_file_manager import CATALOG_SCHEMA_VERSION
 from mantarray_file_manager import CENTIMILLISECONDS_PER_SECOND
 from mantarray_file_manager import COMPUTER_NAME_HASH_UUID
+from mantarray_file_manager import CONSOLIDATED_PLATE_FILE_FORMAT_VERSION
+from mantarray_file_manager import CONSOLIDATED_PLATE_FILE_FORMAT_VERSION_METADATA_KEY
 from mantarray_file_manager import CURI_BIO_ACCOUNT_UUID
 from mantarray_file_manager import CURI_BIO_USER_ACCOUNT_ID
 from mantarray_file_manager import CURRENT_HDF5_FILE_FORMAT_VERSION
 from mantarray_file_manager import CUSTOMER_ACCOUNT_ID_UUID
 from mantarray_file_manager import DATETIME_STR_FORMAT
+from mantarray_file_manager import DEFAULT_MAX_OPEN_H5_FILES
+from mantarray_file_manager import DEFAULT_READING_BLOCK_SIZE
 from mantarray_file_manager import FILE_FORMAT_VERSION_METADATA_KEY
 from mantarray_file_manager import FILE_MIGRATION_PATHS
 from mantarray_file_manager import FILE_VERSION_PRIOR_TO_MIGRATION_UUID
@@ -25,11 +31,14 @@ from mantarray_file_manager import METADATA_UUID_DESCRIPTIONS
 from mantarray_file_manager import MICROSECONDS_PER_CENTIMILLISECOND
 from mantarray_file_manager import MIN_SUPPORTED_FILE_VERSION
 from mantarray_file_manager import NOT_APPLICABLE_H5_METADATA
+from mantarray_file_manager import NUM_SAMPLES_METADATA_KEY
 from mantarray_file_manager import ORIGINAL_FILE_VERSION_UUID
+from mantarray_file_manager import OVERVIEW_REDUCTION_FACTORS
 from mantarray_file_manager import PLATE_BARCODE_UUID
 from mantarray_file_manager import REF_SAMPLING_PERIOD_UUID
 from mantarray_file_manager import REFERENCE_SENSOR_READINGS
 from mantarray_file_manager import REFERENCE_VOLTAGE_UUID
+from mantarray_file_manager import SENSOR_OVERVIEWS_GROUP_NAME
 from mantarray_file_manager import SLEEP_FIRMWARE_VERSION_UUID
 from mantarray_file_manager import SOFTWARE_BUILD_NUMBER_UUID
 from mantarray_file_manager import SOFTWARE_RELEASE_VERSION_UUID
@@ -47,6 +56,7 @@ from mantarray_file_manager import UTC_FIRST_TISSUE_DATA_POINT_UUID
 from mantarray_file_manager import UTC_TIMESTAMP_OF_FILE_VERSION_MIGRATION_UUID
 from mantarray_file_manager import WELL_COLUMN_UUID
 from mantarray_file_manager import WELL_INDEX_UUID
+from mantarray_file_manager import WELL_METADATA_GROUP_NAME
 from mantarray_file_manager import WELL_NAME_UUID
 from mantarray_file_manager import WELL_ROW_UUID
 from mantarray_file_manager import XEM_SERIAL_NUMBER_UUID
@@ -204,3 +214,31 @@ def test_file_migration_paths():
 def test_sensor_data_types():
     assert TISSUE_SENSOR_READINGS == "tissue_sensor_readings"
     assert REFERENCE_SENSOR_READINGS == "reference_sensor_readings"
+
+
+def test_catalog():
+    assert CATALOG_FILE_NAME == "mantarray_file_catalog.sqlite"
+    assert CATALOG_SCHEMA_VERSION == 2
+
+
+def test_file_handles():
+    assert DEFAULT_MAX_OPEN_H5_FILES == 128
+
+
+def test_reading_blocks():
+    assert DEFAULT_READING_BLOCK_SIZE == 65536
+
+
+def test_sensor_overviews():
+    assert SENSOR_OVERVIEWS_GROUP_NAME == "sensor_overviews"
+    assert OVERVIEW_REDUCTION_FACTORS == (10, 100, 1000)
+
+
+def test_consolidated_plate_file():
+    assert CONSOLIDATED_PLATE_FILE_FORMAT_VERSION == "0.1.0"
+    assert (
+        CONSOLIDATED_PLATE_FILE_FORMAT_VERSION_METADATA_KEY
+        == "Consolidated Plate File Format Version"
+    )
+    assert WELL_METADATA_GROUP_NAME == "well_metadata"
+    assert NUM_SAMPLES_METADATA_KEY == "num_samples"
@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+
+import h5py
+from immutable_data_validation.errors import ValidationCollectionMinimumValueError
+from mantarray_file_manager import decimate_reading
+from mantarray_file_manager import DECIMATION_METHODS
+from mantarray_file_manager import PlateRecording
+from mantarray_file_manager import SENSOR_OVERVIEWS_GROUP_NAME
+from mantarray_file_manager import TISSUE_SENSOR_READINGS
+from mantarray_file_manager import UnsupportedDecimationMethodError
+from mantarray_file_manager import WellFile
+from mantarray_file_manager.decimation import lttb_decimate_samples
+from mantarray_file_manager.decimation import min_max_decimate_samples
+from mantarray_file_manager.decimation import reduce_to_min_max_bins
+import numpy as np
+import pytest
+from stdlib_utils import get_current_file_abs_directory
+
+from .fixtures import fixture_current_version_file_path
+from .fixtures import fixture_sensor_overviews_file_path
+from .fixtures import PATH_TO_GENERIC_0_3_1_FILE
+
+__fixtures__ = (fixture_current_version_file_path, fixture_sensor_overviews_file_path)
+PATH_OF_CURRENT_FILE = get_current_file_abs_directory()
+
+
+@pytest.fixture(scope="function", name="noisy_reading")
+def fixture_noisy_reading():
+    num_samples = 10007
+    times = np.arange(num_samples, dtype=np.int32) * 160 + 440
+    values = (
+        np.sin(np.arange(num_samples) / 300) * 100000
+        + np.random.default_rng(0).normal(0, 5000, num_samples)
+    ).astype(np.int32)
+    yield np.array((times, values), dtype=np.int32)
+
+
+def _get_sample_reader(reading):
+    return lambda start, stop: (reading[0, start:stop], reading[1, start:stop])
+
+
+def _lttb_for_comparison(reading, num_points):
+    num_samples = reading.shape[1]
+    times = reading[0].astype(np.float64)
+    values = reading[1].astype(np.float64)
+    edges = np.linspace(1, num_samples - 1, num_points - 1).astype(np.int64)
+    kept_indices = [0]
+    for iter_bucket in range(num_points - 2):
+        bucket = range(edges[iter_bucket], edges[iter_bucket + 1])
+        if iter_bucket + 2 < len(edges):
+            next_bucket = slice(edges[iter_bucket + 1], edges[iter_bucket + 2])
+            next_time = times[next_bucket].mean()
+            next_value = values[next_bucket].mean()
+        else:
+            next_time = times[-1]
+            next_value = values[-1]
+        previous = kept_indices[-1]
+        areas = [
+            abs(
+                (times[previous] - next_time) * (values[iter_index] - values[previous])
+                - (times[previous] - times[iter_index])
+                * (next_value - values[previous])
+            )
+            for iter_index in bucket
+        ]
+        kept_indices.append(bucket[int(np.argmax(areas))])
+    kept_indices.append(num_samples - 1)
+    return reading[:, kept_indices]
+
+
+def test_decimate_reading__min_max__keeps_minimum_and_maximum_of_each_bin(
+    noisy_reading,
+):
+    actual = decimate_reading(noisy_reading, 200, method="min_max")
+    assert actual.dtype == np.int32
+    assert actual.shape[1] <= 200
+    assert np.all(np.diff(actual[0]) > 0)
+    bin_size = -(-noisy_reading.shape[1] // 100)
+    for iter_bin_start in range(0, noisy_reading.shape[1], bin_size):
+        bin_reading = noisy_reading[:, iter_bin_start : iter_bin_start + bin_size]
+        for iter_index in (bin_reading[1].argmin(), bin_reading[1].argmax()):
+            assert bin_reading[0, iter_index] in actual[0]
+    kept_indices = (actual[0] - 440) // 160
+    np.testing.assert_array_equal(actual[1], noisy_reading[1, kept_indices])
+
+
+def test_decimate_reading__lttb__keeps_same_points_as_straightforward_implementation(
+    noisy_reading,
+):
+    actual = decimate_reading(noisy_reading, 300, method="lttb")
+    assert actual.shape == (2, 300)
+    np.testing.assert_array_equal(actual, _lttb_for_comparison(noisy_reading, 300))
+
+
+@pytest.mark.parametrize(
+    "decimate,num_points",
+    [(min_max_decimate_samples, 200), (lttb_decimate_samples, 300)],
+)
+def test_decimation__gives_same_result_when_read_in_small_blocks(
+    decimate, num_points, noisy_reading
+):
+    num_samples = noisy_reading.shape[1]
+    expected = decimate(
+        _get_sample_reader(noisy_reading),
+        num_samples,
+        num_points,
+        block_size=num_samples,
+    )
+    actual = decimate(
+        _get_sample_reader(noisy_reading), num_samples, num_points, block_size=1000
+    )
+    np.testing.assert_array_equal(actual, expected)
+
+
+@pytest.mark.parametrize("method", sorted(DECIMATION_METHODS))
+def test_decimate_reading__keeps_all_samples_when_there_are_few_enough(
+    method, noisy_reading
+):
+    short_reading = noisy_reading[:, :50]
+    np.testing.assert_array_equal(
+        decimate_reading(short_reading, 50, method=method), short_reading
+    )
+
+
+def test_decimate_reading__raises_error_for_unsupported_method(noisy_reading):
+    with pytest.raises(UnsupportedDecimationMethodError, match="'mean'"):
+        decimate_reading(noisy_reading, 100, method="mean")
+
+
+@pytest.mark.parametrize("method,num_points", [("min_max", 1), ("lttb", 2)])
+def test_decimate_reading__raises_error_for_too_few_points(
+    method, num_points, noisy_reading
+):
+    with pytest.raises(ValidationCollectionMinimumValueError):
+        decimate_reading(noisy_reading, num_points, method=method)
+
+
+@pytest.mark.parametrize("method", sorted(DECIMATION_METHODS))
+@pytest.mark.parametrize("sensor_name", ["tissue", "reference"])
+def test_WellFile__get_decimated_reading__gives_same_result_as_decimating_raw_reading(
+    sensor_name, method
+):
+    expected = decimate_reading(
+        getattr(
+            WellFile(PATH_TO_GENERIC_0_3_1_FILE), f"get_raw_{sensor_name}_reading"
+        )(),
+        100,
+        method=method,
+    )
+    actual = getattr(
+        WellFile(PATH_TO_GENERIC_0_3_1_FILE), f"get_decimated_{sensor_name}_reading"
+    )(100, method=method)
+    np.testing.assert_array_equal(actual, expected)
+
+
+@pytest.mark.parametrize("sensor_name", ["tissue", "reference"])
+def test_PlateRecording__get_decimated_readings__decimates_each_well(sensor_name):
+    plate_recording = PlateRecording.from_directory(
+        os.path.join(PATH_OF_CURRENT_FILE, "h5", "v0.3.1")
+    )
+    actual = getattr(plate_recording, f"get_decimated_{sensor_name}_readings")(
+        100, method="lttb"
+    )
+    assert tuple(actual.keys()) == plate_recording.get_well_indices()
+    for iter_well_index, iter_reading in actual.items():
+        assert iter_reading.shape == (2, 100)
+        np.testing.assert_array_equal(
+            iter_reading,
+            decimate_reading(
+                getattr(
+                    plate_recording.get_well_by_index(iter_well_index),
+                    f"get_raw_{sensor_name}_reading",
+                )(),
+                100,
+                method="lttb",
+            ),
+        )
+
+
+def _get_overview_for_comparison(reading, samples_per_bin):
+    bin_starts = range(0, reading.shape[1], samples_per_bin)
+    return np.array(
+        (
+            reading[0, ::samples_per_bin],
+            [reading[1, i : i + samples_per_bin].min() for i in bin_starts],
+            [reading[1, i : i + samples_per_bin].max() for i in bin_starts],
+        )
+    )
+
+
+def test_reduce_to_min_max_bins__combines_pairs_including_a_partial_last_bin():
+    actual = reduce_to_min_max_bins(
+        np.array([3, 1, 4, 1, 5, 9, 2]), np.array([6, 5, 3, 5, 8, 9, 7]), 3
+    )
+    np.testing.assert_array_equal(actual[0], [1, 1, 2])
+    np.testing.assert_array_equal(actual[1], [6, 9, 7])
+
+
+@pytest.mark.parametrize(
+    "num_bins,expected_samples_per_bin,test_description",
+    [
+        (50, 3000, "groups 1000x overview"),
+        (1000, 200, "groups 100x overview"),
+        (5000, 30, "groups 10x overview"),
+        (100000, 2, "reduces raw samples when no overview is fine enough"),
+        (200000, 1, "keeps every sample when there are fewer than num_bins"),
+    ],
+)
+def test_WellFile__get_tissue_overview__gives_minimum_and_maximum_of_each_bin(
+    num_bins, expected_samples_per_bin, test_description, sensor_overviews_file_path
+):
+    well_file = WellFile(sensor_overviews_file_path)
+    expected = _get_overview_for_comparison(
+        well_file.get_raw_tissue_reading(), expected_samples_per_bin
+    )
+    actual = well_file.get_tissue_overview(num_bins)
+    assert actual.dtype == np.int32
+    np.testing.assert_array_equal(actual, expected)
+
+
+def test_WellFile__get_tissue_overview__reads_only_the_stored_overview_when_one_fits(
+    sensor_overviews_file_path, mocker
+):
+    well_file = WellFile(sensor_overviews_file_path)
+    spied_read = mocker.spy(well_file, "_read_sensor_values")
+    well_file.get_tissue_overview(100)
+    spied_read.assert_not_called()
+
+
+def test_WellFile__get_tissue_overview__ignores_overviews_of_a_different_number_of_samples(
+    sensor_overviews_file_path,
+):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, "stale_overviews.h5")
+        shutil.copy(sensor_overviews_file_path, file_path)
+        with h5py.File(file_path, "r+") as h5_file:
+            values = h5_file[TISSUE_SENSOR_READINGS][:-2000]
+            del h5_file[TISSUE_SENSOR_READINGS]
+            h5_file.create_dataset(TISSUE_SENSOR_READINGS, data=values)
+        well_file = WellFile(file_path)
+        expected = _get_overview_for_comparison(
+            well_file.get_raw_tissue_reading(), 2430
+        )
+        actual = well_file.get_tissue_overview(50)
+        well_file.close()  # safe clean-up when running CI on windows systems
+    np.testing.assert_array_equal(actual, expected)
+
+
+@pytest.mark.parametrize("sensor_name", ["tissue", "reference"])
+def test_WellFile__get_overview__reduces_raw_samples_of_a_file_without_overviews(
+    sensor_name, current_version_file_path
+):
+    well_file = WellFile(current_version_file_path)
+    assert SENSOR_OVERVIEWS_GROUP_NAME not in well_file.get_h5_file()
+    raw_reading = getattr(well_file, f"get_raw_{sensor_name}_reading")()
+    num_bins = 40
+    expected = _get_overview_for_comparison(
+        raw_reading, -(-raw_reading.shape[1] // num_bins)
+    )
+    actual = getattr(well_file, f"get_{sensor_name}_overview")(num_bins)
+    np.testing.assert_array_equal(actual, expected)
+
+
+def test_WellFile__get_tissue_overview__raises_error_for_too_few_bins(
+    sensor_overviews_file_path,
+):
+    with pytest.raises(ValidationCollectionMinimumValueError):
+        WellFile(sensor_overviews_file_path).get_tissue_overview(0)
+
+
+@pytest.mark.parametrize("sensor_name", ["tissue", "reference"])
+def test_PlateRecording__get_overviews__gives_overview_of_each_well(sensor_name):
+    plate_recording = PlateRecording.from_directory(
+        os.path.join(PATH_OF_CURRENT_FILE, "h5", "v0.3.1")
+    )
+    actual = getattr(plate_recording, f"get_{sensor_name}_overviews")(100)
+    assert tuple(actual.keys()) == plate_recording.get_well_indices()
+    for iter_well_index, iter_overview in actual.items():
+        np.testing.assert_array_equal(
+            iter_overview,
+            getattr(
+                plate_recording.get_well_by_index(iter_well_index),
+                f"get_{sensor_name}_overview",
+            )(100),
+        )
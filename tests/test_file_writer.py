@@ -1,32 +1,59 @@
 # -*- coding: utf-8 -*-
 
 import os
+import shutil
 import tempfile
 
+import h5py
 from immutable_data_validation.errors import ValidationCollectionMinimumValueError
 from immutable_data_validation.errors import ValidationCollectionNotAnIntegerError
+from mantarray_file_manager import add_sensor_overviews_to_file
 from mantarray_file_manager import BasicWellFile
+from mantarray_file_manager import CONSOLIDATED_PLATE_FILE_FORMAT_VERSION
+from mantarray_file_manager import CONSOLIDATED_PLATE_FILE_FORMAT_VERSION_METADATA_KEY
 from mantarray_file_manager import CURRENT_HDF5_FILE_FORMAT_VERSION
+from mantarray_file_manager import export_consolidated_plate_file
+from mantarray_file_manager import file_writer
+from mantarray_file_manager import get_h5_file_handle_pool
 from mantarray_file_manager import IS_FILE_ORIGINAL_UNTRIMMED_UUID
 from mantarray_file_manager import MantarrayFileNotLatestVersionError
 from mantarray_file_manager import MantarrayH5FileCreator
+from mantarray_file_manager import NUM_SAMPLES_METADATA_KEY
+from mantarray_file_manager import OVERVIEW_REDUCTION_FACTORS
+from mantarray_file_manager import PlateRecording
+from mantarray_file_manager import REFERENCE_SENSOR_READINGS
+from mantarray_file_manager import SENSOR_OVERVIEWS_GROUP_NAME
+from mantarray_file_manager import TISSUE_SENSOR_READINGS
 from mantarray_file_manager import TRIMMED_TIME_FROM_ORIGINAL_END_UUID
 from mantarray_file_manager import TRIMMED_TIME_FROM_ORIGINAL_START_UUID
 from mantarray_file_manager import WELL_INDEX_UUID
+from mantarray_file_manager import WELL_METADATA_GROUP_NAME
 from mantarray_file_manager import WELL_NAME_UUID
 from mantarray_file_manager import WellFile
+from mantarray_file_manager import write_sensor_overviews
 from mantarray_file_manager.exceptions import TooTrimmedError
 from mantarray_file_manager.exceptions import UnsupportedArgumentError
 from mantarray_file_manager.file_writer import h5_file_trimmer
+import numpy as np
 import pytest
 from stdlib_utils import get_current_file_abs_directory
 
+from .fixtures import fixture_consolidated_plate_file_path
 from .fixtures import fixture_current_version_file_path
+from .fixtures import fixture_long_recording_file_path
+from .fixtures import fixture_sensor_overviews_file_path
 from .fixtures import fixture_trimmed_file_path
+from .fixtures import PATH_TO_GENERIC_0_3_1_FILE
 
 PATH_OF_CURRENT_FILE = get_current_file_abs_directory()
 
-__fixtures__ = (fixture_current_version_file_path, fixture_trimmed_file_path)
+__fixtures__ = (
+    fixture_consolidated_plate_file_path,
+    fixture_current_version_file_path,
+    fixture_long_recording_file_path,
+    fixture_sensor_overviews_file_path,
+    fixture_trimmed_file_path,
+)
 
 
 def test_MantarrayH5FileCreator__sets_file_name_and_userblock_size_and_file_version():
@@ -212,7 +239,6 @@ def test_h5_file_trimmer__When_invoked_on_a_trimmed_file__Then_the_new_file_is_a
     trimmed_file_path,
     mocker,
 ):
-
     mocked_print = mocker.patch("builtins.print", autospec=True)
 
     mocked_trimmed_str = "160 centimilliseconds"
@@ -245,3 +271,277 @@ def test_h5_file_trimmer__When_invoked_on_a_trimmed_file__Then_the_new_file_is_a
         assert reference_data[1][-1] == -4089447
 
         wf.get_h5_file().close()  # safe clean-up when running CI on windows systems
+
+
+def test_h5_file_trimmer__When_invoked_on_a_recording_too_long_for_int32_times__Then_the_new_file_has_correctly_trimmed_data(
+    long_recording_file_path, mocker
+):
+    mocker.patch("builtins.print", autospec=True)
+    old_tissue_data = WellFile(long_recording_file_path).get_raw_tissue_reading()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        new_file_path = h5_file_trimmer(
+            long_recording_file_path, tmp_dir, from_start=100000, from_end=100000
+        )
+        wf = WellFile(new_file_path)
+        assert wf.get_h5_attribute(str(TRIMMED_TIME_FROM_ORIGINAL_START_UUID)) == 100000
+        tissue_data = wf.get_raw_tissue_reading()
+        assert tissue_data.dtype == np.int64
+        np.testing.assert_array_equal(tissue_data, old_tissue_data[:, 1:-1])
+
+        wf.close()  # safe clean-up when running CI on windows systems
+
+
+@pytest.mark.parametrize(
+    "from_start,from_end", [(0, 1), (159, 0), (160, 480), (4000, 3999), (1, 30000)]
+)
+def test_h5_file_trimmer__When_invoked__Then_only_the_kept_samples_are_read_and_the_data_is_trimmed_at_the_same_time_points_as_the_readings(
+    current_version_file_path, mocker, from_start, from_end
+):
+    mocker.patch("builtins.print", autospec=True)
+    old_wf = WellFile(current_version_file_path)
+    old_tissue_data = old_wf.get_raw_tissue_reading()
+    old_reference_data = old_wf.get_raw_reference_reading()
+    old_wf.close()
+    spied_tissue_reading = mocker.spy(WellFile, "get_raw_tissue_reading")
+    spied_reference_reading = mocker.spy(WellFile, "get_raw_reference_reading")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        new_file_path = h5_file_trimmer(
+            current_version_file_path, tmp_dir, from_start, from_end
+        )
+        spied_tissue_reading.assert_not_called()
+        spied_reference_reading.assert_not_called()
+
+        wf = WellFile(new_file_path)
+        actual_start_trimmed = wf.get_h5_attribute(
+            str(TRIMMED_TIME_FROM_ORIGINAL_START_UUID)
+        )
+        actual_end_trimmed = wf.get_h5_attribute(
+            str(TRIMMED_TIME_FROM_ORIGINAL_END_UUID)
+        )
+        # the latest time point not after from_start and the earliest not before from_end are kept
+        for iter_old_data, iter_new_data in (
+            (old_tissue_data, wf.get_raw_tissue_reading()),
+            (old_reference_data, wf.get_raw_reference_reading()),
+        ):
+            old_times = iter_old_data[0] - iter_old_data[0][0]
+            is_kept = (old_times >= actual_start_trimmed) & (
+                old_times <= old_times[-1] - actual_end_trimmed
+            )
+            np.testing.assert_array_equal(iter_new_data[1], iter_old_data[1][is_kept])
+        tissue_times = old_tissue_data[0] - old_tissue_data[0][0]
+        assert actual_start_trimmed == tissue_times[tissue_times <= from_start][-1]
+        assert (
+            actual_end_trimmed
+            == tissue_times[-1]
+            - tissue_times[tissue_times >= tissue_times[-1] - from_end][0]
+        )
+
+        wf.close()  # safe clean-up when running CI on windows systems
+
+
+def test_h5_file_trimmer__When_other_files_are_opened_while_trimming__Then_the_old_file_is_kept_open_until_it_is_read(
+    current_version_file_path, mocker
+):
+    other_bwf = BasicWellFile(
+        os.path.join(
+            PATH_OF_CURRENT_FILE, "h5", "v0.3.1", "MA20123456__2020_08_17_145752__A1.h5"
+        )
+    )
+    # opening another file between reading the metadata and the readings of the old file would evict it from a pool of one file
+    mocker.patch(
+        "builtins.print", autospec=True, side_effect=lambda _: other_bwf.get_h5_file()
+    )
+    pool = get_h5_file_handle_pool()
+    original_max = pool.get_max_open_files()
+    pool.set_max_open_files(1)
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            new_file_path = h5_file_trimmer(current_version_file_path, tmp_dir, 70, 70)
+            wf = WellFile(new_file_path)
+            assert wf.get_raw_tissue_reading().shape[1] > 0
+            wf.close()
+    finally:
+        pool.set_max_open_files(original_max)
+        other_bwf.close()
+
+
+@pytest.mark.parametrize(
+    "use_wide_times,expected_dtype", [(False, np.int32), (True, np.int64)]
+)
+def test_h5_file_trimmer__When_invoked_with_use_wide_times__Then_the_times_are_computed_as_int64(
+    current_version_file_path, mocker, use_wide_times, expected_dtype
+):
+    spied_time_axis = mocker.spy(WellFile, "get_tissue_time_axis")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        new_file_path = h5_file_trimmer(
+            current_version_file_path,
+            tmp_dir,
+            160,
+            160,
+            use_wide_times=use_wide_times,
+        )
+        assert spied_time_axis.spy_return.get_dtype() == expected_dtype
+        wf = WellFile(new_file_path)
+        assert wf.get_h5_attribute(str(TRIMMED_TIME_FROM_ORIGINAL_START_UUID)) == 160
+
+        wf.close()  # safe clean-up when running CI on windows systems
+
+
+def _assert_overviews_match_sensor_data(h5_file, reduction_factors):
+    for iter_dataset_name in (TISSUE_SENSOR_READINGS, REFERENCE_SENSOR_READINGS):
+        sensor_values = h5_file[iter_dataset_name][:]
+        overviews = h5_file[SENSOR_OVERVIEWS_GROUP_NAME][iter_dataset_name]
+        assert sorted(int(iter_name) for iter_name in overviews) == sorted(
+            reduction_factors
+        )
+        for iter_factor in reduction_factors:
+            bin_starts = range(0, len(sensor_values), iter_factor)
+            expected = [
+                [sensor_values[i : i + iter_factor].min() for i in bin_starts],
+                [sensor_values[i : i + iter_factor].max() for i in bin_starts],
+            ]
+            np.testing.assert_array_equal(overviews[str(iter_factor)], expected)
+
+
+def test_add_sensor_overviews_to_file__stores_minimum_and_maximum_of_every_bin_of_samples_at_each_level(
+    sensor_overviews_file_path,
+):
+    with h5py.File(sensor_overviews_file_path, "r") as h5_file:
+        _assert_overviews_match_sensor_data(h5_file, OVERVIEW_REDUCTION_FACTORS)
+
+
+def test_add_sensor_overviews_to_file__replaces_existing_overviews(
+    sensor_overviews_file_path,
+):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, "overviews.h5")
+        shutil.copy(sensor_overviews_file_path, file_path)
+        add_sensor_overviews_to_file(file_path, reduction_factors=(7, 49))
+        with h5py.File(file_path, "r") as h5_file:
+            _assert_overviews_match_sensor_data(h5_file, (7, 49))
+
+
+@pytest.mark.parametrize(
+    "include_sensor_overviews,test_description",
+    [(True, "writes overviews"), (False, "does not write overviews by default")],
+)
+def test_MantarrayH5FileCreator__writes_sensor_overviews_when_closed_only_if_requested(
+    include_sensor_overviews, test_description
+):
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, "myfile.h5")
+        with MantarrayH5FileCreator(
+            file_path, include_sensor_overviews=include_sensor_overviews
+        ) as new_file:
+            for iter_dataset_name in (
+                TISSUE_SENSOR_READINGS,
+                REFERENCE_SENSOR_READINGS,
+            ):
+                new_file.create_dataset(
+                    iter_dataset_name, data=rng.integers(-1000, 1000, size=2345)
+                )
+        with h5py.File(file_path, "r") as h5_file:
+            assert (SENSOR_OVERVIEWS_GROUP_NAME in h5_file) is include_sensor_overviews
+            if include_sensor_overviews:
+                _assert_overviews_match_sensor_data(h5_file, OVERVIEW_REDUCTION_FACTORS)
+
+
+def test_write_sensor_overviews__skips_sensor_datasets_that_are_not_written_yet():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with MantarrayH5FileCreator(os.path.join(tmp_dir, "myfile.h5")) as new_file:
+            new_file.create_dataset(TISSUE_SENSOR_READINGS, data=np.arange(25))
+            write_sensor_overviews(new_file, reduction_factors=(10,))
+            overviews = new_file[SENSOR_OVERVIEWS_GROUP_NAME]
+            assert list(overviews) == [TISSUE_SENSOR_READINGS]
+            np.testing.assert_array_equal(
+                overviews[TISSUE_SENSOR_READINGS]["10"], [[0, 10, 20], [9, 19, 24]]
+            )
+
+
+def test_h5_file_trimmer__When_invoked_on_a_file_with_sensor_overviews__Then_the_new_file_has_overviews_of_the_trimmed_data(
+    sensor_overviews_file_path, mocker
+):
+    mocker.patch("builtins.print", autospec=True)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        new_file_path = h5_file_trimmer(
+            sensor_overviews_file_path, tmp_dir, from_start=100000, from_end=100000
+        )
+        with h5py.File(new_file_path, "r") as h5_file:
+            _assert_overviews_match_sensor_data(h5_file, OVERVIEW_REDUCTION_FACTORS)
+
+
+def _assert_consolidated_file_matches_plate(h5_file, plate_recording):
+    well_indices = plate_recording.get_well_indices()
+    assert (
+        h5_file.attrs[CONSOLIDATED_PLATE_FILE_FORMAT_VERSION_METADATA_KEY]
+        == CONSOLIDATED_PLATE_FILE_FORMAT_VERSION
+    )
+    assert len(h5_file[WELL_METADATA_GROUP_NAME]) == len(well_indices)
+    for iter_sensor_name, iter_dataset_name in (
+        ("tissue", TISSUE_SENSOR_READINGS),
+        ("reference", REFERENCE_SENSOR_READINGS),
+    ):
+        sensor_dataset = h5_file[iter_dataset_name]
+        num_samples = sensor_dataset.attrs[NUM_SAMPLES_METADATA_KEY]
+        assert sensor_dataset.shape == (len(well_indices), max(num_samples, default=0))
+        for iter_row, iter_well_index in enumerate(well_indices):
+            well_file = plate_recording.get_well_by_index(iter_well_index)
+            _, expected_values = getattr(
+                well_file, f"get_raw_{iter_sensor_name}_reading_with_time_axis"
+            )()
+            assert num_samples[iter_row] == len(expected_values)
+            np.testing.assert_array_equal(
+                sensor_dataset[iter_row, : len(expected_values)], expected_values
+            )
+            # shorter wells are padded with zeros
+            assert not sensor_dataset[iter_row, len(expected_values) :].any()
+    for iter_row, iter_well_index in enumerate(well_indices):
+        expected_attrs = plate_recording.get_well_by_index(
+            iter_well_index
+        ).get_h5_attributes()
+        actual_attrs = h5_file[f"{WELL_METADATA_GROUP_NAME}/{iter_row}"].attrs
+        assert set(actual_attrs) == set(expected_attrs)
+        for iter_name, iter_value in expected_attrs.items():
+            np.testing.assert_array_equal(actual_attrs[iter_name], iter_value)
+
+
+def test_export_consolidated_plate_file__writes_a_row_of_each_sensor_and_the_attributes_of_each_well(
+    consolidated_plate_file_path,
+):
+    plate_recording = PlateRecording.from_directory(
+        os.path.dirname(PATH_TO_GENERIC_0_3_1_FILE)
+    )
+    with h5py.File(consolidated_plate_file_path, "r") as h5_file:
+        _assert_consolidated_file_matches_plate(h5_file, plate_recording)
+        assert h5_file[TISSUE_SENSOR_READINGS].chunks[0] == 1
+        assert h5_file[TISSUE_SENSOR_READINGS].compression is None
+
+
+def test_export_consolidated_plate_file__copies_sensor_values_one_chunk_at_a_time(
+    mocker,
+):
+    mocker.patch.object(file_writer, "DEFAULT_READING_BLOCK_SIZE", 1000)
+    plate_recording = PlateRecording.from_directory(
+        os.path.join(PATH_OF_CURRENT_FILE, "2020_08_04_build_775")
+    )
+    spied_read = mocker.spy(WellFile, "get_raw_tissue_reading_with_time_axis")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, "plate.h5")
+        export_consolidated_plate_file(plate_recording, file_path, compression="gzip")
+        assert spied_read.call_count > 24
+        for iter_call in spied_read.call_args_list:
+            _, start_index, stop_index = iter_call[0]
+            assert stop_index - start_index <= 1000
+        with h5py.File(file_path, "r") as h5_file:
+            assert h5_file[TISSUE_SENSOR_READINGS].chunks == (1, 1000)
+            assert h5_file[TISSUE_SENSOR_READINGS].compression == "gzip"
+            _assert_consolidated_file_matches_plate(h5_file, plate_recording)
+
+
+def test_export_consolidated_plate_file__writes_a_plate_without_wells():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, "plate.h5")
+        export_consolidated_plate_file(PlateRecording([]), file_path)
+        with h5py.File(file_path, "r") as h5_file:
+            _assert_consolidated_file_matches_plate(h5_file, PlateRecording([]))
@@ -1,40 +1,70 @@
 # -*- coding: utf-8 -*-
 
 import datetime
+import gc
+from glob import glob
 import os
+import shutil
+import tempfile
 import time
+import tracemalloc
 from uuid import UUID
+import weakref
 
 import h5py
+from immutable_data_validation.errors import ValidationCollectionMinimumValueError
 from immutabledict import immutabledict
 from mantarray_file_manager import BasicWellFile
+from mantarray_file_manager import ConsolidatedWellFile
+from mantarray_file_manager import export_consolidated_plate_file
 from mantarray_file_manager import FILE_FORMAT_VERSION_METADATA_KEY
 from mantarray_file_manager import FileAttributeNotFoundError
 from mantarray_file_manager import files
+from mantarray_file_manager import get_h5_file_handle_pool
+from mantarray_file_manager import get_memmap_of_dataset
 from mantarray_file_manager import METADATA_UUID_DESCRIPTIONS
+from mantarray_file_manager import MetadataCatalog
 from mantarray_file_manager import MIN_SUPPORTED_FILE_VERSION
+from mantarray_file_manager import NotAConsolidatedPlateFileError
 from mantarray_file_manager import PlateRecording
+from mantarray_file_manager import REFERENCE_SENSOR_READINGS
+from mantarray_file_manager import TISSUE_SENSOR_READINGS
 from mantarray_file_manager import UnsupportedMantarrayFileVersionError
 from mantarray_file_manager import USER_ACCOUNT_ID_UUID
 from mantarray_file_manager import WELL_FILE_CLASSES
+from mantarray_file_manager import WELL_NAME_UUID
 from mantarray_file_manager import WellFile
 from mantarray_file_manager import WellFile_0_3_1
 from mantarray_file_manager import WellFile_0_4_1
 from mantarray_file_manager import WellFile_0_4_2
+from mantarray_file_manager import WellFileMetadata
 from mantarray_file_manager import WellRecordingsNotFromSameSessionError
 import numpy as np
 import pytest
 from stdlib_utils import get_current_file_abs_directory
 
+from .fixtures import fixture_consolidated_plate_file_path
+from .fixtures import fixture_current_version_file_path
 from .fixtures import fixture_generic_well_file
 from .fixtures import fixture_generic_well_file_0_3_1
 from .fixtures import fixture_generic_well_file_0_3_1__2
+from .fixtures import fixture_long_recording_file_path
+from .fixtures import fixture_plate_384_well_dir
+from .fixtures import fixture_plate_96_well_dir
 from .fixtures import fixture_trimmed_file_path
+from .fixtures import get_well_name_of_plate
+from .fixtures import PATH_TO_GENERIC_0_3_1_FILE
+from .fixtures import record_h5_attribute_reads
 
 __fixtures__ = (
+    fixture_consolidated_plate_file_path,
+    fixture_current_version_file_path,
     fixture_generic_well_file,
     fixture_generic_well_file_0_3_1,
     fixture_generic_well_file_0_3_1__2,
+    fixture_long_recording_file_path,
+    fixture_plate_384_well_dir,
+    fixture_plate_96_well_dir,
     fixture_trimmed_file_path,
 )
 PATH_OF_CURRENT_FILE = get_current_file_abs_directory()
@@ -65,6 +95,197 @@ def test_BasicWellFile__When_deleted__Then_it_closes_the_h5_file(mocker):
     spied_close.assert_called_once()
 
 
+@pytest.fixture(scope="function", name="small_handle_pool")
+def fixture_small_handle_pool():
+    pool = get_h5_file_handle_pool()
+    original_max = pool.get_max_open_files()
+    pool.set_max_open_files(2)
+    yield pool
+    pool.set_max_open_files(original_max)
+
+
+def test_BasicWellFile__close__closes_the_h5_file_and_it_is_reopened_when_needed():
+    bwf = BasicWellFile(
+        os.path.join(
+            PATH_OF_CURRENT_FILE,
+            "2020_08_04_build_775",
+            "MA20001010__2020_08_04_220041__D6.h5",
+        )
+    )
+    first_h5_file = bwf.get_h5_file()
+    bwf.close()
+    assert not first_h5_file
+    assert bwf.is_open() is False
+    assert bwf.get_h5_attribute(FILE_FORMAT_VERSION_METADATA_KEY) == "0.2.1"
+    assert bwf.is_open() is True
+
+
+def test_BasicWellFile__closes_the_h5_file_when_used_as_a_context_manager():
+    with WellFile(
+        os.path.join(
+            PATH_OF_CURRENT_FILE,
+            "2020_08_04_build_775",
+            "MA20001010__2020_08_04_220041__D6.h5",
+        )
+    ) as wf:
+        assert wf.get_well_name() == "D6"
+        h5_file = wf.get_h5_file()
+    assert not h5_file
+    assert wf.is_open() is False
+
+
+def test_H5FileHandlePool__closes_least_recently_used_files_beyond_the_limit(
+    small_handle_pool,
+):
+    well_files = [
+        WellFile(iter_path)
+        for iter_path in sorted(
+            glob(os.path.join(PATH_OF_CURRENT_FILE, "h5", "v0.3.1", "*.h5"))
+        )[:3]
+    ]
+    assert small_handle_pool.get_num_open_files() == 2
+    assert [iter_file.is_open() for iter_file in well_files] == [False, True, True]
+
+    well_files[1].get_h5_file()  # make the second file the most recently used
+    expected_reading = well_files[0].get_raw_tissue_reading()
+    assert [iter_file.is_open() for iter_file in well_files] == [True, True, False]
+    assert expected_reading.shape[0] == 2
+
+
+def test_H5FileHandlePool__set_max_open_files__closes_files_beyond_new_limit():
+    pool = files.H5FileHandlePool(3)
+    file_path = os.path.join(
+        PATH_OF_CURRENT_FILE,
+        "2020_08_04_build_775",
+        "MA20001010__2020_08_04_220041__D6.h5",
+    )
+    h5_files = [pool.get_file(iter_key, file_path) for iter_key in range(3)]
+    pool.set_max_open_files(1)
+    assert pool.get_max_open_files() == 1
+    assert pool.get_num_open_files() == 1
+    assert [bool(iter_file) for iter_file in h5_files] == [False, False, True]
+    pool.close_file(2)
+    pool.close_file(2)
+    assert pool.get_num_open_files() == 0
+
+
+def test_H5FileHandlePool__files_can_be_closed_while_another_file_is_being_opened(
+    mocker,
+):
+    # garbage collection while a file is being opened can run the __del__ of another WellFile
+    pool = files.H5FileHandlePool(3)
+    file_path = os.path.join(
+        PATH_OF_CURRENT_FILE,
+        "2020_08_04_build_775",
+        "MA20001010__2020_08_04_220041__D6.h5",
+    )
+    pool.get_file(0, file_path)
+    original_file_class = h5py.File
+
+    def open_while_closing_other_file(*args):
+        pool.close_file(0)
+        return original_file_class(*args)
+
+    mocker.patch.object(
+        files.h5py, "File", autospec=True, side_effect=open_while_closing_other_file
+    )
+    pool.get_file(1, file_path)
+    assert pool.is_open(0) is False
+    assert pool.is_open(1) is True
+
+
+def test_H5FileHandlePool__lease__keeps_the_file_open_beyond_the_limit_until_released():
+    pool = files.H5FileHandlePool(1)
+    file_path = os.path.join(
+        PATH_OF_CURRENT_FILE,
+        "2020_08_04_build_775",
+        "MA20001010__2020_08_04_220041__D6.h5",
+    )
+    with pool.lease(0, file_path) as leased_file:
+        with pool.lease(0, file_path) as nested_leased_file:
+            assert nested_leased_file is leased_file
+            assert pool.get_file(0, file_path) is leased_file
+        assert pool.is_leased(0) is True
+        other_file = pool.get_file(1, file_path)
+        assert pool.get_num_open_files() == 2
+        pool.get_file(2, file_path)
+        assert not other_file
+        assert pool.get_num_open_files() == 2
+        # a leased file can still be read from
+        assert leased_file[TISSUE_SENSOR_READINGS].shape[0] > 0
+    assert pool.is_leased(0) is False
+    assert not leased_file
+    assert pool.is_open(0) is False
+    assert pool.is_open(2) is True
+
+
+def test_H5FileHandlePool__close_file__closes_a_leased_file_once_it_is_released():
+    pool = files.H5FileHandlePool(3)
+    file_path = os.path.join(
+        PATH_OF_CURRENT_FILE,
+        "2020_08_04_build_775",
+        "MA20001010__2020_08_04_220041__D6.h5",
+    )
+    with pool.lease(0, file_path) as leased_file:
+        pool.close_file(0)
+        assert leased_file[TISSUE_SENSOR_READINGS].shape[0] > 0
+    assert not leased_file
+    assert pool.is_open(0) is False
+
+    with pool.lease(0, file_path):
+        pool.close_file(0)
+        # getting the file again cancels closing it
+        reopened_file = pool.get_file(0, file_path)
+    assert reopened_file
+    assert pool.is_open(0) is True
+
+
+def test_H5FileHandlePool__lease__is_released_if_the_file_cannot_be_opened():
+    pool = files.H5FileHandlePool(3)
+    with pytest.raises(OSError):
+        with pool.lease(0, os.path.join(PATH_OF_CURRENT_FILE, "missing.h5")):
+            pass
+    assert pool.is_leased(0) is False
+
+
+def test_H5FileHandlePool__files_can_be_closed_while_other_files_are_evicted(mocker):
+    # garbage collection while a file is being closed can run the __del__ of another WellFile
+    pool = files.H5FileHandlePool(3)
+    file_path = os.path.join(
+        PATH_OF_CURRENT_FILE,
+        "2020_08_04_build_775",
+        "MA20001010__2020_08_04_220041__D6.h5",
+    )
+    for iter_key in range(3):
+        pool.get_file(iter_key, file_path)
+    original_close = h5py.File.close
+
+    def close_while_closing_other_file(h5_file):
+        if pool.is_open(1):
+            pool.close_file(1)
+        original_close(h5_file)
+
+    mocker.patch.object(
+        h5py.File, "close", autospec=True, side_effect=close_while_closing_other_file
+    )
+    pool.set_max_open_files(0)
+    assert pool.get_num_open_files() == 0
+
+
+def test_WellFile__many_files_can_be_read_while_keeping_few_open(small_handle_pool):
+    well_files = [
+        WellFile(iter_path)
+        for iter_path in sorted(
+            glob(os.path.join(PATH_OF_CURRENT_FILE, "h5", "v0.3.1", "*.h5"))
+        )
+    ]
+    well_indices = [iter_file.get_well_index() for iter_file in well_files]
+    assert sorted(well_indices) == list(range(24))
+    for iter_file in well_files:
+        iter_file.get_raw_reference_reading()
+    assert small_handle_pool.get_num_open_files() == 2
+
+
 def test_WellFile__opens_and_get_file_version():
     wf = WellFile(
         os.path.join(
@@ -240,6 +461,580 @@ def test_WellFile__get_raw_reference_reading__has_correct_time_offset_at_index_0
     assert arr[0, 1] - arr[0, 0] == expected_timestep
 
 
+@pytest.mark.parametrize(
+    "start_index,stop_index,test_description",
+    [
+        (100, 200, "reads a window"),
+        (None, 50, "reads from the first sample"),
+        (360, None, "reads until the last sample"),
+        (-20, -10, "reads a window counted from the end"),
+        (200, 100, "reads nothing when the window is empty"),
+    ],
+)
+@pytest.mark.parametrize(
+    "getter_name", ["get_raw_tissue_reading", "get_raw_reference_reading"]
+)
+def test_WellFile__raw_reading__reads_window_of_sample_indices_without_reading_whole_dataset(
+    getter_name, start_index, stop_index, test_description
+):
+    expected = getattr(WellFile(PATH_TO_GENERIC_0_3_1_FILE), getter_name)()[
+        :, start_index:stop_index
+    ]
+    wf = WellFile(PATH_TO_GENERIC_0_3_1_FILE)
+    actual = getattr(wf, getter_name)(start_index, stop_index)
+    assert actual.dtype == np.int32
+    np.testing.assert_array_equal(actual, expected)
+    assert (
+        wf._raw_tissue_reading is None
+    )  # pylint:disable=protected-access # confirm the full reading was never built
+    assert wf._raw_ref_reading is None  # pylint:disable=protected-access
+
+
+@pytest.mark.parametrize(
+    "getter_name", ["get_raw_tissue_reading", "get_raw_reference_reading"]
+)
+def test_WellFile__raw_reading__gives_window_of_cached_reading_after_full_reading(
+    getter_name, generic_well_file_0_3_1
+):
+    full_reading = getattr(generic_well_file_0_3_1, getter_name)()
+    window = getattr(generic_well_file_0_3_1, getter_name)(10, 20)
+    assert window.base is full_reading
+    np.testing.assert_array_equal(window, full_reading[:, 10:20])
+
+
+@pytest.mark.parametrize(
+    "start_time,stop_time,test_description",
+    [
+        (880, 880 + 960 * 10, "includes start and excludes stop"),
+        (881, 880 + 960 * 10 + 1, "rounds up to the next sample"),
+        (None, 5000, "unbounded below"),
+        (300000, None, "unbounded above"),
+        (-10000, 10**9, "clips to the recording"),
+        (10**9, 10**9 + 5000, "reads nothing after the end of the recording"),
+    ],
+)
+@pytest.mark.parametrize(
+    "getter_name", ["get_raw_tissue_reading", "get_raw_reference_reading"]
+)
+def test_WellFile__raw_reading_in_time_window__returns_samples_within_window(
+    getter_name, start_time, stop_time, test_description
+):
+    full_reading = getattr(WellFile(PATH_TO_GENERIC_0_3_1_FILE), getter_name)()
+    is_in_window = np.ones(full_reading.shape[1], dtype=bool)
+    if start_time is not None:
+        is_in_window &= full_reading[0] >= start_time
+    if stop_time is not None:
+        is_in_window &= full_reading[0] < stop_time
+    wf = WellFile(PATH_TO_GENERIC_0_3_1_FILE)
+    actual = getattr(wf, f"{getter_name}_in_time_window")(start_time, stop_time)
+    np.testing.assert_array_equal(actual, full_reading[:, is_in_window])
+
+
+@pytest.mark.parametrize(
+    "start_index,stop_index,test_description",
+    [
+        (None, None, "gets all samples"),
+        (100, 200, "gets a window"),
+        (-20, None, "gets a window counted from the end"),
+    ],
+)
+@pytest.mark.parametrize("sensor_name", ["tissue", "reference"])
+def test_WellFile__raw_reading_with_time_axis__gives_same_times_and_values_as_raw_reading(
+    sensor_name, start_index, stop_index, test_description
+):
+    expected = getattr(
+        WellFile(PATH_TO_GENERIC_0_3_1_FILE), f"get_raw_{sensor_name}_reading"
+    )(start_index, stop_index)
+    wf = WellFile(PATH_TO_GENERIC_0_3_1_FILE)
+    time_axis, values = getattr(wf, f"get_raw_{sensor_name}_reading_with_time_axis")(
+        start_index, stop_index
+    )
+    np.testing.assert_array_equal(time_axis.to_array(), expected[0])
+    np.testing.assert_array_equal(values, expected[1])
+
+
+def test_WellFile__get_tissue_time_axis__accounts_for_trimmed_file(trimmed_file_path):
+    wf = WellFile(trimmed_file_path)
+    time_axis = wf.get_tissue_time_axis()
+    assert time_axis[0] == 440
+    assert time_axis.get_step() == 160
+    assert len(time_axis) == 846
+    np.testing.assert_array_equal(
+        wf.get_reference_time_axis().to_array(), wf.get_raw_reference_reading()[0]
+    )
+
+
+def test_WellFile__get_raw_tissue_reading_in_time_window__gives_same_result_for_trimmed_file(
+    trimmed_file_path,
+):
+    full_reading = WellFile(trimmed_file_path).get_raw_tissue_reading()
+    actual = WellFile(trimmed_file_path).get_raw_tissue_reading_in_time_window(
+        1000, 5000
+    )
+    np.testing.assert_array_equal(
+        actual,
+        full_reading[:, (full_reading[0] >= 1000) & (full_reading[0] < 5000)],
+    )
+
+
+@pytest.mark.parametrize(
+    "start_index,stop_index,out_offset,test_description",
+    [
+        (None, None, 0, "reads all values to start of array"),
+        (100, 200, 7, "reads window to offset in array"),
+        (-30, None, 0, "reads window counted from the end"),
+        (50, 50, 3, "reads nothing for an empty window"),
+    ],
+)
+@pytest.mark.parametrize("sensor_name", ["tissue", "reference"])
+def test_WellFile__read_raw_values_into__fills_caller_array_with_sensor_values(
+    sensor_name, start_index, stop_index, out_offset, test_description
+):
+    wf = WellFile(PATH_TO_GENERIC_0_3_1_FILE)
+    expected = getattr(wf, f"get_raw_{sensor_name}_reading")()[
+        1, start_index:stop_index
+    ]
+    out = np.full((2, 7000), -1, dtype=np.int64)
+    num_read = getattr(wf, f"read_raw_{sensor_name}_values_into")(
+        out[1], out_offset, start_index, stop_index
+    )
+    assert num_read == len(expected)
+    np.testing.assert_array_equal(out[1, out_offset : out_offset + num_read], expected)
+    assert np.all(out[1, :out_offset] == -1)
+    assert np.all(out[1, out_offset + num_read :] == -1)
+    assert np.all(out[0] == -1)
+
+
+def test_WellFile__read_raw_tissue_values_into__does_not_build_the_raw_reading(
+    generic_well_file_0_3_1, mocker
+):
+    spied_read = mocker.spy(generic_well_file_0_3_1, "_read_raw_reading")
+    out = np.empty(370, dtype=np.int32)
+    generic_well_file_0_3_1.read_raw_tissue_values_into(out)
+    spied_read.assert_not_called()
+
+
+def test_WellFile__read_raw_tissue_values_into__raises_error_when_array_is_too_small(
+    generic_well_file_0_3_1,
+):
+    out = np.empty(100, dtype=np.int32)
+    with pytest.raises(TypeError):
+        generic_well_file_0_3_1.read_raw_tissue_values_into(out)
+
+
+@pytest.mark.parametrize("sensor_name", ["tissue", "reference"])
+def test_WellFile__raw_reading_with_time_axis__gives_memmap_views_of_contiguous_datasets(
+    sensor_name, current_version_file_path
+):
+    expected_time_axis, expected_values = getattr(
+        WellFile(current_version_file_path),
+        f"get_raw_{sensor_name}_reading_with_time_axis",
+    )(10, 500)
+    assert not isinstance(expected_values, np.memmap)
+    wf = WellFile(current_version_file_path, use_memmap=True)
+    time_axis, values = getattr(wf, f"get_raw_{sensor_name}_reading_with_time_axis")(
+        10, 500
+    )
+    assert isinstance(values, np.memmap)
+    assert values.flags.writeable is False
+    np.testing.assert_array_equal(values, expected_values)
+    np.testing.assert_array_equal(time_axis.to_array(), expected_time_axis.to_array())
+    np.testing.assert_array_equal(
+        getattr(wf, f"get_raw_{sensor_name}_reading")(),
+        getattr(
+            WellFile(current_version_file_path), f"get_raw_{sensor_name}_reading"
+        )(),
+    )
+
+
+def test_WellFile__close__releases_the_memory_maps_of_the_sensor_datasets(
+    current_version_file_path,
+):
+    wf = WellFile(current_version_file_path, use_memmap=True)
+    _, values = wf.get_raw_tissue_reading_with_time_axis(10, 500)
+    memmap_ref = weakref.ref(values.base)
+    del values
+    gc.collect()
+    assert memmap_ref() is not None
+
+    wf.close()
+    gc.collect()
+    assert memmap_ref() is None
+    # the file is mapped again when it is read after being closed
+    _, values = wf.get_raw_tissue_reading_with_time_axis(10, 500)
+    assert isinstance(values, np.memmap)
+    wf.close()
+
+
+def test_WellFile__raw_reading_with_time_axis__falls_back_to_h5py_for_chunked_datasets(
+    generic_well_file_0_3_1,
+):
+    assert generic_well_file_0_3_1.get_h5_file()[TISSUE_SENSOR_READINGS].chunks
+    wf = WellFile(PATH_TO_GENERIC_0_3_1_FILE, use_memmap=True)
+    _, values = wf.get_raw_tissue_reading_with_time_axis()
+    assert not isinstance(values, np.memmap)
+    np.testing.assert_array_equal(
+        values, generic_well_file_0_3_1.get_raw_tissue_reading()[1]
+    )
+
+
+def test_get_memmap_of_dataset__returns_None_when_storage_is_not_allocated():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with h5py.File(os.path.join(tmp_dir, "empty.h5"), "w") as h5_file:
+            dataset = h5_file.create_dataset("empty", shape=(0,), dtype=np.int32)
+            assert dataset.chunks is None
+            assert get_memmap_of_dataset(dataset) is None
+
+
+@pytest.mark.parametrize("sensor_name", ["tissue", "reference"])
+def test_WellFile__iter_raw_reading_blocks__yields_blocks_of_the_raw_reading(
+    sensor_name,
+):
+    expected = getattr(
+        WellFile(PATH_TO_GENERIC_0_3_1_FILE), f"get_raw_{sensor_name}_reading"
+    )()
+    wf = WellFile(PATH_TO_GENERIC_0_3_1_FILE)
+    blocks = list(getattr(wf, f"iter_raw_{sensor_name}_reading_blocks")(100))
+    assert [iter_block.shape[1] for iter_block in blocks[:-1]] == [100] * (
+        len(blocks) - 1
+    )
+    assert 0 < blocks[-1].shape[1] <= 100
+    np.testing.assert_array_equal(np.concatenate(blocks, axis=1), expected)
+    assert (
+        wf._raw_tissue_reading is None
+    )  # pylint:disable=protected-access # confirm the full reading was never built
+    assert wf._raw_ref_reading is None  # pylint:disable=protected-access
+
+
+def test_WellFile__iter_raw_tissue_reading_blocks__aligns_default_blocks_to_hdf5_chunks(
+    long_recording_file_path, mocker
+):
+    mocker.patch.object(files, "DEFAULT_READING_BLOCK_SIZE", 2500)
+    chunked_file = WellFile(PATH_TO_GENERIC_0_3_1_FILE)
+    assert chunked_file.get_h5_file()[REFERENCE_SENSOR_READINGS].chunks == (1024,)
+    assert [
+        iter_block.shape[1]
+        for iter_block in chunked_file.iter_raw_reference_reading_blocks()
+    ] == [2048, 2048, 2048, 562]
+    contiguous_file = WellFile(long_recording_file_path)
+    assert {
+        iter_block.shape[1]
+        for iter_block in contiguous_file.iter_raw_tissue_reading_blocks()
+    } == {2500}
+
+
+def test_WellFile__iter_raw_reading_blocks__yields_tissue_and_reference_readings_in_same_windows_of_time(
+    generic_well_file_0_3_1,
+):
+    block_duration = 50000
+    blocks = list(generic_well_file_0_3_1.iter_raw_reading_blocks(block_duration))
+    first_time = min(
+        generic_well_file_0_3_1.get_tissue_time_axis()[0],
+        generic_well_file_0_3_1.get_reference_time_axis()[0],
+    )
+    for iter_block_index, (iter_tissue, iter_reference) in enumerate(blocks):
+        window_start = first_time + iter_block_index * block_duration
+        for iter_reading in (iter_tissue, iter_reference):
+            assert np.all(iter_reading[0] >= window_start)
+            assert np.all(iter_reading[0] < window_start + block_duration)
+    np.testing.assert_array_equal(
+        np.concatenate([iter_block[0] for iter_block in blocks], axis=1),
+        generic_well_file_0_3_1.get_raw_tissue_reading(),
+    )
+    np.testing.assert_array_equal(
+        np.concatenate([iter_block[1] for iter_block in blocks], axis=1),
+        generic_well_file_0_3_1.get_raw_reference_reading(),
+    )
+    assert len(list(generic_well_file_0_3_1.iter_raw_reading_blocks())) == 1
+
+
+def test_PlateRecording__iter_raw_reading_blocks__yields_readings_of_all_wells_in_same_windows_of_time():
+    plate_recording = PlateRecording.from_directory(
+        os.path.join(PATH_OF_CURRENT_FILE, "h5", "v0.3.1")
+    )
+    blocks = list(plate_recording.iter_raw_reading_blocks(100000))
+    assert len(blocks) > 1
+    for iter_block in blocks:
+        assert tuple(iter_block.keys()) == plate_recording.get_well_indices()
+    for iter_well_index in plate_recording.get_well_indices():
+        well_file = plate_recording.get_well_by_index(iter_well_index)
+        np.testing.assert_array_equal(
+            np.concatenate(
+                [iter_block[iter_well_index][0] for iter_block in blocks], axis=1
+            ),
+            well_file.get_raw_tissue_reading(),
+        )
+    assert len(list(plate_recording.iter_raw_reading_blocks())) == 1
+
+
+def test_PlateRecording__iter_raw_reading_blocks__yields_nothing_for_an_empty_plate():
+    assert list(PlateRecording([]).iter_raw_reading_blocks()) == []
+
+
+def test_WellFile__iter_raw_reading_blocks__raises_error_if_block_duration_is_not_positive(
+    generic_well_file_0_3_1,
+):
+    with pytest.raises(ValidationCollectionMinimumValueError):
+        list(generic_well_file_0_3_1.iter_raw_reading_blocks(0))
+
+
+def test_PlateRecording__iter_raw_reading_blocks__raises_error_if_block_duration_is_not_positive():
+    plate_recording = PlateRecording.from_directory(
+        os.path.join(PATH_OF_CURRENT_FILE, "h5", "v0.3.1")
+    )
+    with pytest.raises(ValidationCollectionMinimumValueError):
+        list(plate_recording.iter_raw_reading_blocks(0))
+
+
+@pytest.mark.parametrize("sensor_name", ["tissue", "reference"])
+def test_PlateRecording__get_stacked_values__stacks_values_of_all_wells_cut_to_shortest_well(
+    sensor_name,
+):
+    plate_recording = PlateRecording.from_directory(
+        os.path.join(PATH_OF_CURRENT_FILE, "2020_08_04_build_775")
+    )
+    raw_readings = [
+        getattr(
+            plate_recording.get_well_by_index(iter_index),
+            f"get_raw_{sensor_name}_reading",
+        )()
+        for iter_index in plate_recording.get_well_indices()
+    ]
+    num_samples = min(iter_reading.shape[1] for iter_reading in raw_readings)
+    assert any(iter_reading.shape[1] > num_samples for iter_reading in raw_readings)
+
+    actual = getattr(plate_recording, f"get_stacked_{sensor_name}_values")()
+    assert actual.dtype == np.int32
+    np.testing.assert_array_equal(
+        actual, [iter_reading[1, :num_samples] for iter_reading in raw_readings]
+    )
+
+
+def test_PlateRecording__get_stacked_tissue_values__converts_to_requested_dtype():
+    plate_recording = PlateRecording.from_directory(
+        os.path.join(PATH_OF_CURRENT_FILE, "h5", "v0.3.1")
+    )
+    actual = plate_recording.get_stacked_tissue_values(dtype=np.float64)
+    assert actual.dtype == np.float64
+    np.testing.assert_array_equal(actual, plate_recording.get_stacked_tissue_values())
+
+
+def test_PlateRecording__get_stacked_tissue_values__gives_empty_array_for_an_empty_plate():
+    assert PlateRecording([]).get_stacked_tissue_values().shape == (0, 0)
+
+
+def test_prof_PlateRecording__get_stacked_tissue_values():
+    # stack per-well readings:       39807653.80
+    # fill one preallocated array:   26945785.40
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for iter_file_path in glob(
+            os.path.join(PATH_OF_CURRENT_FILE, "h5", "v0.3.1", "*.h5")
+        ):
+            file_path = os.path.join(tmp_dir, os.path.basename(iter_file_path))
+            shutil.copy(iter_file_path, file_path)
+            with h5py.File(file_path, "r+") as h5_file:
+                del h5_file["tissue_sensor_readings"]
+                h5_file.create_dataset(
+                    "tissue_sensor_readings", data=np.arange(500000, dtype=np.int32)
+                )
+        plate_recording = PlateRecording.from_directory(tmp_dir)
+        plate_recording.get_stacked_tissue_values()
+
+        num_iterations = 10
+        start = time.perf_counter_ns()
+        for _ in range(num_iterations):
+            plate_recording.get_stacked_tissue_values()
+        dur = time.perf_counter_ns() - start
+        dur_per_iter = dur / num_iterations
+        # print(dur_per_iter)
+        for iter_well_index in plate_recording.get_well_indices():
+            plate_recording.get_well_by_index(iter_well_index).close()
+    assert dur_per_iter < 200000000
+
+
+def test_WellFile__get_raw_tissue_reading__gives_int64_times_when_recording_is_too_long_for_int32(
+    long_recording_file_path,
+):
+    wf = WellFile(long_recording_file_path)
+    arr = wf.get_raw_tissue_reading()
+    assert arr.dtype == np.int64
+    assert arr.shape == (2, 30000)
+    assert arr[0, -1] == arr[0, 0] + 29999 * 100000
+    assert arr[0, -1] > np.iinfo(np.int32).max
+    assert arr[1, -1] == 29999
+    np.testing.assert_array_equal(
+        wf.get_raw_tissue_reading_in_time_window(arr[0, -2], None), arr[:, -2:]
+    )
+    # the reference readings of the same file are still short enough for int32
+    assert wf.get_raw_reference_reading().dtype == np.int32
+
+
+@pytest.mark.parametrize(
+    "getter_name", ["get_raw_tissue_reading", "get_raw_reference_reading"]
+)
+def test_WellFile__raw_reading__gives_int64_times_when_using_wide_times(getter_name):
+    expected = getattr(WellFile(PATH_TO_GENERIC_0_3_1_FILE), getter_name)()
+    actual = getattr(
+        WellFile(PATH_TO_GENERIC_0_3_1_FILE, use_wide_times=True), getter_name
+    )()
+    assert actual.dtype == np.int64
+    np.testing.assert_array_equal(actual, expected)
+
+
+def test_PlateRecording__opens_well_files_with_wide_times():
+    dir_path = os.path.join(PATH_OF_CURRENT_FILE, "h5", "v0.3.1")
+    plate_recordings = [
+        PlateRecording.from_directory(dir_path, use_wide_times=True),
+        PlateRecording.discover(dir_path, use_wide_times=True)[0],
+    ]
+    for iter_plate_recording in plate_recordings:
+        well_file = iter_plate_recording.get_well_by_index(9)
+        assert well_file.get_raw_tissue_reading().dtype == np.int64
+    assert (
+        PlateRecording.from_directory(dir_path)
+        .get_well_by_index(9)
+        .get_raw_tissue_reading()
+        .dtype
+        == np.int32
+    )
+
+
+@pytest.mark.parametrize(
+    "from_start,time_step,num_times",
+    [
+        (0, 160, 100),
+        (320, 160, 100),
+        (321, 160, 100),
+        (-5, 160, 100),
+        (10**6, 160, 100),
+        (500, 160, 1),
+        (959, 960, 2),
+    ],
+)
+def test_find_evenly_spaced_start_index__gives_same_index_as_find_start_index(
+    from_start, time_step, num_times
+):
+    times = np.arange(num_times, dtype=np.int32) * time_step + 440
+    expected = files.find_start_index(from_start, times)
+    actual = files.find_evenly_spaced_start_index(from_start, time_step, num_times)
+    assert actual == expected % num_times
+
+
+def test_prof_get_raw_tissue_reading__window_of_long_recording():
+    # read all 1500000 samples:      18187945.90
+    # read window of 1000 samples:     250035.39
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, "long_recording.h5")
+        shutil.copy(PATH_TO_GENERIC_0_3_1_FILE, file_path)
+        with h5py.File(file_path, "r+") as h5_file:
+            del h5_file["tissue_sensor_readings"]
+            h5_file.create_dataset(
+                "tissue_sensor_readings", data=np.arange(1500000, dtype=np.int32)
+            )
+        wf = WellFile(file_path)
+        wf.get_raw_tissue_reading(0, 1)
+
+        num_iterations = 100
+        start = time.perf_counter_ns()
+        for _ in range(num_iterations):
+            wf.get_raw_tissue_reading(700000, 701000)
+        dur = time.perf_counter_ns() - start
+        dur_per_iter = dur / num_iterations
+        # print(dur_per_iter)
+        wf.close()
+    assert dur_per_iter < 10000000
+
+
+def test_WellFile__get_metadata__returns_snapshot_of_parsed_metadata(
+    generic_well_file_0_3_1,
+):
+    metadata = generic_well_file_0_3_1.get_metadata()
+    assert isinstance(metadata, WellFileMetadata)
+    assert metadata.file_version == "0.3.1"
+    assert metadata.plate_barcode == "MA20123456"
+    assert metadata.well_name == "B3"
+    assert metadata.well_index == 9
+    assert metadata.user_account == UUID("87187e44-2e8e-4f37-ba0f-cd2df366f3bc")
+    assert metadata.begin_recording == datetime.datetime(
+        2020, 8, 17, 14, 58, 10, 728254, tzinfo=datetime.timezone.utc
+    )
+    assert metadata.tissue_sampling_period_microseconds == 9600
+    assert metadata.recording_start_index == 392000
+    assert generic_well_file_0_3_1.get_metadata() is metadata
+
+
+def test_WellFile__get_metadata__snapshot_is_immutable_and_slotted(
+    generic_well_file_0_3_1,
+):
+    metadata = generic_well_file_0_3_1.get_metadata()
+    with pytest.raises(AttributeError):
+        metadata.plate_barcode = "new_barcode"
+    assert not hasattr(metadata, "__dict__")
+
+
+def test_WellFile__getters_are_served_from_the_metadata_snapshot(
+    generic_well_file_0_3_1, mocker
+):
+    generic_well_file_0_3_1.get_metadata()
+    spied_extract_datetime = mocker.spy(files, "_extract_datetime_from_h5")
+    spied_get_file_attr = mocker.spy(files, "_get_file_attr")
+    generic_well_file_0_3_1.get_unique_recording_key()
+    generic_well_file_0_3_1.get_well_index()
+    spied_extract_datetime.assert_not_called()
+    spied_get_file_attr.assert_not_called()
+
+
+def test_WellFile__getters_only_read_and_parse_their_own_metadata(
+    generic_well_file_0_3_1, mocker
+):
+    read_attribute_names = record_h5_attribute_reads(mocker)
+    spied_extract_datetime = mocker.spy(files, "_extract_datetime_from_h5")
+    assert generic_well_file_0_3_1.get_plate_barcode() == "MA20123456"
+    assert generic_well_file_0_3_1.get_plate_barcode() == "MA20123456"
+    assert len(read_attribute_names) == 1
+    spied_extract_datetime.assert_not_called()
+
+    generic_well_file_0_3_1.get_begin_recording()
+    assert len(read_attribute_names) == 2
+    assert spied_extract_datetime.call_count == 1
+
+    # the snapshot only reads the metadata no getter has read yet
+    metadata = generic_well_file_0_3_1.get_metadata()
+    assert metadata.plate_barcode == "MA20123456"
+    assert len(read_attribute_names) == 2 + len(WellFileMetadata._fields) - 3
+    assert spied_extract_datetime.call_count == 4
+
+
+def test_WellFile__getters_raise_the_original_error_for_metadata_missing_from_the_snapshot():
+    wf = WellFile(
+        os.path.join(
+            PATH_OF_CURRENT_FILE, "h5", "v0.1", "MA20001100__2020_07_15_172203__A4.h5"
+        )
+    )
+    assert wf.get_metadata().user_account is None
+    assert wf.get_metadata().customer_account is None
+    with pytest.raises(FileAttributeNotFoundError, match=str(USER_ACCOUNT_ID_UUID)):
+        wf.get_user_account()
+    with pytest.raises(ValueError, match="badly formed hexadecimal UUID string"):
+        wf.get_customer_account()
+
+
+def test_prof_WellFile_metadata_getters(generic_well_file_0_3_1):
+    # start:                                480900.37
+    # serve getters from metadata snapshot:    5306.19
+
+    num_iterations = 100
+    start = time.perf_counter_ns()
+    for _ in range(num_iterations):
+        generic_well_file_0_3_1.get_unique_recording_key()
+        generic_well_file_0_3_1.get_well_index()
+        generic_well_file_0_3_1.get_well_name()
+    dur = time.perf_counter_ns() - start
+    dur_per_iter = dur / num_iterations
+    # print(dur_per_iter)
+    assert dur_per_iter < 100000
+
+
 def test_WellFile__get_h5_attribute__can_access_arbitrary_metadata(
     generic_well_file_0_3_1,
 ):
@@ -316,6 +1111,36 @@ def test_PlateRecording__from_directory__creates_a_plate_recording_with_all_h5_f
     assert len(pr.get_well_names()) == 24
 
 
+def test_PlateRecording__discover__groups_files_into_one_plate_per_session(mocker):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        shutil.copytree(
+            os.path.join(PATH_OF_CURRENT_FILE, "2020_08_04_build_775"),
+            os.path.join(tmp_dir, "plate_1"),
+        )
+        shutil.copytree(
+            os.path.join(PATH_OF_CURRENT_FILE, "h5", "v0.3.1"),
+            os.path.join(tmp_dir, "nested", "plate_2"),
+        )
+        spied_get_barcode = mocker.spy(files.WellFile, "get_plate_barcode")
+        plate_recordings = PlateRecording.discover(tmp_dir)
+        assert spied_get_barcode.call_count == 26 + 24
+
+        assert len(plate_recordings) == 2
+        assert [
+            iter_plate.get_well_by_index(0).get_plate_barcode()
+            for iter_plate in plate_recordings
+        ] == ["MA20001010", "MA20123456"]
+        for iter_plate in plate_recordings:
+            assert iter_plate.get_well_indices() == tuple(range(24))
+            assert len(iter_plate.get_wellfile_names()) == 24
+            assert iter_plate.get_well_by_index(23).get_well_name() == "D6"
+
+
+def test_PlateRecording__discover__raises_error_if_a_file_version_is_not_supported():
+    with pytest.raises(UnsupportedMantarrayFileVersionError):
+        PlateRecording.discover(os.path.join(PATH_OF_CURRENT_FILE, "h5", "v0.1"))
+
+
 def test_PlateRecording__opens_and_get_wellfile_names():
     wf1 = os.path.join(
         PATH_OF_CURRENT_FILE,
@@ -361,6 +1186,262 @@ def test_get_unique_files():
     assert len(unique_files) == 24
 
 
+def test_get_unique_files__drops_duplicate_recordings_of_the_same_well():
+    unique_files = files.get_unique_files_from_directory(
+        os.path.join(PATH_OF_CURRENT_FILE, "2020_08_04_build_775")
+    )
+    a1_files = [
+        iter_file
+        for iter_file in unique_files
+        if os.path.basename(iter_file).startswith("MA20001010__2020_08_04_220041__A1")
+    ]
+    assert len(a1_files) == 1
+
+
+def test_prof_get_unique_files__reads_metadata_of_each_file_exactly_once(mocker):
+    # start (compare against every accepted file):   312 well index reads
+    # keyed single-pass scan:                          26 well index reads
+    spied_get_well_index = mocker.spy(files.WellFile, "get_well_index")
+
+    files.get_unique_files_from_directory(
+        os.path.join(PATH_OF_CURRENT_FILE, "2020_08_04_build_775")
+    )
+
+    assert spied_get_well_index.call_count == 26
+
+
+@pytest.mark.parametrize(
+    "file_name,expected,test_description",
+    [
+        (
+            "MA20001010__2020_08_04_220041__A1.h5",
+            {
+                "plate_barcode": "MA20001010",
+                "well_name": "A1",
+                "timestamp": datetime.datetime(
+                    2020, 8, 4, 22, 0, 41, tzinfo=datetime.timezone.utc
+                ),
+            },
+            "parses standard name",
+        ),
+        (
+            "my_barcode__2020_03_17_163600__D6.h5",
+            {
+                "plate_barcode": "my_barcode",
+                "well_name": "D6",
+                "timestamp": datetime.datetime(
+                    2020, 3, 17, 16, 36, 0, tzinfo=datetime.timezone.utc
+                ),
+            },
+            "parses barcode containing an underscore",
+        ),
+        (
+            "MA190190000__2021_01_19_011931__C3__v0.4.2.h5",
+            {
+                "plate_barcode": "MA190190000",
+                "well_name": "C3",
+                "timestamp": datetime.datetime(
+                    2021, 1, 19, 1, 19, 31, tzinfo=datetime.timezone.utc
+                ),
+            },
+            "parses name with suffix",
+        ),
+        ("myfile.h5", None, "returns None when name does not follow pattern"),
+        (
+            "MA20001010__2020_08_04_220041__A1.txt",
+            None,
+            "returns None when not an H5 file",
+        ),
+        (
+            "MA20001010__2020_13_04_220041__A1.h5",
+            None,
+            "returns None when timestamp is not a valid date",
+        ),
+    ],
+)
+def test_parse_mantarray_file_name(file_name, expected, test_description):
+    assert (
+        files.parse_mantarray_file_name(os.path.join("some", "dir", file_name))
+        == expected
+    )
+
+
+@pytest.mark.parametrize(
+    "max_workers,use_processes,test_description",
+    [
+        (1, True, "scans serially"),
+        (2, False, "scans with a thread pool"),
+        (2, True, "scans with a process pool"),
+        (None, False, "scans with one worker per CPU"),
+    ],
+)
+def test_scan_files__returns_results_in_the_order_of_the_file_paths(
+    max_workers, use_processes, test_description
+):
+    file_paths = sorted(
+        glob(os.path.join(PATH_OF_CURRENT_FILE, "2020_08_04_build_775", "*.h5"))
+    )
+    actual = files.scan_files(
+        os.path.basename,
+        file_paths,
+        max_workers=max_workers,
+        use_processes=use_processes,
+    )
+    assert actual == [os.path.basename(iter_path) for iter_path in file_paths]
+
+
+def test_get_unique_files__gives_same_result_when_scanned_in_parallel():
+    directory = os.path.join(PATH_OF_CURRENT_FILE, "2020_08_04_build_775")
+    expected = files.get_unique_files_from_directory(directory)
+    assert (
+        files.get_unique_files_from_directory(
+            directory, max_workers=2, use_processes=True
+        )
+        == expected
+    )
+
+
+def test_get_specified_files__gives_same_result_when_scanned_in_parallel():
+    unique_files = files.get_unique_files_from_directory(
+        os.path.join(PATH_OF_CURRENT_FILE, "2020_08_04_build_775")
+    )
+    dictionary = files.get_specified_files(
+        "Well Name", "D6", unique_files, max_workers=2, use_processes=False
+    )
+    assert dictionary["Well Name"]["D6"] == [
+        os.path.join(
+            PATH_OF_CURRENT_FILE,
+            "2020_08_04_build_775",
+            "MA20001010__2020_08_04_220041__D6.h5",
+        )
+    ]
+
+
+def test_get_specified_files__returns_no_files_for_unrecognized_criteria():
+    unique_files = files.get_unique_files_from_directory(
+        os.path.join(PATH_OF_CURRENT_FILE, "2020_08_04_build_775")
+    )
+    dictionary = files.get_specified_files("Color", "Blue", unique_files)
+    assert dictionary == {"Color": {"Blue": []}}
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(
+    (os.cpu_count() or 1) < 2, reason="a parallel speedup needs more than one CPU"
+)
+def test_prof_get_unique_files__parallel_scan_is_faster_than_serial_scan():
+    num_copies = 20
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for iter_copy in range(num_copies):
+            shutil.copytree(
+                os.path.join(PATH_OF_CURRENT_FILE, "h5", "v0.3.1"),
+                os.path.join(tmp_dir, str(iter_copy)),
+            )
+        start = time.perf_counter_ns()
+        files.get_unique_files_from_directory(tmp_dir)
+        serial_dur = time.perf_counter_ns() - start
+
+        start = time.perf_counter_ns()
+        files.get_unique_files_from_directory(tmp_dir, max_workers=None)
+        parallel_dur = time.perf_counter_ns() - start
+        # print(serial_dur, parallel_dur)
+    assert parallel_dur < serial_dur
+
+
+def test_iter_h5_files_in_directory__lists_files_in_same_order_as_os_walk():
+    expected = [
+        os.path.join(iter_path, iter_name)
+        for iter_path, _, iter_names in os.walk(PATH_OF_CURRENT_FILE)
+        for iter_name in iter_names
+        if iter_name.endswith(".h5")
+    ]
+    assert list(files.iter_h5_files_in_directory(PATH_OF_CURRENT_FILE)) == expected
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_get_unique_files_from_directory__returns_no_files_for_a_missing_directory(
+    max_workers,
+):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        missing_dir = os.path.join(tmp_dir, "missing")
+        assert (
+            files.get_unique_files_from_directory(
+                missing_dir, max_workers=max_workers, use_processes=False
+            )
+            == []
+        )
+
+
+def test_iter_h5_files_in_directory__skips_directories_that_cannot_be_listed(mocker):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for iter_dir in ("readable", "unreadable"):
+            os.makedirs(os.path.join(tmp_dir, iter_dir))
+            shutil.copy(
+                PATH_TO_GENERIC_0_3_1_FILE, os.path.join(tmp_dir, iter_dir, "A1.h5")
+            )
+        unreadable_dir = os.path.join(tmp_dir, "unreadable")
+        original_scandir = os.scandir
+
+        def scandir(path):
+            if path == unreadable_dir:
+                raise PermissionError(path)
+            return original_scandir(path)
+
+        mocker.patch.object(files.os, "scandir", side_effect=scandir)
+        assert list(files.iter_h5_files_in_directory(tmp_dir)) == [
+            os.path.join(tmp_dir, "readable", "A1.h5")
+        ]
+
+
+def test_iter_h5_files_in_directory__skips_entries_that_cannot_be_inspected(mocker):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for iter_name in ("A1.h5", "A2.h5"):
+            shutil.copy(PATH_TO_GENERIC_0_3_1_FILE, os.path.join(tmp_dir, iter_name))
+        original_scandir = os.scandir
+
+        def scandir(path):
+            if path != tmp_dir:
+                return original_scandir(path)
+            with original_scandir(path) as entries:
+                entries = sorted(entries, key=lambda entry: entry.name)
+            # the file of A1 is removed while the directory is being listed
+            removed_entry = mocker.MagicMock(wraps=entries[0])
+            removed_entry.is_dir.side_effect = FileNotFoundError(entries[0].path)
+            mocked_entries = mocker.MagicMock()
+            mocked_entries.__enter__.return_value = [removed_entry, entries[1]]
+            return mocked_entries
+
+        mocker.patch.object(files.os, "scandir", side_effect=scandir)
+        assert list(files.iter_h5_files_in_directory(tmp_dir)) == [
+            os.path.join(tmp_dir, "A2.h5")
+        ]
+
+
+def test_iter_h5_files_in_directory__does_not_follow_symlinks_to_directories():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        target_dir = os.path.join(tmp_dir, "target")
+        os.makedirs(os.path.join(target_dir, "directory.h5"))
+        shutil.copy(PATH_TO_GENERIC_0_3_1_FILE, os.path.join(target_dir, "A1.h5"))
+        os.symlink(target_dir, os.path.join(tmp_dir, "link_to_target"))
+        os.symlink(target_dir, os.path.join(tmp_dir, "link_to_target.h5"))
+        assert list(files.iter_h5_files_in_directory(tmp_dir)) == [
+            os.path.join(target_dir, "A1.h5")
+        ]
+
+
+def test_iter_unique_files_from_directory__yields_first_file_before_reading_the_rest(
+    mocker,
+):
+    spied_get_well_index = mocker.spy(files.WellFile, "get_well_index")
+    unique_files = files.iter_unique_files_from_directory(
+        os.path.join(PATH_OF_CURRENT_FILE, "2020_08_04_build_775")
+    )
+    first_file = next(unique_files)
+    assert first_file.endswith(".h5")
+    assert spied_get_well_index.call_count == 1
+    assert len([first_file, *unique_files]) == 24
+
+
 def test_get_files_by_well_name():
     unique_files = files.get_unique_files_from_directory(
         os.path.join(PATH_OF_CURRENT_FILE, "2020_08_04_build_775")
@@ -434,6 +1515,57 @@ def test_PlateRecording__raises_error_if_files_not_from_same_session(
         )
 
 
+@pytest.mark.parametrize("lazy", [False, True])
+def test_PlateRecording__reports_every_file_from_a_different_session_at_once(lazy):
+    other_session_files = [
+        os.path.join(PATH_OF_CURRENT_FILE, "2020_08_04_build_775", iter_file_name)
+        for iter_file_name in (
+            "MA20001010__2020_08_04_220041__A1.h5",
+            "MA20001010__2020_08_04_220041__D6.h5",
+        )
+    ]
+    file_paths = [
+        PATH_TO_GENERIC_0_3_1_FILE,
+        other_session_files[0],
+        os.path.join(
+            PATH_OF_CURRENT_FILE, "h5", "v0.3.1", "MA20123456__2020_08_17_145752__A1.h5"
+        ),
+        other_session_files[1],
+    ]
+    with pytest.raises(
+        WellRecordingsNotFromSameSessionError,
+        match=r"'MA20123456'.*MA20001010.*All 2 files from other sessions: .*__A1\.h5 \(barcode 'MA20001010' taken at 2020-08-04 22:01:27.491628\+00:00\), .*__D6\.h5",
+    ) as exc_info:
+        PlateRecording(file_paths, lazy=lazy)
+    assert [
+        iter_file.get_file_name() for iter_file in exc_info.value.mismatched_well_files
+    ] == other_session_files
+
+
+def test_PlateRecording__raises_session_error_for_files_before_a_file_that_cannot_be_opened():
+    with pytest.raises(WellRecordingsNotFromSameSessionError) as exc_info:
+        PlateRecording(
+            [
+                PATH_TO_GENERIC_0_3_1_FILE,
+                os.path.join(
+                    PATH_OF_CURRENT_FILE,
+                    "2020_08_04_build_775",
+                    "MA20001010__2020_08_04_220041__D6.h5",
+                ),
+                os.path.join(PATH_OF_CURRENT_FILE, "does_not_exist.h5"),
+            ]
+        )
+    assert len(exc_info.value.mismatched_well_files) == 1
+
+
+def test_prof_PlateRecording__reads_session_key_of_each_well_once(mocker):
+    # start (compare each well against the first):   46 session key reads
+    # cache the session key of the first well:       24 session key reads
+    spied_get_key = mocker.spy(files.WellFile, "get_unique_recording_key")
+    PlateRecording.from_directory(os.path.join(PATH_OF_CURRENT_FILE, "h5", "v0.3.1"))
+    assert spied_get_key.call_count == 24
+
+
 def test_PlateRecording__can_init_from_filepath_or_wellfile(generic_well_file_0_3_1):
     file_path = os.path.join(
         PATH_OF_CURRENT_FILE,
@@ -500,6 +1632,417 @@ def test_WellFile__is_backwards_compatible_with_H5_file_v0_1_1():
     assert isinstance(wf.get_raw_tissue_reading(), np.ndarray)
 
 
+def test_PlateRecording__opens_same_wells_in_same_order_with_a_thread_pool():
+    dir_path = os.path.join(PATH_OF_CURRENT_FILE, "2020_08_04_build_775")
+    expected = PlateRecording.from_directory(dir_path)
+    actual = PlateRecording.from_directory(dir_path, max_workers=4)
+    assert actual.get_wellfile_names() == expected.get_wellfile_names()
+    assert actual.get_well_indices() == expected.get_well_indices()
+
+
+def test_PlateRecording__prefetches_with_more_threads_than_the_pool_of_open_files(
+    small_handle_pool, plate_96_well_dir
+):
+    # every thread keeps the file it reads from open, even though the pool is smaller than the plate and than the number of threads
+    expected = PlateRecording.from_directory(plate_96_well_dir)
+    for _ in range(3):
+        actual = PlateRecording.from_directory(
+            plate_96_well_dir, max_workers=8, prefetch_sensor_data=True
+        )
+        assert actual.get_well_indices() == expected.get_well_indices()
+        for iter_index in expected.get_well_indices():
+            np.testing.assert_array_equal(
+                actual.get_well_by_index(iter_index).get_raw_reference_reading(),
+                expected.get_well_by_index(iter_index).get_raw_reference_reading(),
+            )
+    assert small_handle_pool.get_num_open_files() == 2
+
+
+@pytest.mark.parametrize("max_workers", [1, 3])
+@pytest.mark.parametrize(
+    "first_bad_file,expected_error",
+    [
+        (
+            os.path.join(
+                PATH_OF_CURRENT_FILE,
+                "2020_08_04_build_775",
+                "MA20001010__2020_08_04_220041__D6.h5",
+            ),
+            WellRecordingsNotFromSameSessionError,
+        ),
+        (
+            os.path.join(
+                PATH_OF_CURRENT_FILE,
+                "h5",
+                "v0.1",
+                "MA20001100__2020_07_15_172203__A4.h5",
+            ),
+            UnsupportedMantarrayFileVersionError,
+        ),
+    ],
+)
+def test_PlateRecording__raises_error_of_first_bad_file_regardless_of_number_of_workers(
+    first_bad_file, expected_error, max_workers
+):
+    other_bad_files = [
+        os.path.join(
+            PATH_OF_CURRENT_FILE,
+            "2020_08_04_build_775",
+            "MA20001010__2020_08_04_220041__D6.h5",
+        ),
+        os.path.join(
+            PATH_OF_CURRENT_FILE, "h5", "v0.1", "MA20001100__2020_07_15_172203__A4.h5"
+        ),
+    ]
+    other_bad_files.remove(first_bad_file)
+    with pytest.raises(expected_error):
+        PlateRecording(
+            [PATH_TO_GENERIC_0_3_1_FILE, first_bad_file] + other_bad_files,
+            max_workers=max_workers,
+        )
+
+
+@pytest.mark.parametrize("use_memmap", [False, True])
+def test_PlateRecording__prefetch_sensor_data__serves_raw_readings_from_memory(
+    use_memmap, mocker
+):
+    dir_path = os.path.join(PATH_OF_CURRENT_FILE, "h5", "v0.3.1")
+    expected = PlateRecording.from_directory(dir_path)
+    actual = PlateRecording.from_directory(
+        dir_path, max_workers=4, prefetch_sensor_data=True, use_memmap=use_memmap
+    )
+    spied_read = mocker.spy(files.WellFile, "_read_raw_reading")
+    for iter_well_index in expected.get_well_indices():
+        for iter_getter_name in (
+            "get_raw_tissue_reading",
+            "get_raw_reference_reading",
+        ):
+            prefetched_reading = getattr(
+                actual.get_well_by_index(iter_well_index), iter_getter_name
+            )()
+            spied_read.assert_not_called()
+            np.testing.assert_array_equal(
+                prefetched_reading,
+                getattr(
+                    expected.get_well_by_index(iter_well_index), iter_getter_name
+                )(),
+            )
+            spied_read.reset_mock()
+
+
+def test_prof_PlateRecording__open_with_a_thread_pool(mocker):
+    # 20 ms of simulated file system latency per file
+    # one file at a time:   571741300.00
+    # 8 threads:            130320178.00
+
+    class _SlowToOpenWellFile(WellFile):
+        def __init__(self, *args, **kwargs):
+            time.sleep(0.02)
+            super().__init__(*args, **kwargs)
+
+    mocker.patch.object(files, "WellFile", _SlowToOpenWellFile)
+    dir_path = os.path.join(PATH_OF_CURRENT_FILE, "h5", "v0.3.1")
+
+    start = time.perf_counter_ns()
+    PlateRecording.from_directory(dir_path, max_workers=8)
+    dur = time.perf_counter_ns() - start
+    # print(dur)
+    assert dur < 300000000
+
+
+@pytest.mark.parametrize(
+    "plate_dir_fixture_name,num_rows,num_columns,last_well_name",
+    [("plate_96_well_dir", 8, 12, "H12"), ("plate_384_well_dir", 16, 24, "P24")],
+)
+@pytest.mark.parametrize("lazy", [False, True])
+def test_PlateRecording__loads_high_density_plates(
+    plate_dir_fixture_name, num_rows, num_columns, last_well_name, lazy, request
+):
+    num_wells = num_rows * num_columns
+    plate_recording = PlateRecording.from_directory(
+        request.getfixturevalue(plate_dir_fixture_name), lazy=lazy
+    )
+    assert plate_recording.get_well_indices() == tuple(range(num_wells))
+    assert plate_recording.get_well_names() == {
+        get_well_name_of_plate(iter_index, num_rows) for iter_index in range(num_wells)
+    }
+    assert len(plate_recording.get_wellfile_names()) == num_wells
+    last_well = plate_recording.get_well_by_index(num_wells - 1)
+    assert last_well.get_well_name() == last_well_name
+
+
+def test_PlateRecording__opens_each_file_of_a_plate_with_more_wells_than_the_pool_of_open_files_once(
+    plate_384_well_dir, mocker
+):
+    assert get_h5_file_handle_pool().get_max_open_files() < 384
+    spied_open = mocker.spy(h5py.File, "__init__")
+    PlateRecording.from_directory(plate_384_well_dir)
+    assert spied_open.call_count == 384
+
+
+def test_PlateRecording__keeps_its_well_indices_and_names(plate_96_well_dir):
+    plate_recording = PlateRecording.from_directory(plate_96_well_dir)
+    well_indices = plate_recording.get_well_indices()
+    assert plate_recording.get_well_indices() is well_indices
+    wellfile_names = plate_recording.get_wellfile_names()
+    wellfile_names.clear()
+    assert len(plate_recording.get_wellfile_names()) == 96
+    assert len(plate_recording.get_well_names()) == 96
+
+
+def test_prof_PlateRecording__open_384_well_plate(plate_384_well_dir):
+    # start:                                         1763341327.00
+    # read only the attributes used by the getters:  1081800706.00
+
+    start = time.perf_counter_ns()
+    PlateRecording.from_directory(plate_384_well_dir)
+    dur = time.perf_counter_ns() - start
+    # print(dur)
+    assert dur < 5000000000
+
+
+def test_prof_PlateRecording__memory_of_96_well_plate(plate_96_well_dir):
+    # peak bytes allocated while opening
+    # eager:  284935
+    # lazy:   48424
+
+    peaks = dict()
+    for lazy in (False, True):
+        tracemalloc.start()
+        try:
+            PlateRecording.from_directory(plate_96_well_dir, lazy=lazy)
+            peaks[lazy] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    # print(peaks)
+    assert peaks[True] < peaks[False] < 1000000
+
+
+def test_prof_PlateRecording__get_well_names_of_384_well_plate(plate_384_well_dir):
+    # 100 calls of get_well_names, get_wellfile_names and get_well_indices
+    # start:                                    43340572.00
+    # keep the well names and sorted indices:   1386980.00
+    plate_recording = PlateRecording.from_directory(plate_384_well_dir)
+
+    start = time.perf_counter_ns()
+    for _ in range(100):
+        plate_recording.get_well_names()
+        plate_recording.get_wellfile_names()
+        plate_recording.get_well_indices()
+    dur = time.perf_counter_ns() - start
+    # print(dur)
+    assert dur < 20000000
+
+
+def test_PlateRecording__from_consolidated_file__has_the_same_wells_as_the_exported_plate(
+    consolidated_plate_file_path,
+):
+    expected = PlateRecording.from_directory(
+        os.path.dirname(PATH_TO_GENERIC_0_3_1_FILE), use_wide_times=True
+    )
+    actual = PlateRecording.from_consolidated_file(
+        consolidated_plate_file_path, use_wide_times=True
+    )
+    assert actual.get_well_indices() == expected.get_well_indices()
+    assert actual.get_well_names() == expected.get_well_names()
+    np.testing.assert_array_equal(
+        actual.get_stacked_reference_values(), expected.get_stacked_reference_values()
+    )
+    for iter_index in expected.get_well_indices():
+        expected_well = expected.get_well_by_index(iter_index)
+        actual_well = actual.get_well_by_index(iter_index)
+        assert isinstance(actual_well, ConsolidatedWellFile)
+        assert actual_well.get_metadata() == expected_well.get_metadata()
+        assert actual_well.get_h5_attribute(
+            str(WELL_NAME_UUID)
+        ) == expected_well.get_h5_attribute(str(WELL_NAME_UUID))
+        np.testing.assert_array_equal(
+            actual_well.get_raw_tissue_reading(), expected_well.get_raw_tissue_reading()
+        )
+        np.testing.assert_array_equal(
+            actual_well.get_raw_reference_reading(start_index=-7, stop_index=-2),
+            expected_well.get_raw_reference_reading(start_index=-7, stop_index=-2),
+        )
+        np.testing.assert_array_equal(
+            actual_well.get_tissue_overview(10), expected_well.get_tissue_overview(10)
+        )
+
+
+def test_PlateRecording__from_consolidated_file__reads_sensor_values_into_arrays_and_blocks(
+    consolidated_plate_file_path,
+):
+    expected_well = WellFile(PATH_TO_GENERIC_0_3_1_FILE)
+    actual_well = PlateRecording.from_consolidated_file(
+        consolidated_plate_file_path
+    ).get_well_by_index(expected_well.get_well_index())
+    expected = np.zeros(20, dtype=np.int64)
+    actual = np.zeros(20, dtype=np.int64)
+    expected_well.read_raw_tissue_values_into(expected, 3, 100, 110)
+    actual_well.read_raw_tissue_values_into(actual, 3, 100, 110)
+    np.testing.assert_array_equal(actual, expected)
+    for iter_expected_block, iter_actual_block in zip(
+        expected_well.iter_raw_reference_reading_blocks(block_size=1000),
+        actual_well.iter_raw_reference_reading_blocks(block_size=1000),
+    ):
+        np.testing.assert_array_equal(iter_actual_block, iter_expected_block)
+    assert len(list(actual_well.iter_raw_tissue_reading_blocks())) == 1
+
+
+def test_PlateRecording__from_consolidated_file__opens_the_file_once_for_all_wells(
+    consolidated_plate_file_path, mocker
+):
+    spied_open = mocker.spy(h5py.File, "__init__")
+    plate_recording = PlateRecording.from_consolidated_file(
+        consolidated_plate_file_path
+    )
+    plate_recording.get_stacked_tissue_values()
+    # h5py also wraps already open files in new File objects, e.g. for Dataset.file
+    opened_file_names = [
+        iter_call[0][1]
+        for iter_call in spied_open.call_args_list
+        if isinstance(iter_call[0][1], str)
+    ]
+    assert opened_file_names == [consolidated_plate_file_path]
+    first_well = plate_recording.get_well_by_index(0)
+    last_well = plate_recording.get_well_by_index(23)
+    assert first_well.get_h5_file() is last_well.get_h5_file()
+    # closing the shared file closes it for every well, which reopen it when needed
+    first_well.close()
+    assert not last_well.is_open()
+    assert last_well.get_well_name() == "D6"
+    assert last_well.get_raw_tissue_reading().shape[1] > 0
+    assert first_well.is_open()
+
+
+def test_ConsolidatedWellFile__can_be_opened_on_its_own_and_closes_its_file_when_collected(
+    consolidated_plate_file_path,
+):
+    pool = get_h5_file_handle_pool()
+    num_open_files = pool.get_num_open_files()
+    well_file = ConsolidatedWellFile(consolidated_plate_file_path, 2)
+    assert well_file.get_well_name() == "C1"
+    assert pool.get_num_open_files() == num_open_files + 1
+    del well_file
+    assert pool.get_num_open_files() == num_open_files
+
+
+def test_PlateRecording__from_consolidated_file__raises_error_if_file_is_not_a_consolidated_plate_file():
+    with pytest.raises(NotAConsolidatedPlateFileError, match="export_consolidated"):
+        PlateRecording.from_consolidated_file(PATH_TO_GENERIC_0_3_1_FILE)
+
+
+def test_prof_PlateRecording__from_consolidated_file(plate_96_well_dir):
+    # open a 96-well plate and read its stacked tissue values
+    # one file per well:   215339214.00
+    # consolidated file:   159533239.00
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, "plate.h5")
+        export_consolidated_plate_file(
+            PlateRecording.from_directory(plate_96_well_dir), file_path
+        )
+
+        start = time.perf_counter_ns()
+        PlateRecording.from_consolidated_file(file_path).get_stacked_tissue_values()
+        dur = time.perf_counter_ns() - start
+        # print(dur)
+        assert dur < 1000000000
+
+
+def test_PlateRecording__lazy__validates_wells_without_keeping_them_open():
+    dir_path = os.path.join(PATH_OF_CURRENT_FILE, "2020_08_04_build_775")
+    expected = PlateRecording.from_directory(dir_path)
+    actual = PlateRecording.from_directory(dir_path, lazy=True, max_workers=4)
+    assert actual.get_well_indices() == expected.get_well_indices()
+    assert actual.get_wellfile_names() == expected.get_wellfile_names()
+    assert actual.get_well_names() == expected.get_well_names()
+    assert not any(
+        actual.is_well_open(iter_index) for iter_index in actual.get_well_indices()
+    )
+    assert all(
+        expected.is_well_open(iter_index) for iter_index in expected.get_well_indices()
+    )
+
+
+def test_PlateRecording__lazy__opens_a_well_the_first_time_it_is_accessed():
+    plate_recording = PlateRecording.from_directory(
+        os.path.join(PATH_OF_CURRENT_FILE, "h5", "v0.3.1"),
+        lazy=True,
+        use_wide_times=True,
+    )
+    well_file = plate_recording.get_well_by_index(1)
+    assert plate_recording.is_well_open(1)
+    assert not plate_recording.is_well_open(0)
+    assert plate_recording.get_well_by_index(1) is well_file
+    assert well_file.get_well_name() == "B1"
+    assert well_file.get_raw_tissue_reading().dtype == np.int64
+
+
+def test_PlateRecording__lazy__keeps_given_well_files_open(generic_well_file_0_3_1):
+    plate_recording = PlateRecording(
+        [generic_well_file_0_3_1], lazy=True, catalog=MetadataCatalog(":memory:")
+    )
+    well_index = generic_well_file_0_3_1.get_well_index()
+    assert plate_recording.is_well_open(well_index)
+    assert plate_recording.get_well_by_index(well_index) is generic_well_file_0_3_1
+
+
+def test_PlateRecording__lazy__raises_error_if_files_not_from_same_session(
+    generic_well_file, generic_well_file_0_3_1
+):
+    with pytest.raises(
+        WellRecordingsNotFromSameSessionError,
+        match=r"'MA20001010'.*2020-08-04 22:01:27.491628\+00:00.*MA20123456.*2020-08-17 14:58:10.728254\+00:00",
+    ):
+        PlateRecording(
+            (
+                generic_well_file.get_file_name(),
+                generic_well_file_0_3_1.get_file_name(),
+            ),
+            lazy=True,
+        )
+
+
+def test_PlateRecording__lazy__raises_error_if_given_a_file_with_version_v0_1():
+    with pytest.raises(UnsupportedMantarrayFileVersionError):
+        PlateRecording(
+            [
+                os.path.join(
+                    PATH_OF_CURRENT_FILE,
+                    "h5",
+                    "v0.1",
+                    "MA20001100__2020_07_15_172203__A4.h5",
+                )
+            ],
+            lazy=True,
+        )
+
+
+def test_PlateRecording__lazy__raises_error_for_a_missing_well_name_only_when_it_is_needed():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, "no_well_name.h5")
+        shutil.copy(PATH_TO_GENERIC_0_3_1_FILE, file_path)
+        with h5py.File(file_path, "r+") as h5_file:
+            del h5_file.attrs[str(WELL_NAME_UUID)]
+        plate_recording = PlateRecording([file_path], lazy=True)
+        with pytest.raises(FileAttributeNotFoundError):
+            plate_recording.get_wellfile_names()
+        plate_recording.get_well_by_index(
+            plate_recording.get_well_indices()[0]
+        ).close()  # safe clean-up when running CI on windows systems
+
+
+def test_PlateRecording__lazy__prefetch_sensor_data__opens_every_well():
+    plate_recording = PlateRecording.from_directory(
+        os.path.join(PATH_OF_CURRENT_FILE, "h5", "v0.3.1"),
+        lazy=True,
+        prefetch_sensor_data=True,
+    )
+    assert all(
+        plate_recording.is_well_open(iter_index)
+        for iter_index in plate_recording.get_well_indices()
+    )
+
+
 def test_PlateRecording__init__raises_error_if_given_a_file_with_version_v0_1():
     with pytest.raises(
         UnsupportedMantarrayFileVersionError,
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+import datetime
+from glob import glob
+import os
+import shutil
+import tempfile
+from uuid import UUID
+
+from mantarray_file_manager import DateRange
+from mantarray_file_manager import Equals
+from mantarray_file_manager import files
+from mantarray_file_manager import IsIn
+from mantarray_file_manager import query_files
+from mantarray_file_manager import UnsupportedQueryFieldError
+import pytest
+from stdlib_utils import get_current_file_abs_directory
+
+from .fixtures import record_h5_attribute_reads
+
+PATH_OF_CURRENT_FILE = get_current_file_abs_directory()
+BUILD_775_FILES = sorted(
+    glob(os.path.join(PATH_OF_CURRENT_FILE, "2020_08_04_build_775", "*.h5"))
+)
+V0_3_1_FILES = sorted(glob(os.path.join(PATH_OF_CURRENT_FILE, "h5", "v0.3.1", "*.h5")))
+BUILD_775_BEGIN_RECORDING = datetime.datetime(
+    2020, 8, 4, 22, 1, 27, 491628, tzinfo=datetime.timezone.utc
+)
+
+
+def test_Predicate__raises_error_for_unsupported_field():
+    with pytest.raises(UnsupportedQueryFieldError, match="'Color'"):
+        Equals("Color", "Blue")
+
+
+def test_query_files__filters_by_equality():
+    actual = query_files(BUILD_775_FILES, [Equals("Well Name", "D6")])
+    assert [os.path.basename(iter_path) for iter_path in actual] == [
+        "MA20001010__2020_08_04_220041__D6.h5"
+    ]
+
+
+def test_query_files__filters_by_set_membership():
+    actual = query_files(V0_3_1_FILES, [IsIn("Well Index", {0, 1, 23})])
+    assert [os.path.basename(iter_path)[-5:-3] for iter_path in actual] == [
+        "A1",
+        "B1",
+        "D6",
+    ]
+
+
+@pytest.mark.parametrize(
+    "start,end,expected_num_files,test_description",
+    [
+        (BUILD_775_BEGIN_RECORDING, None, 50, "includes start of range"),
+        (
+            BUILD_775_BEGIN_RECORDING + datetime.timedelta(microseconds=1),
+            None,
+            24,
+            "excludes before start of range",
+        ),
+        (None, BUILD_775_BEGIN_RECORDING, 0, "excludes end of range"),
+        (
+            None,
+            BUILD_775_BEGIN_RECORDING + datetime.timedelta(microseconds=1),
+            26,
+            "only bounded above",
+        ),
+        (
+            BUILD_775_BEGIN_RECORDING - datetime.timedelta(days=1),
+            BUILD_775_BEGIN_RECORDING + datetime.timedelta(days=1),
+            26,
+            "bounded on both sides",
+        ),
+    ],
+)
+def test_query_files__filters_by_date_range_of_beginning_of_recording(
+    start, end, expected_num_files, test_description
+):
+    actual = query_files(
+        BUILD_775_FILES + V0_3_1_FILES, [DateRange(start=start, end=end)]
+    )
+    assert len(actual) == expected_num_files
+
+
+def test_query_files__requires_all_predicates_to_match():
+    actual = query_files(
+        BUILD_775_FILES + V0_3_1_FILES,
+        [
+            Equals("Plate Barcode", "MA20123456"),
+            Equals("User ID", UUID("87187e44-2e8e-4f37-ba0f-cd2df366f3bc")),
+            DateRange(end=BUILD_775_BEGIN_RECORDING + datetime.timedelta(days=30)),
+        ],
+    )
+    assert actual == V0_3_1_FILES
+
+
+def test_query_files__stops_reading_metadata_after_the_first_failed_predicate(mocker):
+    spied_begin_recording = mocker.spy(files.WellFile, "get_begin_recording")
+    actual = query_files(
+        BUILD_775_FILES,
+        [
+            Equals("Plate Barcode", "MA20123456"),
+            DateRange(end=BUILD_775_BEGIN_RECORDING),
+        ],
+    )
+    assert actual == []
+    spied_begin_recording.assert_not_called()
+
+
+def test_query_files__reads_one_attribute_per_file_for_each_predicate(mocker):
+    read_attribute_names = record_h5_attribute_reads(mocker)
+    actual = query_files(BUILD_775_FILES, [Equals("Plate Barcode", "MA20123456")])
+    assert actual == []
+    # the file format version, and the plate barcode
+    assert len(read_attribute_names) == 2 * len(BUILD_775_FILES)
+
+
+def test_query_files__does_not_match_files_missing_the_metadata():
+    file_path = os.path.join(
+        PATH_OF_CURRENT_FILE, "h5", "v0.1", "MA20001100__2020_07_15_172203__A4.h5"
+    )
+    actual = query_files(
+        [file_path],
+        [Equals("User ID", UUID("87187e44-2e8e-4f37-ba0f-cd2df366f3bc"))],
+    )
+    assert actual == []
+
+
+def test_query_files__gives_same_result_when_scanned_in_parallel():
+    predicates = [
+        IsIn("Well Name", {"A1", "D6"}),
+        Equals("Plate Barcode", "MA20123456"),
+    ]
+    expected = query_files(V0_3_1_FILES, predicates)
+    assert len(expected) == 2
+    assert (
+        query_files(V0_3_1_FILES, predicates, max_workers=2, use_processes=True)
+        == expected
+    )
+
+
+@pytest.mark.parametrize(
+    "predicate,test_description",
+    [
+        (Equals("Plate Barcode", "MA20123456"), "rejects by barcode"),
+        (IsIn("Well Name", {"Z9"}), "rejects by well name"),
+        (
+            DateRange(start=BUILD_775_BEGIN_RECORDING + datetime.timedelta(days=7)),
+            "rejects by start of date range",
+        ),
+        (
+            DateRange(end=BUILD_775_BEGIN_RECORDING - datetime.timedelta(days=7)),
+            "rejects by end of date range",
+        ),
+        (
+            Equals(
+                "Begin Recording",
+                BUILD_775_BEGIN_RECORDING + datetime.timedelta(days=7),
+            ),
+            "rejects by beginning of recording",
+        ),
+        (
+            IsIn(
+                "Begin Recording",
+                {BUILD_775_BEGIN_RECORDING - datetime.timedelta(days=7)},
+            ),
+            "rejects by beginning of recording",
+        ),
+    ],
+)
+def test_query_files__does_not_open_files_ruled_out_by_file_name(
+    predicate, test_description, mocker
+):
+    spied_init = mocker.spy(files.WellFile, "__init__")
+    actual = query_files(BUILD_775_FILES, [predicate], prefilter_by_file_name=True)
+    assert actual == []
+    spied_init.assert_not_called()
+
+
+def test_query_files__confirms_file_name_matches_with_file_metadata(mocker):
+    spied_init = mocker.spy(files.WellFile, "__init__")
+    actual = query_files(
+        BUILD_775_FILES,
+        [
+            Equals("Well Name", "A1"),
+            DateRange(
+                start=BUILD_775_BEGIN_RECORDING,
+                end=BUILD_775_BEGIN_RECORDING + datetime.timedelta(hours=1),
+            ),
+            Equals("User ID", UUID("455b93eb-c78f-4494-9f73-d3291130f126")),
+        ],
+        prefilter_by_file_name=True,
+    )
+    assert len(actual) == 3  # the original and two duplicates of A1
+    assert spied_init.call_count == 3
+
+
+@pytest.mark.parametrize(
+    "predicate,test_description",
+    [
+        (Equals("Begin Recording", BUILD_775_BEGIN_RECORDING), "equals"),
+        (
+            IsIn(
+                "Begin Recording",
+                {
+                    BUILD_775_BEGIN_RECORDING,
+                    BUILD_775_BEGIN_RECORDING + datetime.timedelta(days=7),
+                },
+            ),
+            "is in",
+        ),
+    ],
+)
+def test_query_files__matches_beginning_of_recording_near_the_file_name_timestamp(
+    predicate, test_description
+):
+    # the file names have the time the files were created, which is not exactly the beginning of the recording
+    expected = query_files(BUILD_775_FILES, [predicate])
+    assert len(expected) == len(BUILD_775_FILES)
+    assert (
+        query_files(BUILD_775_FILES, [predicate], prefilter_by_file_name=True)
+        == expected
+    )
+
+
+def test_query_files__opens_files_whose_name_does_not_follow_the_pattern():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        renamed_file_path = os.path.join(tmp_dir, "renamed.h5")
+        shutil.copy(V0_3_1_FILES[0], renamed_file_path)
+        actual = query_files(
+            [renamed_file_path],
+            [Equals("Plate Barcode", "MA20123456")],
+            prefilter_by_file_name=True,
+        )
+    assert actual == [renamed_file_path]
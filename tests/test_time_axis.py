@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+from mantarray_file_manager import TimeAxis
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope="function", name="time_axis")
+def fixture_time_axis():
+    yield TimeAxis(880, 960, 370)
+
+
+def test_TimeAxis__materializes_same_times_as_arange(time_axis):
+    expected = np.arange(370, dtype=np.int32) * 960 + 880
+    actual = time_axis.to_array()
+    assert actual.dtype == np.int32
+    np.testing.assert_array_equal(actual, expected)
+    np.testing.assert_array_equal(np.asarray(time_axis), expected)
+    assert np.asarray(time_axis, dtype=np.float64).dtype == np.float64
+    assert len(time_axis) == 370
+
+
+@pytest.mark.parametrize("index", [0, 1, 369, -1, -370])
+def test_TimeAxis__gets_time_of_single_sample(time_axis, index):
+    assert time_axis[index] == time_axis.to_array()[index]
+
+
+@pytest.mark.parametrize("index", [370, -371])
+def test_TimeAxis__raises_error_for_sample_index_out_of_range(time_axis, index):
+    with pytest.raises(IndexError, match=str(index)):
+        time_axis[
+            index
+        ]  # pylint:disable=pointless-statement # indexing is the behavior under test
+
+
+@pytest.mark.parametrize(
+    "key",
+    [
+        slice(10, 20),
+        slice(None, 5),
+        slice(-30, None),
+        slice(5, 300, 7),
+        slice(200, 100),
+    ],
+)
+def test_TimeAxis__slicing_gives_time_axis_of_same_times_as_slicing_array(
+    time_axis, key
+):
+    actual = time_axis[key]
+    assert isinstance(actual, TimeAxis)
+    np.testing.assert_array_equal(actual.to_array(), time_axis.to_array()[key])
+
+
+@pytest.mark.parametrize(
+    "key", [slice(None, None, -1), slice(300, 5, -7), slice(100, 200, -1)]
+)
+def test_TimeAxis__slicing_with_negative_step_gives_array_of_decreasing_times(
+    time_axis, key
+):
+    actual = time_axis[key]
+    assert isinstance(actual, np.ndarray)
+    np.testing.assert_array_equal(actual, time_axis.to_array()[key])
+
+
+@pytest.mark.parametrize("side", ["left", "right"])
+@pytest.mark.parametrize(
+    "times",
+    [
+        0,
+        880,
+        881,
+        1840,
+        355000,
+        10**7,
+        np.array([-5, 880, 1839, 1840, 1841, 10**7]),
+    ],
+)
+def test_TimeAxis__searchsorted__matches_numpy_searchsorted(time_axis, times, side):
+    expected = np.searchsorted(time_axis.to_array(), times, side=side)
+    np.testing.assert_array_equal(time_axis.searchsorted(times, side=side), expected)
+
+
+def test_TimeAxis__searchsorted__raises_error_for_unknown_side(time_axis):
+    with pytest.raises(ValueError, match="middle"):
+        time_axis.searchsorted(880, side="middle")
+
+
+def test_TimeAxis__repr_and_getters(time_axis):
+    assert time_axis.get_offset() == 880
+    assert time_axis.get_step() == 960
+    assert time_axis.get_dtype() == np.int32
+    assert repr(time_axis) == (
+        "TimeAxis(offset=880, step=960, num_samples=370, dtype=int32)"
+    )